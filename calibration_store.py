@@ -0,0 +1,143 @@
+# Görevi: Kalibrasyon sonuçlarını ait oldukları sensör (WHO_AM_I, bus, adres),
+# ölçüm aralıkları ve kalibrasyon sırasındaki sıcaklık bandıyla birlikte
+# geçmişi tutarak saklamak. Açılışta uygun kayıt anında bulunur; kart değişmiş,
+# ayarlar farklı ya da kayıt çok eski/farklı sıcaklıkta ise uyarılır veya
+# reddedilir.
+#
+#     store = calibration_store.CalibrationStore('calibrations.json')
+#     ImuDevice.perform_calibration(store=store)   # yeni kayıt geçmişe eklenir
+#     sensor.load_calibration(store)               # açılışta, kalibrasyon yapmadan
+#
+# Kayıtlar setup.json anahtarlarını (ofsetler, trim, ayarlar) aynen içerir;
+# load_offsets/load_hardware_offsets/imu_settings.from_setup doğrudan kullanabilir.
+
+import collections
+import json
+import math
+import os
+import tempfile
+import time
+
+WHO_AM_I = 0x75
+VERSION = 1
+SECONDS_PER_DAY = 86400.0
+
+DeviceKey = collections.namedtuple('DeviceKey', ['who_am_i', 'bus', 'address', 'accel_range', 'gyro_range'])
+DeviceKey.__doc__ = """Bir kalibrasyonun geçerli olduğu sensör ve ölçüm aralıkları.
+
+WHO_AM_I aynı modeldeki tüm yongalarda aynıdır (MPU6050: 0x68); farklı bir
+modelin takıldığını yakalar, aynı modelden kart değişimini yakalamaz.
+bus, bus numarasıdır (bus nesnesi verildiyse None).
+"""
+
+Match = collections.namedtuple('Match', ['entry', 'band_distance', 'age_days', 'problems'])
+Match.__doc__ = """CalibrationStore.find sonucu.
+
+entry        : kayıt (setup.json anahtarları + kimlik, sıcaklık ve zaman)
+band_distance: kaydın sıcaklık bandının ölçülen banttan uzaklığı
+age_days     : kaydın yaşı (gün)
+problems     : uyarılar (boşsa kayıt tam uyuyor)
+"""
+
+
+def die_temperature(raw):
+    """TEMP_OUT ham değerinden yonga sıcaklığı, °C (datasheet: TEMP_OUT / 340 + 36.53)."""
+    return raw / 340.0 + 36.53
+
+
+def device_key(sensor):
+    """imu_kalman.ImuDevice için DeviceKey; WHO_AM_I sensörden okunur."""
+    return DeviceKey(sensor.i2c.read_byte(WHO_AM_I), sensor.i2c.bus_number, sensor.i2c.address,
+                     sensor.config.accel_range, sensor.config.gyro_range)
+
+
+class CalibrationStore:
+    """Kalibrasyon geçmişini tutan JSON dosyası.
+
+    band_width       : sıcaklık bandı genişliği (°C)
+    max_band_distance: bu kadar banttan uzak kayıtlar reddedilir
+    max_age_days     : daha eski kayıtlar için uyarı verilir (None: yaş kontrolü yok)
+    max_history      : sensör başına saklanan en fazla kayıt; eskiler silinir
+    """
+
+    def __init__(self, filename='calibrations.json', band_width=10.0, max_band_distance=1,
+                 max_age_days=180.0, max_history=20):
+        self.filename, self.band_width = filename, band_width
+        self.max_band_distance, self.max_age_days, self.max_history = max_band_distance, max_age_days, max_history
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.filename) as f: data = json.load(f)
+        except FileNotFoundError:
+            return []
+        if data.get('version') != VERSION:
+            raise ValueError("Desteklenmeyen kalibrasyon deposu sürümü: {}".format(data.get('version')))
+        return data['entries']
+
+    def band(self, temperature):
+        return math.floor(temperature / self.band_width)
+
+    def record(self, key, setup_data, temperature, timestamp=None):
+        """Yeni kalibrasyonu geçmişe ekler ve dosyayı (atomik olarak) yeniden yazar; kaydı döndürür."""
+        entry = dict(setup_data)
+        entry.update({
+            'WHO_AM_I': key.who_am_i, 'BUS': key.bus, 'ADDRESS': key.address,
+            'TEMPERATURE': round(temperature, 2), 'TEMPERATURE_BAND': self.band(temperature),
+            'TIMESTAMP': time.time() if timestamp is None else timestamp,
+        })
+        history = self.history(key)
+        for old in history[:max(0, len(history) + 1 - self.max_history)]:
+            self.entries.remove(old)
+        self.entries.append(entry)
+        self._save()
+        return entry
+
+    def _save(self):
+        # Yarım yazılmış dosya kalmasın diye geçici dosyaya yazılıp yerine taşınır
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.calibrations-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f: json.dump({'version': VERSION, 'entries': self.entries}, f, indent=4)
+            os.replace(temporary, self.filename)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def history(self, key):
+        """key'e ait kayıtlar, eskiden yeniye."""
+        return sorted((entry for entry in self.entries if self._key(entry) == key), key=lambda entry: entry['TIMESTAMP'])
+
+    @staticmethod
+    def _key(entry):
+        return DeviceKey(entry['WHO_AM_I'], entry['BUS'], entry['ADDRESS'],
+                         entry.get('ACCEL_RANGE'), entry.get('GYRO_RANGE'))
+
+    def find(self, key, temperature, now=None):
+        """key ve sıcaklık için en uygun kaydı döndürür; uygun kayıt yoksa None.
+
+        Önce sıcaklık bandı en yakın, eşitlikte en yeni kayıt seçilir.
+        max_band_distance'tan uzak bantlar reddedilir; eski kayıtlar ve komşu
+        banttan gelen kayıtlar problems listesinde belirtilir.
+        """
+        history = self.history(key)
+        if not history:
+            return None
+        band = self.band(temperature)
+        entry = min(reversed(history), key=lambda entry: abs(entry['TEMPERATURE_BAND'] - band))
+        distance = abs(entry['TEMPERATURE_BAND'] - band)
+        if distance > self.max_band_distance:
+            return None
+        age_days = ((time.time() if now is None else now) - entry['TIMESTAMP']) / SECONDS_PER_DAY
+        problems = []
+        if distance:
+            problems.append("Kalibrasyon {:.1f} °C'de yapılmış, sensör şu an {:.1f} °C".format(
+                entry['TEMPERATURE'], temperature))
+        if self.max_age_days is not None and age_days > self.max_age_days:
+            problems.append("Kalibrasyon {:.0f} günlük (sınır {:.0f} gün)".format(age_days, self.max_age_days))
+        return Match(entry, distance, age_days, problems)
+
+    def mismatches(self, key):
+        """Aynı bus/adreste başka sensör veya ölçüm aralığıyla yapılmış kayıtlar (uyarı mesajları için)."""
+        return [entry for entry in self.entries
+                if (entry['BUS'], entry['ADDRESS']) == (key.bus, key.address) and self._key(entry) != key]
@@ -0,0 +1,84 @@
+try:
+    import smbus
+except ImportError:
+    # Without smbus only bus objects (e.g. mpu6050_emulator.EmulatedBus) can be used
+    smbus = None
+import time
+
+
+class TransportStats:
+    """I2C counters: successful transactions, errors, retries, abandoned transactions and latency (ns)."""
+    __slots__ = ('transactions', 'errors', 'retries', 'failures', 'reinits', 'total_ns', 'max_ns', 'last_error')
+
+    def __init__(self): self.reset()
+
+    def reset(self):
+        self.transactions, self.errors, self.retries, self.failures, self.reinits = 0, 0, 0, 0, 0
+        self.total_ns, self.max_ns, self.last_error = 0, 0, None
+
+    @property
+    def mean_latency_us(self): return self.total_ns / self.transactions / 1e3 if self.transactions else 0.0
+
+    def as_dict(self):
+        return {'transactions': self.transactions, 'errors': self.errors, 'retries': self.retries,
+                'failures': self.failures, 'reinits': self.reinits, 'mean_latency_us': self.mean_latency_us,
+                'max_latency_us': self.max_ns / 1e3, 'last_error': None if self.last_error is None else str(self.last_error)}
+
+
+class I2cDevice:
+    """Register access to one I2C address.
+
+    A failed transaction (OSError: NACK, lost arbitration, noise) is retried
+    at most `retries` times, and never once `budget` seconds have passed
+    since the first attempt, so one transaction cannot stall a loop for
+    long. Counters are kept in `stats` (TransportStats).
+    """
+
+    def __init__(self, bus, address, retries=2, budget=0.002):
+
+        # The bus is either a bus number or an already opened SMBus-like object
+        if isinstance(bus, int):
+            if smbus is None:
+                raise ImportError("smbus module not found; pass an SMBus-like bus object instead")
+            bus = smbus.SMBus(bus)
+
+        self.bus     = bus
+        self.address = address
+
+        self.retries   = retries
+        self.budget_ns = int(budget * 1e9)
+        self.stats     = TransportStats()
+
+    def read_byte(self, register):
+        return self._transfer(self._read_byte, register, None)
+
+    def write_byte(self, register, value):
+        self._transfer(self.bus.write_byte_data, register, value)
+
+    def read_block(self, register, length):
+        # Consecutive registers in one I2C transaction (max 32 bytes)
+        return bytes(self._transfer(self.bus.read_i2c_block_data, register, length))
+
+    def write_block(self, register, values):
+        self._transfer(self.bus.write_i2c_block_data, register, list(values))
+
+    def _read_byte(self, address, register, _):
+        return self.bus.read_byte_data(address, register)
+
+    def _transfer(self, operation, register, argument):
+        # operation(address, register, argument); the budget counts from the first attempt
+        stats, start, attempt = self.stats, time.perf_counter_ns(), 0
+        while True:
+            try:
+                result = operation(self.address, register, argument)
+                break
+            except OSError as error:
+                stats.errors, stats.last_error = stats.errors + 1, error
+                if attempt >= self.retries or time.perf_counter_ns() - start >= self.budget_ns:
+                    stats.failures += 1
+                    raise
+                attempt, stats.retries = attempt + 1, stats.retries + 1
+        elapsed = time.perf_counter_ns() - start
+        stats.transactions, stats.total_ns = stats.transactions + 1, stats.total_ns + elapsed
+        if elapsed > stats.max_ns: stats.max_ns = elapsed
+        return result
@@ -0,0 +1,132 @@
+# Görevi: smbus C eklentisi yerine /dev/i2c-N'i doğrudan açıp I2C_RDWR
+# ioctl'ü ile birleşik (register yaz + N byte oku, arada repeated start)
+# işlemler yapan bir bus. SMBus arayüzünü taklit eder, bu yüzden I2cDevice
+# ve tüm sürücüler değişmeden kullanabilir:
+#
+#     sensor = imu_kalman.ImuDevice(bus=1, transport='rdwr')
+#     sensor = imu_kalman.ImuDevice(bus=i2c_rdwr.I2cRdwrBus(1))
+#
+# Mesaj dizisi, ioctl argümanı ve okuma/yazma tamponları ctypes ile bir kez
+# ayrılır; her işlem tek bir ioctl'dür. read_i2c_block_data_into aynı hedef
+# tamponla çağrıldıkça sensör verisi doğrudan o tampona okunur (kopya yok).
+# Donanımsız testler için mpu6050_emulator.FakeI2cCharDevice, open/ioctl
+# yerine geçer.
+
+import ctypes
+import os
+try:
+    import fcntl
+except ImportError: # Linux dışı platformlar; sahte aygıtla (FakeI2cCharDevice) yine kullanılabilir
+    fcntl = None
+
+I2C_RDWR = 0x0707 # linux/i2c-dev.h
+I2C_M_RD = 0x0001 # linux/i2c.h
+MAX_BLOCK_SIZE = 32
+
+
+class I2cMsg(ctypes.Structure):
+    _fields_ = [('addr', ctypes.c_uint16), ('flags', ctypes.c_uint16), ('len', ctypes.c_uint16),
+                ('buf', ctypes.POINTER(ctypes.c_uint8))]
+
+
+class I2cRdwrIoctlData(ctypes.Structure):
+    _fields_ = [('msgs', ctypes.POINTER(I2cMsg)), ('nmsgs', ctypes.c_uint32)]
+
+
+class CharDevice:
+    """Gerçek karakter aygıtı erişimi; I2cRdwrBus'a aynı arayüzle sahte bir aygıt verilebilir."""
+    open, close = staticmethod(os.open), staticmethod(os.close)
+    ioctl = staticmethod(fcntl.ioctl) if fcntl is not None else None
+
+
+def _pointer(buffer):
+    return ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+
+
+class I2cRdwrBus:
+    """SMBus yerine geçen, her işlemi tek bir I2C_RDWR ioctl'üyle yapan bus.
+
+    bus: bus numarası (/dev/i2c-<bus>) ya da aygıt yolu. device open/ioctl/close
+    sağlayan nesnedir (varsayılan CharDevice; test için
+    mpu6050_emulator.FakeI2cCharDevice). ioctls: yapılan ioctl sayısı.
+    """
+
+    def __init__(self, bus, device=CharDevice):
+        if device is CharDevice and fcntl is None:
+            raise ImportError("fcntl modülü bulunamadı; I2C_RDWR yalnızca Linux'ta kullanılabilir.")
+        self.path = bus if isinstance(bus, str) else '/dev/i2c-{}'.format(bus)
+        self.bus_number = bus if isinstance(bus, int) else None
+        self.device = device
+        self.fd = device.open(self.path, os.O_RDWR)
+        self.ioctls = 0
+
+        self._register = (ctypes.c_uint8 * 1)()
+        self._read_buffer = (ctypes.c_uint8 * MAX_BLOCK_SIZE)()
+        self._write_buffer = (ctypes.c_uint8 * (MAX_BLOCK_SIZE + 1))()
+        self._read_pointer = _pointer(self._read_buffer)
+        # Okuma: register yazma mesajı + okuma mesajı (repeated start); yazma: register ve veriler tek mesajda
+        self._read_msgs, self._write_msgs = (I2cMsg * 2)(), (I2cMsg * 1)()
+        self._address_msg, self._data_msg, self._write_msg = self._read_msgs[0], self._read_msgs[1], self._write_msgs[0]
+        self._address_msg.len, self._address_msg.buf = 1, _pointer(self._register)
+        self._data_msg.flags = I2C_M_RD
+        self._write_msg.buf = _pointer(self._write_buffer)
+        self._read_request = I2cRdwrIoctlData(self._read_msgs, 2)
+        self._write_request = I2cRdwrIoctlData(self._write_msgs, 1)
+        # read_i2c_block_data_into'nun son hedef tamponu ve onu gösteren ctypes nesnesi
+        self._into_buffer = self._into_view = self._into_pointer = None
+
+    # --- SMBus arayüzü ---
+
+    def read_byte_data(self, address, register):
+        self._read(address, register, self._read_pointer, 1)
+        return self._read_buffer[0]
+
+    def write_byte_data(self, address, register, value):
+        self.write_i2c_block_data(address, register, (value,))
+
+    def read_i2c_block_data(self, address, register, length=MAX_BLOCK_SIZE):
+        self._check_length(length)
+        self._read(address, register, self._read_pointer, length)
+        return self._read_buffer[:length]
+
+    def write_i2c_block_data(self, address, register, values):
+        length = len(values)
+        self._check_length(length)
+        buffer = self._write_buffer
+        buffer[0] = register
+        for index, value in enumerate(values, 1): buffer[index] = value
+        self._write_msg.addr, self._write_msg.len = address, length + 1
+        self._call(self._write_request)
+
+    def read_i2c_block_data_into(self, address, register, buffer):
+        """len(buffer) byte'ı doğrudan yazılabilir buffer'a okur; aynı tamponla tekrar çağrılırsa nesne oluşmaz."""
+        if buffer is not self._into_buffer:
+            length = len(buffer)
+            self._check_length(length)
+            self._into_view = (ctypes.c_uint8 * length).from_buffer(buffer)
+            self._into_pointer = _pointer(self._into_view)
+            self._into_buffer = buffer
+        self._read(address, register, self._into_pointer, len(buffer))
+
+    def close(self):
+        if self.fd is not None:
+            self.device.close(self.fd)
+            self.fd = None
+        self._into_buffer = self._into_view = self._into_pointer = None
+
+    # --- Yardımcılar ---
+
+    def _read(self, address, register, pointer, length):
+        self._register[0] = register
+        self._address_msg.addr = self._data_msg.addr = address
+        self._data_msg.len, self._data_msg.buf = length, pointer
+        self._call(self._read_request)
+
+    def _call(self, request):
+        self.ioctls += 1
+        self.device.ioctl(self.fd, I2C_RDWR, request)
+
+    @staticmethod
+    def _check_length(length):
+        if not 0 < length <= MAX_BLOCK_SIZE:
+            raise ValueError("Blok uzunluğu 1..{} byte olmalı: {}".format(MAX_BLOCK_SIZE, length))
@@ -1,6 +1,8 @@
 import i2c
+import imu_bringup
+import imu_settings
 import math
-import time
+import struct
 
 # MPU6050 I2C bus/address
 IMU_BUS     = 0x01
@@ -8,13 +10,14 @@ IMU_ADDRESS = 0x68
 
 # MPU6050 registers
 PWR_MGMT_1   = 0x6B
-GYRO_CONFIG  = 0x18
+GYRO_CONFIG  = 0x1B
 SMPLRT_DIV   = 0x19
 CONFIG       = 0x1A
 INT_ENABLE   = 0x38
 ACCEL_XOUT_H = 0x3B
 ACCEL_YOUT_H = 0x3D
 ACCEL_ZOUT_H = 0x3F
+TEMP_OUT_H   = 0x41
 GYRO_XOUT_H  = 0x43
 GYRO_YOUT_H  = 0x45
 GYRO_ZOUT_H  = 0x47
@@ -28,10 +31,15 @@ ZG_OFFSET_H  = 0x17
 ACCELERATION_SCALE_FACTOR = 16384.0
 GYROSCOPE_SCALE_FACTOR    =   131.0
 
+# ACCEL_XOUT_H..GYRO_ZOUT_L: accel x/y/z, temperature, gyro x/y/z (big-endian int16)
+SENSOR_DATA_LENGTH = 14
+SENSOR_DATA_FORMAT = struct.Struct('>7h')
+AXIS_DATA_FORMAT   = struct.Struct('>3h')
+
 
 class ImuDevice:
 
-    def __init__(self):
+    def __init__(self, bus=IMU_BUS, address=IMU_ADDRESS):
 
         self.acceleration_x = 0
         self.acceleration_y = 0
@@ -41,6 +49,8 @@ class ImuDevice:
         self.gyroscope_y = 0
         self.gyroscope_z = 0
 
+        self.temperature = 0
+
         self.acceleration_offset_x = 0
         self.acceleration_offset_y = 0
         self.acceleration_offset_z = 0
@@ -56,19 +66,11 @@ class ImuDevice:
         self.pitch_rate = 0
         self.yaw_rate   = 0
 
-        self.i2c_device = i2c.I2cDevice(IMU_BUS, IMU_ADDRESS)
-
-        # Write power management register
-        self.i2c_device.write_byte(PWR_MGMT_1, 0x01)
-
-        # Write configuration register
-        self.i2c_device.write_byte(CONFIG, 0x02)
+        self.i2c_device = i2c.I2cDevice(bus, address)
 
-        # Write gyroscope configuration register
-        self.i2c_device.write_byte(GYRO_CONFIG, 0x00)
-
-        # Write sample rate divider register
-        self.i2c_device.write_byte(SMPLRT_DIV, 0x04)
+        # Wake up and write SMPLRT_DIV..ACCEL_CONFIG in one block, only if the
+        # read-back differs (CONFIG=0x02, GYRO_CONFIG=0x00, SMPLRT_DIV=0x04)
+        imu_bringup.bring_up(self.i2c_device, imu_settings.DEFAULT_CONFIG)
 
     def __read_word__(self, register):
 
@@ -101,10 +103,8 @@ class ImuDevice:
         return -math.degrees(radians)
 
     def reset(self):
-        self.i2c_device.write_byte(PWR_MGMT_1, 0x81)
-        time.sleep(1)
-        self.i2c_device.write_byte(PWR_MGMT_1, 0x01)
-        time.sleep(1)
+        # Poll DEVICE_RESET and WHO_AM_I instead of sleeping, then wake up again
+        imu_bringup.bring_up(self.i2c_device, imu_settings.DEFAULT_CONFIG, reset_first=True)
 
     def reset_offsets(self):
 
@@ -124,15 +124,39 @@ class ImuDevice:
         self.gyroscope_offset_y = 0
         self.gyroscope_offset_z = 0
 
+    def read_raw_sample(self):
+
+        # Accel, temperature and gyro registers are read in a single burst so
+        # that all axes belong to the same sensor update
+        data = self.i2c_device.read_block(ACCEL_XOUT_H, SENSOR_DATA_LENGTH)
+        return SENSOR_DATA_FORMAT.unpack(data)
+
+    def read_sensor_data(self):
+        ax, ay, az, temperature, gx, gy, gz = self.read_raw_sample()
+
+        self.acceleration_x = ax - self.acceleration_offset_x
+        self.acceleration_y = ay - self.acceleration_offset_y
+        self.acceleration_z = az - self.acceleration_offset_z
+
+        self.temperature = temperature
+
+        self.gyroscope_x = gx - self.gyroscope_offset_x
+        self.gyroscope_y = gy - self.gyroscope_offset_y
+        self.gyroscope_z = gz - self.gyroscope_offset_z
+
     def read_acceleration_data(self):
-        self.acceleration_x = self.__read_word__(ACCEL_XOUT_H) - self.acceleration_offset_x
-        self.acceleration_y = self.__read_word__(ACCEL_YOUT_H) - self.acceleration_offset_y
-        self.acceleration_z = self.__read_word__(ACCEL_ZOUT_H) - self.acceleration_offset_z
+        ax, ay, az = AXIS_DATA_FORMAT.unpack(self.i2c_device.read_block(ACCEL_XOUT_H, 6))
+
+        self.acceleration_x = ax - self.acceleration_offset_x
+        self.acceleration_y = ay - self.acceleration_offset_y
+        self.acceleration_z = az - self.acceleration_offset_z
 
     def read_gyroscope_data(self):
-        self.gyroscope_x = self.__read_word__(GYRO_XOUT_H) - self.gyroscope_offset_x
-        self.gyroscope_y = self.__read_word__(GYRO_YOUT_H) - self.gyroscope_offset_y
-        self.gyroscope_z = self.__read_word__(GYRO_ZOUT_H) - self.gyroscope_offset_z
+        gx, gy, gz = AXIS_DATA_FORMAT.unpack(self.i2c_device.read_block(GYRO_XOUT_H, 6))
+
+        self.gyroscope_x = gx - self.gyroscope_offset_x
+        self.gyroscope_y = gy - self.gyroscope_offset_y
+        self.gyroscope_z = gz - self.gyroscope_offset_z
 
     def get_x_acceleration(self):
         return self.acceleration_x
@@ -235,9 +259,8 @@ class ImuDevice:
         print("X / Y / Z acceleration offsets: {} / {} / {}".format(self.acceleration_offset_x, self.acceleration_offset_y, self.acceleration_offset_z))
         print("X / Y / Z gyroscope    offsets: {} / {} / {}".format(self.gyroscope_offset_x   , self.gyroscope_offset_y   , self.gyroscope_offset_z   ))
 
-        self.read_acceleration_data()
-        self.read_gyroscope_data   ()
-        self.compute_angles        ()
+        self.read_sensor_data()
+        self.compute_angles  ()
 
         print("")
         print("X / Y / Z acceleration raw data:  {} / {} / {}".format(self.acceleration_x, self.acceleration_y, self.acceleration_z))
@@ -0,0 +1,172 @@
+# Görevi: Sensörü ayrı bir iş parçacığında sabit hızda okuyup örnekleri önceden
+# ayrılmış bir halka tampona yazmak. Okuyan taraf (kontrol döngüsü, telemetri)
+# yazanı hiçbir zaman bekletmez; geride kalan okuyucu sadece kendi örneklerini
+# kaybeder ve bunu kayıp sayacında görür.
+#
+#     acquisition = sensor.start_acquisition(rate=500)
+#     reader = acquisition.ring.reader()
+#     for timestamp_ns, sample in reader.read(): ...
+
+import array
+import threading
+import time
+
+SAMPLE_FIELDS = 7  # ax, ay, az, temp, gx, gy, gz
+
+
+class SampleRing:
+    """Tek yazıcılı, kilitsiz halka tampon.
+
+    Yazıcı önce yuvayı doldurur, sonra written sayacını artırır. Okuyucular
+    kopyaladıkları yuvanın bu arada üzerine yazılıp yazılmadığını sayacı
+    yeniden okuyarak kontrol eder (seqlock mantığı), böylece kilit gerekmez.
+    written - capacity numaralı örneğin yuvası, yazıcının o an doldurduğu
+    yuvadır; bu yüzden okuyucular yalnızca son capacity - 1 örneğe güvenir.
+    """
+
+    def __init__(self, capacity=1024):
+        if capacity < 2: raise ValueError("Halka kapasitesi en az 2 olmalı: {}".format(capacity))
+        self.capacity = capacity
+        self.values = array.array('i', bytes(4 * SAMPLE_FIELDS * capacity))
+        self.timestamps = array.array('q', bytes(8 * capacity))
+        self.written = 0
+
+    def push(self, timestamp_ns, sample):
+        """Sadece yazıcı iş parçacığından çağrılmalıdır."""
+        slot = self.written % self.capacity
+        base = slot * SAMPLE_FIELDS
+        values = self.values
+        values[base], values[base + 1], values[base + 2], values[base + 3], \
+            values[base + 4], values[base + 5], values[base + 6] = sample
+        self.timestamps[slot] = timestamp_ns
+        self.written += 1
+
+    def push_values(self, timestamp_ns, values):
+        """push() gibi, ancak örnek 7 elemanlı bir array('i')'dir; dilim kopyasıyla yazılır, nesne oluşmaz."""
+        slot = self.written % self.capacity
+        base = slot * SAMPLE_FIELDS
+        self.values[base:base + SAMPLE_FIELDS] = values
+        self.timestamps[slot] = timestamp_ns
+        self.written += 1
+
+    def latest(self):
+        """En son örneği (timestamp_ns, sample) olarak döndürür; henüz örnek yoksa None."""
+        while True:
+            index = self.written - 1
+            if index < 0:
+                return None
+            item = self._copy(index)
+            if self.written - index < self.capacity:
+                return item
+
+    def read_since(self, cursor):
+        """cursor'dan sonraki örnekleri döndürür: (örnekler, yeni cursor, kaybolan örnek sayısı)."""
+        end = self.written
+        start = max(cursor, end - self.capacity + 1)
+        items = [self._copy(index) for index in range(start, end)]
+        # Kopyalama sırasında üzerine yazılan (ya da yazılmakta olan) yuvalar kayıp sayılır
+        valid_from = max(start, self.written - self.capacity + 1)
+        if valid_from > start:
+            items = items[valid_from - start:]
+        return items, end, valid_from - cursor
+
+    def nearest(self, timestamp_ns):
+        """Zaman damgası timestamp_ns'e en yakın örneği döndürür; tampon boşsa None."""
+        while True:
+            end = self.written
+            oldest = max(0, end - self.capacity + 1)
+            low, high = oldest, end - 1
+            if high < 0:
+                return None
+            # Zaman damgaları artan sırada olduğundan ikili arama yapılır
+            timestamps, capacity = self.timestamps, self.capacity
+            while low < high:
+                middle = (low + high) // 2
+                if timestamps[middle % capacity] < timestamp_ns:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low > oldest and \
+                    timestamp_ns - timestamps[(low - 1) % capacity] < timestamps[low % capacity] - timestamp_ns:
+                low -= 1
+            item = self._copy(low)
+            if self.written - low < self.capacity:
+                return item
+
+    def reader(self, from_latest=True):
+        return SampleReader(self, self.written if from_latest else 0)
+
+    def _copy(self, index):
+        slot = index % self.capacity
+        base = slot * SAMPLE_FIELDS
+        return self.timestamps[slot], tuple(self.values[base:base + SAMPLE_FIELDS])
+
+
+class SampleReader:
+    """Halka tampon üzerinde kendi konumunu ve kayıp sayacını tutan okuyucu."""
+
+    def __init__(self, ring, cursor):
+        self.ring, self.cursor, self.dropped = ring, cursor, 0
+
+    def read(self):
+        """Son okumadan bu yana gelen tüm örnekleri döndürür, asla beklemez."""
+        items, self.cursor, dropped = self.ring.read_since(self.cursor)
+        self.dropped += dropped
+        return items
+
+    @property
+    def pending(self):
+        return self.ring.written - self.cursor
+
+
+class AcquisitionThread(threading.Thread):
+    """read_sample() çağrısını sabit hızda (mutlak zaman hedefleriyle) çalıştırıp halka tampona yazar.
+
+    read_sample ofsetleri uygulanmış 7 elemanlı bir demet döndürmelidir
+    (ör. imu_kalman.ImuDevice.read_sample). read_into verilirse (ör.
+    ImuDevice.read_sample_into) örnek her periyotta aynı array('i') tampona
+    okunur ve halkaya oradan kopyalanır; kararlı durumda okuma başına bellek
+    ayrılmaz. Bus hataları iş parçacığını durdurmaz, errors sayacında biriktirilir.
+    """
+
+    def __init__(self, read_sample, rate=200.0, capacity=1024, read_into=None):
+        super().__init__(name='imu-acquisition', daemon=True)
+        self.read_sample, self.read_into = read_sample, read_into
+        self._scratch = array.array('i', bytes(4 * SAMPLE_FIELDS))
+        self.period_ns = int(1e9 / rate)
+        self.ring = SampleRing(capacity) if capacity else None # Alt sınıflar kendi tamponlarını kullanabilir
+        self.missed_deadlines, self.errors, self.last_error = 0, 0, None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        period, acquire = self.period_ns, self.acquire
+        deadline = time.perf_counter_ns()
+        while not self._stop_event.is_set():
+            acquire()
+
+            deadline += period
+            now = time.perf_counter_ns()
+            if now > deadline:
+                # Geride kalındıysa kaçırılan periyotlar atlanır, yakalamaya çalışılmaz
+                missed = (now - deadline) // period + 1
+                self.missed_deadlines += missed
+                deadline += missed * period
+            self._stop_event.wait((deadline - now) / 1e9)
+
+    def acquire(self):
+        """Her periyotta bir kez çağrılır: bir örnek okuyup tampona yazar."""
+        try:
+            if self.read_into is not None:
+                self.ring.push_values(time.perf_counter_ns(), self.read_into(self._scratch))
+            else:
+                self.ring.push(time.perf_counter_ns(), self.read_sample())
+        except OSError as error:
+            self.errors, self.last_error = self.errors + 1, error
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+    @property
+    def rate(self):
+        return 1e9 / self.period_ns
@@ -1,16 +1,28 @@
 # Bu dosyanın adı: imu_ve_kalibrasyon_araci.py (Düzeltilmiş Hali)
 # Görevi: ImuDevice sınıfını ve kalibrasyon fonksiyonunu tek bir modülde birleştirmek.
 
-import smbus
+try:
+    import smbus
+except ImportError:  # Donanımsız makinelerde (CI) mpu6050_emulator ile çalışmak için
+    smbus = None
+import imu_bringup
+import imu_settings
 import json
 import math
+import struct
 import time
 import os
+import streaming_calibration
 
 class I2cDevice:
     """I2C iletişimini basitleştiren aracı sınıf."""
     def __init__(self, bus, address):
-        self.bus = smbus.SMBus(bus)
+        # bus: bus numarası ya da SMBus arayüzüne sahip bir nesne (ör. mpu6050_emulator.EmulatedBus)
+        if isinstance(bus, int):
+            if smbus is None:
+                raise ImportError("smbus modülü bulunamadı; SMBus benzeri bir bus nesnesi verin.")
+            bus = smbus.SMBus(bus)
+        self.bus = bus
         self.address = address
 
     def read_byte(self, register):
@@ -19,17 +31,25 @@ class I2cDevice:
     def write_byte(self, register, value):
         self.bus.write_byte_data(self.address, register, value)
 
+    def read_block(self, register, length):
+        """Ardışık registerları tek bir I2C işleminde okur (en fazla 32 byte)."""
+        return bytes(self.bus.read_i2c_block_data(self.address, register, length))
+
+    def write_block(self, register, values):
+        self.bus.write_i2c_block_data(self.address, register, list(values))
+
 class ImuDevice:
     """MPU6050 sensörünü temsil eden ve onunla konuşan ana sınıf."""
     IMU_BUS = 1
     IMU_ADDRESS = 0x68
     PWR_MGMT_1 = 0x6B
-    GYRO_CONFIG = 0x18
+    GYRO_CONFIG = 0x1B
     SMPLRT_DIV = 0x19
     CONFIG = 0x1A
     ACCEL_XOUT_H = 0x3B
     ACCEL_YOUT_H = 0x3D
     ACCEL_ZOUT_H = 0x3F
+    TEMP_OUT_H = 0x41
     GYRO_XOUT_H = 0x43
     GYRO_YOUT_H = 0x45
     GYRO_ZOUT_H = 0x47
@@ -41,19 +61,22 @@ class ImuDevice:
     ZG_OFFSET_H = 0x17
     ACCELERATION_SCALE_FACTOR = 16384.0
     GYROSCOPE_SCALE_FACTOR = 131.0
+    # ACCEL_XOUT_H..GYRO_ZOUT_L: ivme x/y/z, sıcaklık, jiroskop x/y/z
+    SENSOR_DATA_LENGTH = 14
+    SENSOR_DATA_FORMAT = struct.Struct('>7h')
+    AXIS_DATA_FORMAT = struct.Struct('>3h')
 
-    def __init__(self):
-        self.i2c_device = I2cDevice(self.IMU_BUS, self.IMU_ADDRESS)
+    def __init__(self, bus=IMU_BUS, address=IMU_ADDRESS):
+        self.i2c_device = I2cDevice(bus, address)
         self.acceleration_x, self.acceleration_y, self.acceleration_z = 0, 0, 0
         self.gyroscope_x, self.gyroscope_y, self.gyroscope_z = 0, 0, 0
+        self.temperature = 0
         self.acceleration_offset_x, self.acceleration_offset_y, self.acceleration_offset_z = 0, 0, 0
         self.gyroscope_offset_x, self.gyroscope_offset_y, self.gyroscope_offset_z = 0, 0, 0
         self.roll, self.pitch = 0, 0
         self.roll_rate, self.pitch_rate, self.yaw_rate = 0, 0, 0
-        self.i2c_device.write_byte(self.PWR_MGMT_1, 0x01)
-        self.i2c_device.write_byte(self.CONFIG, 0x02)
-        self.i2c_device.write_byte(self.GYRO_CONFIG, 0x00)
-        self.i2c_device.write_byte(self.SMPLRT_DIV, 0x04)
+        # Uyandırma ve ayarlar (CONFIG=0x02, GYRO_CONFIG=0x00, SMPLRT_DIV=0x04) tek blokta, sadece farklıysa yazılır
+        imu_bringup.bring_up(self.i2c_device, imu_settings.DEFAULT_CONFIG)
 
     def __read_word__(self, register):
         higher_byte = self.i2c_device.read_byte(register)
@@ -71,15 +94,32 @@ class ImuDevice:
         self.acceleration_offset_x, self.acceleration_offset_y, self.acceleration_offset_z = 0, 0, 0
         self.gyroscope_offset_x, self.gyroscope_offset_y, self.gyroscope_offset_z = 0, 0, 0
 
+    def read_raw_sample(self):
+        """İvme, sıcaklık ve jiroskop verisini tek bir I2C işleminde okur (ofsetsiz)."""
+        data = self.i2c_device.read_block(self.ACCEL_XOUT_H, self.SENSOR_DATA_LENGTH)
+        return self.SENSOR_DATA_FORMAT.unpack(data)
+
+    def read_sensor_data(self):
+        ax, ay, az, temperature, gx, gy, gz = self.read_raw_sample()
+        self.acceleration_x = ax - self.acceleration_offset_x
+        self.acceleration_y = ay - self.acceleration_offset_y
+        self.acceleration_z = az - self.acceleration_offset_z
+        self.temperature = temperature
+        self.gyroscope_x = gx - self.gyroscope_offset_x
+        self.gyroscope_y = gy - self.gyroscope_offset_y
+        self.gyroscope_z = gz - self.gyroscope_offset_z
+
     def read_acceleration_data(self):
-        self.acceleration_x = self.__read_word__(self.ACCEL_XOUT_H) - self.acceleration_offset_x
-        self.acceleration_y = self.__read_word__(self.ACCEL_YOUT_H) - self.acceleration_offset_y
-        self.acceleration_z = self.__read_word__(self.ACCEL_ZOUT_H) - self.acceleration_offset_z
+        ax, ay, az = self.AXIS_DATA_FORMAT.unpack(self.i2c_device.read_block(self.ACCEL_XOUT_H, 6))
+        self.acceleration_x = ax - self.acceleration_offset_x
+        self.acceleration_y = ay - self.acceleration_offset_y
+        self.acceleration_z = az - self.acceleration_offset_z
 
     def read_gyroscope_data(self):
-        self.gyroscope_x = self.__read_word__(self.GYRO_XOUT_H) - self.gyroscope_offset_x
-        self.gyroscope_y = self.__read_word__(self.GYRO_YOUT_H) - self.gyroscope_offset_y
-        self.gyroscope_z = self.__read_word__(self.GYRO_ZOUT_H) - self.gyroscope_offset_z
+        gx, gy, gz = self.AXIS_DATA_FORMAT.unpack(self.i2c_device.read_block(self.GYRO_XOUT_H, 6))
+        self.gyroscope_x = gx - self.gyroscope_offset_x
+        self.gyroscope_y = gy - self.gyroscope_offset_y
+        self.gyroscope_z = gz - self.gyroscope_offset_z
 
     def get_x_acceleration(self): return self.acceleration_x
     def get_y_acceleration(self): return self.acceleration_y
@@ -100,7 +140,7 @@ class ImuDevice:
         self.roll = math.degrees(math.atan2(self.acceleration_y, math.sqrt(self.acceleration_x**2 + self.acceleration_z**2)))
         self.pitch = math.degrees(math.atan2(-self.acceleration_x, math.sqrt(self.acceleration_y**2 + self.acceleration_z**2)))
 
-def perform_calibration(filename='setup.json'):
+def perform_calibration(filename='setup.json', bus=ImuDevice.IMU_BUS):
     os.system("clear")
     print("\n" + "="*40)
     print("      IMU KALİBRASYONU BAŞLATILIYOR")
@@ -116,35 +156,16 @@ def perform_calibration(filename='setup.json'):
 
     # --- HATA BURADAYDI ---
     # imu.ImuDevice() yerine doğrudan ImuDevice() olarak çağırıyoruz
-    imu_device = ImuDevice()
+    imu_device = ImuDevice(bus=bus)
     # --- DÜZELTME SONU ---
     
     imu_device.reset_offsets()
 
-    loop_count = 10000
-    measures = {'ax': 0, 'ay': 0, 'az': 0, 'gx': 0, 'gy': 0, 'gz': 0}
-
-    print(f"{loop_count} adet veri toplanıyor, lütfen bekleyin...")
-
-    for i in range(loop_count):
-        print("\b" + ['/', '-', '\\', '|'][i % 4], end='', flush=True)
-        imu_device.read_acceleration_data()
-        imu_device.read_gyroscope_data()
-        measures['ax'] += imu_device.get_x_acceleration()
-        measures['ay'] += imu_device.get_y_acceleration()
-        measures['az'] += imu_device.get_z_acceleration()
-        measures['gx'] += imu_device.get_x_gyroscope()
-        measures['gy'] += imu_device.get_y_gyroscope()
-        measures['gz'] += imu_device.get_z_gyroscope()
-
-    print("\n\nVeri toplama tamamlandı. Ofsetler hesaplanıyor...")
-
-    setup_data['ACCELERATION_X_OFFSET'] = int(measures['ax'] / loop_count)
-    setup_data['ACCELERATION_Y_OFFSET'] = int(measures['ay'] / loop_count)
-    setup_data['ACCELERATION_Z_OFFSET'] = int(measures['az'] / loop_count) - 16384
-    setup_data['GYROSCOPE_X_OFFSET'] = int(measures['gx'] / loop_count)
-    setup_data['GYROSCOPE_Y_OFFSET'] = int(measures['gy'] / loop_count)
-    setup_data['GYROSCOPE_Z_OFFSET'] = int(measures['gz'] / loop_count)
+    print("Veri toplanıyor, ortalamalar kesinleşince duracak...")
+
+    result = streaming_calibration.calibrate(imu_device, accel_scale=imu_device.ACCELERATION_SCALE_FACTOR)
+    streaming_calibration.print_result(result)
+    setup_data.update(result.offsets)
 
     with open(filename, "w") as f:
         json.dump(setup_data, f, indent=4)
@@ -0,0 +1,119 @@
+# Görevi: asyncio tabanlı servislerin sensörü olay döngüsünü bloklamadan
+# okuyabilmesi. Bus erişimi ve zamanlama ayrı bir iş parçacığında yapılır,
+# olay döngüsüne sadece hazır partiler aktarılır.
+#
+#     async with sensor.stream_samples(rate=500, batch_size=25) as stream:
+#         async for batch in stream:
+#             for timestamp_ns, sample in batch: ...
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+_END = object() # Üretici bitti: sonraki __anext__ StopAsyncIteration yükseltir
+
+
+class ImuStream:
+    """read() fonksiyonunu sabit hızda çağırıp (timestamp_ns, değer) partileri üreten async iterator.
+
+    Tüketici yavaşlarsa en fazla max_batches parti bekletilir; ardından
+    drop_oldest=False iken okuma durur (geri basınç), True iken en eski parti
+    atılır ve dropped_batches artar. Bus hatası (OSError) yalnızca o örneği
+    düşürür: errors ve last_error'a işlenir, akış sürer. Diğer hatalar
+    tüketiciye bir kez yükseltilir, sonraki çağrılar StopAsyncIteration verir. aclose() okuma
+    iş parçacığını durdurur ve (olay döngüsünü bloklamadan) bitmesini bekler;
+    döndüğünde bus'a erişim kalmaz.
+    """
+
+    def __init__(self, read, rate=200.0, batch_size=1, max_batches=8, drop_oldest=False):
+        self.read, self.batch_size, self.drop_oldest = read, batch_size, drop_oldest
+        self.period_ns = int(1e9 / rate)
+        self.max_batches = max_batches
+        self.dropped_batches, self.missed_deadlines = 0, 0
+        self.errors, self.last_error = 0, None
+        self._queue, self._task, self._executor = None, None, None
+        self._deadline = None
+        self._stopping, self._finished, self._closed = threading.Event(), False, False
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_batches)
+            # Tek iş parçacığı: bus erişimleri sıralı kalır
+            self._executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix='imu-stream')
+            self._task = asyncio.get_running_loop().create_task(self._produce())
+        return self
+
+    async def aclose(self):
+        self._closed = True
+        if self._task is not None:
+            self._stopping.set() # _read_batch okumalar arasında bakar, beklemedeyse hemen uyanır
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            # Sürmekte olan okuma bitene dek beklenir; shutdown olay döngüsü dışında çalışır
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+            self._task = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        await self.start()
+        if self._finished and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _END:
+            raise StopAsyncIteration
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _produce(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._stopping.is_set():
+                batch = await loop.run_in_executor(self._executor, self._read_batch)
+                if self.drop_oldest and self._queue.full():
+                    self._queue.get_nowait()
+                    self.dropped_batches += 1
+                await self._queue.put(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # Kalıcı hata (bus hatası dışında) tüketiciye bir sonraki __anext__ çağrısında iletilir
+            await self._queue.put(error)
+        finally:
+            self._finished = True
+            if not self._queue.full(): self._queue.put_nowait(_END) # Bekleyen tüketici uyansın
+
+    def _read_batch(self):
+        # İş parçacığında çalışır: mutlak zaman hedefleriyle batch_size örnek okur
+        period, batch = self.period_ns, []
+        now = time.perf_counter_ns()
+        if self._deadline is None or now - self._deadline > period:
+            if self._deadline is not None:
+                self.missed_deadlines += (now - self._deadline) // period
+            self._deadline = now  # Geri basınçtan sonra yeniden hizala
+        for _ in range(self.batch_size):
+            delay = self._deadline - time.perf_counter_ns()
+            # aclose() çağrıldıysa bus'a yeni erişim yapılmaz; bekleme de kesilir
+            if self._stopping.is_set() or (delay > 0 and self._stopping.wait(delay / 1e9)):
+                break
+            timestamp_ns = time.perf_counter_ns()
+            try:
+                batch.append((timestamp_ns, self.read()))
+            except OSError as error: # Tek bir bus hatası tek bir örneğe mal olur
+                self.errors, self.last_error = self.errors + 1, error
+            self._deadline += period
+        return batch
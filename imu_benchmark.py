@@ -0,0 +1,462 @@
+# Görevi: Veri okuma, çözme, filtreleme ve kalibrasyon aşamalarını emüle
+# edilmiş bir bus üzerinde ayrı ayrı ölçüp sonuçları JSON olarak yazmak.
+#
+#     python imu_benchmark.py --latency 100e-6 --output bench.json
+#
+# Gecikme, gerçek bir bus'taki işlem başına süreyi taklit eder (400 kHz'de
+# 14 byte'lık bir blok okuma yaklaşık 0.4 ms sürer).
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import i2c_rdwr
+import imu
+import imu_acquisition
+import imu_decimation
+import imu_guncel
+import imu_fusion
+import imu_kalman
+import imu_manager
+import loop_scheduler
+import mpu6050_emulator
+
+
+def make_bus(args, **emulator_options):
+    emulator = mpu6050_emulator.Mpu6050Emulator(seed=args.seed, **emulator_options)
+    return mpu6050_emulator.EmulatedBus(emulator, latency=args.latency, byte_latency=args.byte_latency)
+
+
+def measure(function, count):
+    """function'ı count kez çağırır, çağrı başına süreyi (ns) döndürür."""
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        function()
+    return (time.perf_counter_ns() - start) / count
+
+
+def bench_sample_reads(args):
+    """Her sürücü varyantı için örnek başına bus işlemi ve süre."""
+
+    def legacy_word_reads(device):
+        # Blok okuma öncesi yol: eksen başına iki read_byte_data
+        def read():
+            for register in range(device.ACCEL_XOUT_H, device.ACCEL_XOUT_H + 6, 2):
+                device._read_word(register)
+            for register in range(device.GYRO_XOUT_H, device.GYRO_XOUT_H + 6, 2):
+                device._read_word(register)
+        return read
+
+    variants = {
+        'imu.read_sensor_data': lambda bus: imu.ImuDevice(bus=bus).read_sensor_data,
+        'imu.read_acceleration_data+read_gyroscope_data': lambda bus: _both(imu.ImuDevice(bus=bus)),
+        'imu_guncel.read_sensor_data': lambda bus: imu_guncel.ImuDevice(bus=bus).read_sensor_data,
+        'imu_kalman.read_sensor_data': lambda bus: imu_kalman.ImuDevice(bus=bus).read_sensor_data,
+        'imu_kalman._read_word (per axis, legacy)': lambda bus: legacy_word_reads(imu_kalman.ImuDevice(bus=bus)),
+        # I2C_RDWR transport'u, emüle bus'a bağlı sahte /dev/i2c-N üzerinden (ioctl başına bir işlem)
+        'imu_kalman.read_sensor_data (rdwr transport)': lambda bus: imu_kalman.ImuDevice(
+            bus=i2c_rdwr.I2cRdwrBus(1, device=mpu6050_emulator.FakeI2cCharDevice(bus))).read_sensor_data,
+    }
+
+    results = {}
+    for name, factory in variants.items():
+        bus = make_bus(args)
+        read = factory(bus)
+        bus.reset_statistics()
+        ns = measure(read, args.samples)
+        results[name] = {
+            'transactions_per_sample': bus.transactions / args.samples,
+            'bytes_per_sample': (bus.bytes_read + bus.bytes_written) / args.samples,
+            'ns_per_sample': ns,
+            'max_rate_hz': 1e9 / ns,
+        }
+    results['imu_kalman.read_fifo'] = bench_fifo(args)
+    return results
+
+
+def _both(device):
+    def read():
+        device.read_acceleration_data()
+        device.read_gyroscope_data()
+    return read
+
+
+def bench_fifo(args):
+    """FIFO ile okumada örnek başına işlem ve süre (sensör 1 kHz'de)."""
+    bus = make_bus(args)
+    device = imu_kalman.ImuDevice(bus=bus)
+    device.i2c.write_byte(device.SMPLRT_DIV, 0x00)
+    device.enable_fifo()
+    bus.reset_statistics()
+
+    # Sadece read_fifo içinde geçen süre sayılır; aradaki bekleme sensörün dolmasını sağlar
+    samples, busy = 0, 0
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter_ns()
+        samples += len(device.read_fifo().samples)
+        busy += time.perf_counter_ns() - start
+        time.sleep(0.01)
+    samples = max(samples, 1)
+    return {
+        'transactions_per_sample': bus.transactions / samples,
+        'bytes_per_sample': (bus.bytes_read + bus.bytes_written) / samples,
+        'ns_per_sample': busy / samples,
+        'samples': samples,
+        'overflows': device.fifo.overflows,
+    }
+
+
+class ListKalmanAngle:
+    """Karşılaştırma için KalmanAngle'ın eski, iç içe liste kullanan hali."""
+
+    def __init__(self):
+        self.QAngle, self.QBias, self.RMeasure = 0.001, 0.003, 0.03
+        self.angle, self.bias, self.rate = 0.0, 0.0, 0.0
+        self.P = [[0.0, 0.0], [0.0, 0.0]]
+
+    def getAngle(self, newAngle, newRate, dt):
+        self.rate = newRate - self.bias
+        self.angle += dt * self.rate
+        self.P[0][0] += dt * (dt * self.P[1][1] - self.P[0][1] - self.P[1][0] + self.QAngle)
+        self.P[0][1] -= dt * self.P[1][1]
+        self.P[1][0] -= dt * self.P[1][1]
+        self.P[1][1] += self.QBias * dt
+        y = newAngle - self.angle
+        s = self.P[0][0] + self.RMeasure
+        K = [self.P[0][0] / s, self.P[1][0] / s]
+        self.angle += K[0] * y
+        self.bias += K[1] * y
+        P00Temp, P01Temp = self.P[0][0], self.P[0][1]
+        self.P[0][0] -= K[0] * P00Temp
+        self.P[0][1] -= K[0] * P01Temp
+        self.P[1][0] -= K[1] * P00Temp
+        self.P[1][1] -= K[1] * P01Temp
+        return self.angle
+
+
+def bench_kalman(args):
+    """Tek eksen ve roll+pitch için filtre güncelleme başına maliyet."""
+    results = {}
+    for name, factory in (('list_based_reference', ListKalmanAngle), ('KalmanAngle', imu_kalman.KalmanAngle)):
+        kalman = factory()
+        results[name] = {'ns_per_update': measure(lambda: kalman.getAngle(1.0, 0.5, 0.005), args.updates)}
+
+    kalman_x, kalman_y = ListKalmanAngle(), ListKalmanAngle()
+
+    def two_list_filters():
+        kalman_x.getAngle(1.0, 0.5, 0.005)
+        kalman_y.getAngle(-2.0, 0.1, 0.005)
+    results['roll+pitch list_based_reference x2'] = {'ns_per_update': measure(two_list_filters, args.updates)}
+
+    kalman_x, kalman_y = imu_kalman.KalmanAngle(), imu_kalman.KalmanAngle()
+
+    def two_filters():
+        kalman_x.getAngle(1.0, 0.5, 0.005)
+        kalman_y.getAngle(-2.0, 0.1, 0.005)
+    results['roll+pitch KalmanAngle x2'] = {'ns_per_update': measure(two_filters, args.updates)}
+
+    fused = imu_kalman.KalmanRollPitch()
+    results['roll+pitch KalmanRollPitch'] = {
+        'ns_per_update': measure(lambda: fused.update(1.0, -2.0, 0.5, 0.1, 0.005), args.updates)}
+    return results
+
+
+def bench_fusion(args):
+    """Füzyon motoru başına fuse() maliyeti ve bu maliyetle ulaşılabilecek en yüksek hız."""
+    results = {}
+    for name in sorted(imu_fusion.ENGINES):
+        ns = imu_fusion.create(name).update_cost(args.updates)
+        results[name] = {'ns_per_update': ns, 'max_rate_hz': 1e9 / ns}
+
+    # FIFO partisi gibi ham örneklerin toplu işlenmesi
+    samples = [(300, -200, 16300, -3920, 150, -80, 40)] * 64
+    for name in sorted(imu_fusion.ENGINES):
+        engine = imu_fusion.create(name)
+        ns = measure(lambda: engine.fuse_batch(samples, 0.001, 16384.0, 131.0), max(1, args.updates // 64)) / 64
+        results[name]['ns_per_sample_fuse_batch'] = ns
+    return results
+
+
+def bench_decimation(args, factor=10, batch=80):
+    """1 kHz FIFO partisi (batch örnek) için giriş örneği başına süzme+seyreltme ve füzyon maliyeti (ns)."""
+    samples = [(300 + i % 7, -200, 16300 - i % 5, -3920, 150, -80 + i % 3, 40) for i in range(batch)]
+    count = max(1, args.updates // batch)
+    results = {}
+    for taps in ('boxcar', 'fir'):
+        decimator = imu_decimation.Decimator(factor, taps)
+        results[taps] = {'taps': len(decimator.taps), 'vectorized': imu_decimation.np is not None,
+                         'ns_per_input_sample': measure(lambda: decimator.process(samples), count) / batch}
+    for name in ('kalman', 'madgwick'):
+        engine, decimator = imu_fusion.create(name), imu_decimation.Decimator(factor, 'fir')
+
+        def decimated():
+            engine.fuse_batch(decimator.process(samples)[1], 0.001 * factor, 16384.0, 131.0)
+        results[name] = {
+            'ns_per_input_sample_full_rate': measure(lambda: engine.fuse_batch(samples, 0.001, 16384.0, 131.0), count) / batch,
+            'ns_per_input_sample_decimated': measure(decimated, count) / batch,
+        }
+    return results
+
+
+def bench_compute_angles(args):
+    """compute_angles maliyeti; imu_kalman varyantı okuma + Kalman içerir."""
+    results = {}
+    for name, module in (('imu', imu), ('imu_guncel', imu_guncel)):
+        device = module.ImuDevice(bus=make_bus(args))
+        device.read_sensor_data()
+        results[name] = {'ns_per_call': measure(device.compute_angles, args.updates)}
+
+    bus = make_bus(args)
+    device = imu_kalman.ImuDevice(bus=bus)
+    bus.reset_statistics()
+    results['imu_kalman (read + filter)'] = {
+        'ns_per_call': measure(device.compute_angles, args.samples),
+        'transactions_per_call': bus.transactions / args.samples,
+    }
+    return results
+
+
+def bench_dt_integration(args, rates=(130.0, 150.0, 300.0)):
+    """compute_angles'ın sensör hızından (200 Hz) farklı çağrı hızlarında füzyona verdiği dt toplamı.
+
+    error_periods, dt toplamının geçen süreden farkıdır (sensör periyodu
+    cinsinden); quantize_dt açıkken bile en fazla 0.5 olmalıdır.
+    """
+    duration = max(0.2, args.duration / 2)
+    results = {}
+    for quantize in (False, True):
+        for rate in rates:
+            device = imu_kalman.ImuDevice(bus=make_bus(args))
+            device.quantize_dt, integrated = quantize, [0.0]
+            update_angles = device.update_angles
+
+            def update(dt, update_angles=update_angles, integrated=integrated):
+                integrated[0] += dt
+                update_angles(dt)
+
+            def step(device=device):
+                device.compute_angles() # False (yeni örnek yok) döngüyü durdurmasın
+            device.update_angles = update
+            device.timestamp_ns = device._last_timestamp_ns = start = time.perf_counter_ns()
+            loop_scheduler.FixedRateLoop(step, rate=rate).run(duration)
+            elapsed = (device.timestamp_ns - start) / 1e9
+            results['{} Hz{}'.format(rate, ' quantize_dt' if quantize else '')] = {
+                'elapsed_s': elapsed, 'integrated_dt_s': integrated[0],
+                'error_periods': (integrated[0] - elapsed) * 1e9 / device.sample_period_ns,
+            }
+    return results
+
+
+def bench_end_to_end(args):
+    """Okuma + açı hesabının art arda çalıştırıldığında ulaşılan örnekleme hızı."""
+    results = {}
+    for name, module in (('imu', imu), ('imu_guncel', imu_guncel)):
+        device = module.ImuDevice(bus=make_bus(args))
+
+        def step(device=device):
+            device.read_sensor_data()
+            device.compute_angles()
+        results[name] = _run_for(step, args.duration)
+
+    device = imu_kalman.ImuDevice(bus=make_bus(args))
+    results['imu_kalman'] = _run_for(device.compute_angles, args.duration)
+    return results
+
+
+def bench_manager(args, rate=200.0):
+    """İki sensörlü bir bus'ta ImuManager start/read_aligned/stop; örnek sayısı ve hizalama farkı."""
+    emulators = [mpu6050_emulator.Mpu6050Emulator(address=address, seed=args.seed) for address in (0x68, 0x69)]
+    pool = imu_manager.BusPool()
+    pool.register(1, mpu6050_emulator.EmulatedBus(*emulators, latency=args.latency, byte_latency=args.byte_latency))
+    with imu_manager.ImuManager(pool) as manager:
+        manager.add(1, 0x68, 'sol')
+        manager.add(1, 0x69, 'sag')
+        manager.start(rate=rate)
+        time.sleep(max(0.1, args.duration / 4))
+        aligned = manager.read_aligned()
+        written = {name: manager.ring(name).written for name in manager.devices}
+        worker = manager.workers[1]
+        manager.stop()
+    return {'rate_hz': rate, 'samples': written, 'errors': worker.errors,
+            'aligned': aligned is not None, 'skew_us': aligned.skew_ns / 1e3 if aligned else None}
+
+
+def _run_for(step, duration):
+    count, start = 0, time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        step()
+        count += 1
+    return {'rate_hz': count / (time.perf_counter() - start), 'iterations': count}
+
+
+class _FrozenBus:
+    """Örnek registerlarını (0x3B..) hep aynı önceden ayrılmış kareden veren bus sarmalayıcısı.
+
+    Bellek ölçümünde emülatörün kendi ayırmaları (gürültü, listeler) sonuca
+    karışmasın diye kullanılır; diğer tüm işlemler asıl bus'a gider.
+    """
+
+    def __init__(self, bus, address=0x68):
+        self._bus = bus
+        self._frame = memoryview(bytes(bus.read_i2c_block_data(address, imu_kalman.ImuDevice.ACCEL_XOUT_H, 14)))
+
+    def read_i2c_block_data_into(self, address, register, buffer):
+        if register == imu_kalman.ImuDevice.ACCEL_XOUT_H and len(buffer) == len(self._frame):
+            buffer[:] = self._frame
+        else:
+            buffer[:] = bytes(self._bus.read_i2c_block_data(address, register, len(buffer)))
+
+    def read_i2c_block_data(self, address, register, length=32):
+        if register == imu_kalman.ImuDevice.ACCEL_XOUT_H and length == len(self._frame):
+            return list(self._frame)
+        return self._bus.read_i2c_block_data(address, register, length)
+
+    def __getattr__(self, name):
+        return getattr(self._bus, name)
+
+
+def _allocations(function, count, warmup=100):
+    """Kararlı durumda count çağrının (net, tepe) bellek artışı, byte (tracemalloc)."""
+    for _ in range(warmup):
+        function()
+    tracemalloc.start()
+    try:
+        function() # Ölçüm çerçevesinin ilk çağrı ayırmaları sayılmasın
+        calls = itertools.repeat(None, count) # Döngü sayacı da ölçümden önce oluşturulur
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in calls:
+            function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current - before, peak - before
+
+
+def bench_allocations(args):
+    """Örnek okuma yollarının okuma başına bellek ayırması.
+
+    net_bytes_per_sample örnek başına kalıcı büyümeyi (0 olmalı), peak_bytes okuma
+    sırasında anlık olarak ayrılıp hemen geri verilen en büyük miktarı
+    gösterir. read_sample_into yolunda yalnızca tek tük geçici int nesneleri
+    kalır; liste, demet, sözlük oluşmaz.
+    """
+    device = imu_kalman.ImuDevice(bus=_FrozenBus(make_bus(args)))
+    device.load_offsets({'ACCELERATION_X_OFFSET': 512, 'ACCELERATION_Z_OFFSET': -300, 'GYROSCOPE_Y_OFFSET': 40})
+    out = imu_acquisition.SampleRing(2).values[:imu_acquisition.SAMPLE_FIELDS]
+    ring = imu_acquisition.SampleRing(1024)
+
+    def ring_push():
+        ring.push_values(0, device.read_sample_into(out))
+
+    variants = {
+        'imu_kalman.read_sample': device.read_sample,
+        'imu_kalman.read_sample_into': lambda: device.read_sample_into(out),
+        'imu_kalman.read_sample_into + SampleRing.push_values': ring_push,
+    }
+    results = {}
+    for name, function in variants.items():
+        # Sayaç gibi yer değiştiren tek nesneler sabit fark bırakır; örnek başına
+        # büyüme iki farklı uzunluktaki ölçümün farkından bulunur
+        net, peak = _allocations(function, args.samples)
+        net_double, _ = _allocations(function, 2 * args.samples)
+        results[name] = {'net_bytes_per_sample': (net_double - net) / args.samples, 'peak_bytes': peak}
+    return results
+
+
+def bench_calibration(args):
+    """imu_kalman.ImuDevice.perform_calibration duvar saati süresi."""
+    bus = make_bus(args)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'setup.json')
+        with _silenced():
+            start = time.perf_counter()
+            imu_kalman.ImuDevice.perform_calibration(filename, bus=bus)
+            elapsed = time.perf_counter() - start
+        with open(filename) as f:
+            offsets = json.load(f)
+    return {'seconds': elapsed, 'transactions': bus.transactions, 'offsets': offsets}
+
+
+@contextlib.contextmanager
+def _silenced():
+    # perform_calibration ekrana yazıyor ve "clear" çalıştırıyor; JSON çıktısını
+    # bozmamaları için hem sys.stdout hem de 1 numaralı dosya tanımlayıcısı susturulur
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MPU6050 sürücüleri için benchmark (emüle edilmiş bus)")
+    parser.add_argument('--latency', type=float, default=0.0, help="işlem başına bus gecikmesi (s)")
+    parser.add_argument('--byte-latency', type=float, default=0.0, help="byte başına bus gecikmesi (s)")
+    parser.add_argument('--samples', type=int, default=2000, help="okuma ölçümü başına örnek sayısı")
+    parser.add_argument('--updates', type=int, default=100000, help="filtre/açı ölçümü başına çağrı sayısı")
+    parser.add_argument('--duration', type=float, default=1.0, help="hız ölçümlerinin süresi (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-calibration', action='store_true')
+    parser.add_argument('--check-allocations', action='store_true',
+                        help="read_sample_into yolu kalıcı bellek ayırırsa hata koduyla çık")
+    parser.add_argument('--check-timing', action='store_true',
+                        help="compute_angles'ın dt toplamı geçen süreden yarım periyottan fazla saparsa hata koduyla çık")
+    parser.add_argument('--output', help="sonuçların yazılacağı JSON dosyası (varsayılan: stdout)")
+    args = parser.parse_args(argv)
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'latency_s': args.latency,
+            'byte_latency_s': args.byte_latency,
+        },
+        'sample_reads': bench_sample_reads(args),
+        'kalman_get_angle': bench_kalman(args),
+        'fusion_engines': bench_fusion(args),
+        'decimation': bench_decimation(args),
+        'compute_angles': bench_compute_angles(args),
+        'dt_integration': bench_dt_integration(args),
+        'end_to_end': bench_end_to_end(args),
+        'manager': bench_manager(args),
+        'allocations': bench_allocations(args),
+    }
+    if not args.skip_calibration:
+        results['calibration'] = bench_calibration(args)
+
+    text = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.check_allocations:
+        leaking = [name for name, result in results['allocations'].items()
+                   if 'read_sample_into' in name and result['net_bytes_per_sample'] >= 1]
+        if leaking:
+            sys.exit("Okuma başına bellek ayıran yollar: " + ", ".join(leaking))
+    if args.check_timing:
+        drifting = [name for name, result in results['dt_integration'].items() if abs(result['error_periods']) > 0.5]
+        if drifting:
+            sys.exit("dt toplamı geçen süreden sapan çağrı hızları: " + ", ".join(drifting))
+    return results
+
+
+if __name__ == '__main__':
+    main()
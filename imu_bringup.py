@@ -0,0 +1,92 @@
+# Görevi: Sensörü sabit beklemeler olmadan, en az bus işlemiyle çalışır hale
+# getirmek. Reset sonrası DEVICE_RESET biti ve WHO_AM_I yoklanır; güç ve
+# ayar registerları önce geri okunur, sadece farklıysa yazılır. Servis yeniden
+# başladığında zaten ayarlı olan sensör için bring-up iki okuma işlemidir.
+#
+#     imu_bringup.bring_up(sensor.i2c, imu_settings.DEFAULT_CONFIG)
+#     imu_bringup.reset(sensor.i2c)        # tam reset, 2 s yerine ~50 ms
+
+import collections
+import time
+
+import imu_settings
+
+PWR_MGMT_1, WHO_AM_I = 0x6B, 0x75
+DEVICE_RESET, SLEEP = 0x80, 0x40
+CLKSEL_PLL_X = 0x01 # Uyanık, saat kaynağı X ekseni jiroskop PLL'i
+# Uyumlu yongaların WHO_AM_I değerleri: MPU6050, MPU6500, MPU9250, klonlar (0x72, 0x98) ve MPU9255
+DEVICE_IDS = (0x68, 0x70, 0x71, 0x72, 0x73, 0x98)
+
+BringUp = collections.namedtuple('BringUp', ['config', 'who_am_i', 'writes', 'seconds'])
+BringUp.__doc__ = """bring_up() sonucu.
+
+config  : sensörde geçerli ImuConfig (config verilmediyse None)
+who_am_i: okunan WHO_AM_I değeri
+writes  : yapılan yazma işlemi sayısı (sensör zaten ayarlıysa 0)
+seconds : toplam süre
+"""
+
+
+def _poll(read, done, timeout, interval, what):
+    """done(read()) doğru olana dek yoklar; reset sırasındaki NACK'ler (OSError) yok sayılır."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            value = read()
+            if done(value): return value
+        except OSError:
+            pass
+        if time.perf_counter() >= deadline:
+            raise TimeoutError("{} {:.0f} ms içinde tamamlanmadı".format(what, timeout * 1e3))
+        time.sleep(interval)
+
+
+def wait_ready(i2c_device, timeout=0.2, interval=0.001, device_ids=DEVICE_IDS):
+    """WHO_AM_I device_ids'ten birini döndürene dek bekler; WHO_AM_I değerini döndürür.
+
+    Sensör yanıt verip tanınmayan bir değer döndürmeye devam ederse
+    TimeoutError mesajında okunan değer yazılır.
+    """
+    last = []
+
+    def read():
+        value = i2c_device.read_byte(WHO_AM_I)
+        last[:] = [value]
+        return value
+    try:
+        return _poll(read, lambda value: value in device_ids, timeout, interval, "WHO_AM_I yanıtı")
+    except TimeoutError:
+        if not last: raise
+        raise TimeoutError("Tanınmayan WHO_AM_I 0x{:02x} (beklenen: {}); uyumlu bir yongaysa device_ids ile verin".format(
+            last[0], ', '.join('0x{:02x}'.format(device_id) for device_id in device_ids))) from None
+
+
+def wait_reset(i2c_device, timeout=0.2, interval=0.001):
+    """PWR_MGMT_1'deki DEVICE_RESET biti sıfırlanana dek bekler."""
+    _poll(lambda: i2c_device.read_byte(PWR_MGMT_1), lambda value: not value & DEVICE_RESET,
+          timeout, interval, "Reset")
+
+
+def reset(i2c_device, timeout=0.2, interval=0.001, device_ids=DEVICE_IDS):
+    """Sensörü resetler ve hazır olmasını bekler; reset sonrası sensör uyku kipindedir."""
+    i2c_device.write_byte(PWR_MGMT_1, DEVICE_RESET)
+    wait_reset(i2c_device, timeout, interval)
+    return wait_ready(i2c_device, timeout, interval, device_ids)
+
+
+def bring_up(i2c_device, config=None, reset_first=False, timeout=0.2, device_ids=DEVICE_IDS):
+    """Sensörü uyandırır ve (verildiyse) config'i uygular; BringUp döndürür.
+
+    PWR_MGMT_1 ve SMPLRT_DIV..ACCEL_CONFIG blokları geri okunur, yalnızca
+    farklı olanlar yazılır; ayar bloğu tek işlemde yazılır.
+    """
+    start, writes = time.perf_counter(), 0
+    if reset_first: who_am_i = reset(i2c_device, timeout, device_ids=device_ids)
+    else: who_am_i = wait_ready(i2c_device, timeout, device_ids=device_ids)
+    if i2c_device.read_byte(PWR_MGMT_1) != CLKSEL_PLL_X:
+        i2c_device.write_byte(PWR_MGMT_1, CLKSEL_PLL_X)
+        writes += 1
+    if config is not None:
+        config, written = imu_settings.apply_config(i2c_device, config)
+        writes += written
+    return BringUp(config, who_am_i, writes, time.perf_counter() - start)
@@ -1,10 +1,10 @@
 import os
 import json
 import imu
+import streaming_calibration
 
 SETUP_FILE = 'setup.json'
 CALIBRATION_LOOP_COUNT = 10000
-MOVING_STAR_PATTERN = ['/', '-', '\\', '|']
 
 def main():
     os.system("clear")
@@ -34,48 +34,20 @@ def main():
 
     imu_device.print_imu_info()
 
-    x_acceleration_measure = 0
-    y_acceleration_measure = 0
-    z_acceleration_measure = 0
-
-    x_gyroscope_measure = 0
-    y_gyroscope_measure = 0
-    z_gyroscope_measure = 0
-
     print(" ")
-    print("Kalibrasyon verisi toplanıyor, lütfen bekleyin...")
-
-    for i in range(0, CALIBRATION_LOOP_COUNT):
-        print("\b" + MOVING_STAR_PATTERN[i % 4], end='', flush=True)
-
-        imu_device.read_acceleration_data()
-        imu_device.read_gyroscope_data()
-
-        x_acceleration_measure += imu_device.get_x_acceleration()
-        y_acceleration_measure += imu_device.get_y_acceleration()
-        z_acceleration_measure += imu_device.get_z_acceleration()
+    print("Kalibrasyon verisi toplanıyor, ortalamalar kesinleşince duracak...")
 
-        x_gyroscope_measure += imu_device.get_x_gyroscope()
-        y_gyroscope_measure += imu_device.get_y_gyroscope()
-        z_gyroscope_measure += imu_device.get_z_gyroscope()
+    result = streaming_calibration.calibrate(imu_device, accel_scale=imu.ACCELERATION_SCALE_FACTOR,
+                                             max_samples=CALIBRATION_LOOP_COUNT)
+    streaming_calibration.print_result(result)
 
-    print("\nVeri toplama tamamlandı. Ofsetler hesaplanıyor...")
+    x_acceleration_offset = result.offsets['ACCELERATION_X_OFFSET']
+    y_acceleration_offset = result.offsets['ACCELERATION_Y_OFFSET']
+    z_acceleration_offset = result.offsets['ACCELERATION_Z_OFFSET']
 
-    x_acceleration_measure /= CALIBRATION_LOOP_COUNT
-    y_acceleration_measure /= CALIBRATION_LOOP_COUNT
-    z_acceleration_measure /= CALIBRATION_LOOP_COUNT
-
-    x_gyroscope_measure /= CALIBRATION_LOOP_COUNT
-    y_gyroscope_measure /= CALIBRATION_LOOP_COUNT
-    z_gyroscope_measure /= CALIBRATION_LOOP_COUNT
-
-    x_acceleration_offset = int(x_acceleration_measure)
-    y_acceleration_offset = int(y_acceleration_measure)
-    z_acceleration_offset = int(z_acceleration_measure) - 16384
-
-    x_gyroscope_offset = int(x_gyroscope_measure)
-    y_gyroscope_offset = int(y_gyroscope_measure)
-    z_gyroscope_offset = int(z_gyroscope_measure)
+    x_gyroscope_offset = result.offsets['GYROSCOPE_X_OFFSET']
+    y_gyroscope_offset = result.offsets['GYROSCOPE_Y_OFFSET']
+    z_gyroscope_offset = result.offsets['GYROSCOPE_Z_OFFSET']
 
     imu_device.set_x_acceleration_offset(x_acceleration_offset)
     imu_device.set_y_acceleration_offset(y_acceleration_offset)
@@ -96,6 +68,11 @@ def main():
     setup_data['GYROSCOPE_Y_OFFSET'] = y_gyroscope_offset
     setup_data['GYROSCOPE_Z_OFFSET'] = z_gyroscope_offset
 
+    # reset_offsets trim registerlarını sıfırladığı için ofsetler sıfır trim değerlerine göredir
+    for key in ('ACCELERATION_X_TRIM', 'ACCELERATION_Y_TRIM', 'ACCELERATION_Z_TRIM',
+                'GYROSCOPE_X_TRIM', 'GYROSCOPE_Y_TRIM', 'GYROSCOPE_Z_TRIM'):
+        setup_data[key] = 0
+
     # Dosya 'w' (write/yazma) modunda açılarak güncel veriler kaydedilir.
     # Dosya yoksa bu komut dosyayı sıfırdan oluşturur.
     with open(SETUP_FILE, "w") as json_file:
@@ -1,19 +1,35 @@
 
 
-import smbus
+try:
+    import smbus
+except ImportError:  # Donanımsız makinelerde (CI) mpu6050_emulator ile çalışmak için
+    smbus = None
+import imu_bringup
+import imu_settings
 import json
 import math
+import struct
 import time
 import os
+import streaming_calibration
 
 class I2cDevice:
     def __init__(self, bus, address):
-        self.bus = smbus.SMBus(bus)
+        # bus: bus numarası ya da SMBus arayüzüne sahip bir nesne (ör. mpu6050_emulator.EmulatedBus)
+        if isinstance(bus, int):
+            if smbus is None:
+                raise ImportError("smbus modülü bulunamadı; SMBus benzeri bir bus nesnesi verin.")
+            bus = smbus.SMBus(bus)
+        self.bus = bus
         self.address = address
     def read_byte(self, register):
         return self.bus.read_byte_data(self.address, register)
     def write_byte(self, register, value):
         self.bus.write_byte_data(self.address, register, value)
+    def read_block(self, register, length):
+        return bytes(self.bus.read_i2c_block_data(self.address, register, length))
+    def write_block(self, register, values):
+        self.bus.write_i2c_block_data(self.address, register, list(values))
 
 class ImuDevice:
     """MPU6050 sensörünün modern ve kısa versiyonu."""
@@ -21,19 +37,20 @@ class ImuDevice:
     PWR_MGMT_1, CONFIG, GYRO_CONFIG, SMPLRT_DIV = 0x6B, 0x1A, 0x1B, 0x19
     ACCEL_XOUT_H, GYRO_XOUT_H = 0x3B, 0x43
     ACCEL_SCALE, GYRO_SCALE = 16384.0, 131.0
+    # ACCEL_XOUT_H..GYRO_ZOUT_L: ivme x/y/z, sıcaklık, jiroskop x/y/z (tek blok)
+    SENSOR_DATA_LENGTH, SENSOR_DATA_FORMAT = 14, struct.Struct('>7h')
 
     def __init__(self, bus=1, address=0x68):
         self.i2c = I2cDevice(bus, address)
         self.accel = {'x': 0, 'y': 0, 'z': 0}
         self.gyro = {'x': 0, 'y': 0, 'z': 0}
         self.offsets = {'accel': self.accel.copy(), 'gyro': self.gyro.copy()}
+        self.temperature = 0
         self._roll, self._pitch = 0, 0
         
         # Sensörü Başlat
-        self.i2c.write_byte(self.PWR_MGMT_1, 0x01)
-        self.i2c.write_byte(self.CONFIG, 0x02)
-        self.i2c.write_byte(self.GYRO_CONFIG, 0x00)
-        self.i2c.write_byte(self.SMPLRT_DIV, 0x04)
+        # Uyandırma ve ayarlar (CONFIG=0x02, GYRO_CONFIG=0x00, SMPLRT_DIV=0x04) tek blokta, sadece farklıysa yazılır
+        imu_bringup.bring_up(self.i2c, imu_settings.DEFAULT_CONFIG)
 
     def _read_word(self, register):
         high = self.i2c.read_byte(register)
@@ -49,13 +66,17 @@ class ImuDevice:
         self.offsets['gyro']['y'] = offset_data.get('GYROSCOPE_Y_OFFSET', 0)
         self.offsets['gyro']['z'] = offset_data.get('GYROSCOPE_Z_OFFSET', 0)
 
+    def read_raw_sample(self):
+        """Tüm eksenleri ve sıcaklığı tek bir I2C işleminde okur (ofsetsiz)."""
+        data = self.i2c.read_block(self.ACCEL_XOUT_H, self.SENSOR_DATA_LENGTH)
+        return self.SENSOR_DATA_FORMAT.unpack(data)
+
     def read_sensor_data(self):
-        accel_reg, gyro_reg = self.ACCEL_XOUT_H, self.GYRO_XOUT_H
-        for axis in ['x', 'y', 'z']:
-            self.accel[axis] = self._read_word(accel_reg) - self.offsets['accel'][axis]
-            self.gyro[axis] = self._read_word(gyro_reg) - self.offsets['gyro'][axis]
-            accel_reg += 2
-            gyro_reg += 2
+        ax, ay, az, temperature, gx, gy, gz = self.read_raw_sample()
+        accel_offsets, gyro_offsets = self.offsets['accel'], self.offsets['gyro']
+        self.accel['x'], self.accel['y'], self.accel['z'] = ax - accel_offsets['x'], ay - accel_offsets['y'], az - accel_offsets['z']
+        self.gyro['x'], self.gyro['y'], self.gyro['z'] = gx - gyro_offsets['x'], gy - gyro_offsets['y'], gz - gyro_offsets['z']
+        self.temperature = temperature
             
     def compute_angles(self):
         ax, ay, az = self.accel['x'], self.accel['y'], self.accel['z']
@@ -67,7 +88,7 @@ class ImuDevice:
     @property
     def pitch(self): return self._pitch
 
-def perform_calibration(filename='setup.json'):
+def perform_calibration(filename='setup.json', bus=1):
     os.system("clear")
     print("\n" + "="*40)
     print("      IMU KALİBRASYONU BAŞLATILIYOR")
@@ -81,30 +102,12 @@ def perform_calibration(filename='setup.json'):
         print(f"-> '{filename}' bulunamadı, işlem sonunda yenisi oluşturulacak.")
         setup_data = {}
 
-    sensor = ImuDevice()
-    loop_count = 10000
-    measures = {'ax': 0, 'ay': 0, 'az': 0, 'gx': 0, 'gy': 0, 'gz': 0}
-    
-    print(f"{loop_count} adet veri toplanıyor, lütfen bekleyin...")
-    
-    for i in range(loop_count):
-        print("\b" + ['/', '-', '\\', '|'][i % 4], end='', flush=True)
-        sensor.read_sensor_data()
-        measures['ax'] += sensor.accel['x']
-        measures['ay'] += sensor.accel['y']
-        measures['az'] += sensor.accel['z']
-        measures['gx'] += sensor.gyro['x']
-        measures['gy'] += sensor.gyro['y']
-        measures['gz'] += sensor.gyro['z']
-
-    print("\n\nVeri toplama tamamlandı. Ofsetler hesaplanıyor...")
+    sensor = ImuDevice(bus=bus)
+    print("Veri toplanıyor, ortalamalar kesinleşince duracak...")
 
-    setup_data['ACCELERATION_X_OFFSET'] = int(measures['ax'] / loop_count)
-    setup_data['ACCELERATION_Y_OFFSET'] = int(measures['ay'] / loop_count)
-    setup_data['ACCELERATION_Z_OFFSET'] = int(measures['az'] / loop_count) - 16384
-    setup_data['GYROSCOPE_X_OFFSET'] = int(measures['gx'] / loop_count)
-    setup_data['GYROSCOPE_Y_OFFSET'] = int(measures['gy'] / loop_count)
-    setup_data['GYROSCOPE_Z_OFFSET'] = int(measures['gz'] / loop_count)
+    result = streaming_calibration.calibrate(sensor, accel_scale=sensor.ACCEL_SCALE)
+    streaming_calibration.print_result(result)
+    setup_data.update(result.offsets)
     
     with open(filename, "w") as f:
         json.dump(setup_data, f, indent=4)
@@ -0,0 +1,108 @@
+# Görevi: Sensörü yüksek hızda (ör. 1 kHz, FIFO ile) okuyup, füzyondan önce
+# örtüşme önleyici (anti-alias) bir alçak geçiren süzgeç ve seyreltme
+# (decimation) uygulamak. Füzyon motoru sadece seyreltilmiş akışı görür:
+# gürültü ortalamayla azalır, açı hesabı ise örnek başına değil çıkış başına
+# yapılır.
+#
+#     sensor.configure(sample_rate=1000, dlpf=184)
+#     sensor.set_decimation(10, taps='fir')   # 1 kHz -> 100 Hz
+#     sensor.compute_angles_fifo()            # FIFO partisi süzülür, seyreltilir, füzyona verilir
+#
+# Süzgeç durumu (son len(taps)-1 örnek ve faz) partiler arasında taşınır;
+# sonuç partilerin nasıl bölündüğünden bağımsızdır. NumPy varsa parti tek
+# seferde (pencere görünümü x katsayılar) hesaplanır, yoksa saf Python ile.
+
+try:
+    import numpy as np
+except ImportError:  # NumPy'sız kurulumlarda saf Python yolu kullanılır
+    np = None
+
+import math
+
+
+def boxcar_taps(factor):
+    """factor örneğin düz ortalaması."""
+    return [1.0 / factor] * factor
+
+
+def fir_taps(factor, length=None):
+    """Kesim frekansı çıkış Nyquist'i (giriş hızı / (2 * factor)) olan Hamming pencereli sinc.
+
+    length verilmezse 4 * factor + 1 katsayı; katsayıların toplamı 1'dir
+    (DC kazancı 1, ofset ve yerçekimi korunur).
+    """
+    length = length or 4 * factor + 1
+    middle, cutoff = (length - 1) / 2.0, 0.5 / factor
+    taps = []
+    for index in range(length):
+        x = index - middle
+        sinc = 2.0 * cutoff if x == 0 else math.sin(2.0 * math.pi * cutoff * x) / (math.pi * x)
+        window = 0.54 - 0.46 * math.cos(2.0 * math.pi * index / (length - 1)) if length > 1 else 1.0
+        taps.append(sinc * window)
+    total = sum(taps)
+    return [tap / total for tap in taps]
+
+
+FILTERS = {'boxcar': lambda factor, length: boxcar_taps(factor), 'fir': fir_taps}
+
+
+class Decimator:
+    """Çok kanallı örnek partilerini süzüp factor'de bir örnek üreten akış aşaması.
+
+    taps: 'boxcar', 'fir' (FILTERS) ya da katsayı dizisi. Çıkış örneği, onu
+    tamamlayan en son giriş örneğinin zaman damgasını alır; süzgeç gecikmesi
+    delay (giriş örneği) kadardır.
+    """
+
+    def __init__(self, factor, taps='fir', length=None):
+        if factor < 1: raise ValueError("Seyreltme oranı en az 1 olmalı: {}".format(factor))
+        if isinstance(taps, str):
+            try:
+                taps = FILTERS[taps](factor, length)
+            except KeyError:
+                raise ValueError("Bilinmeyen süzgeç: '{}' (mevcut: {})".format(taps, ', '.join(sorted(FILTERS))))
+        self.factor, self.taps = factor, [float(tap) for tap in taps]
+        # Pencere eskiden yeniye sıralı olduğundan katsayılar ters çevrilmiş olarak tutulur
+        self._reversed = self.taps[::-1]
+        self._reversed_array = np.array(self._reversed) if np is not None else None
+        self.reset()
+
+    def reset(self):
+        """Süzgeç geçmişini siler (ör. FIFO taşmasından sonra süreksizlikte)."""
+        self._history, self._phase = None, 0
+
+    @property
+    def delay(self):
+        return (len(self.taps) - 1) / 2.0
+
+    def process(self, samples, timestamps=None):
+        """Parti işler: (çıkış zaman damgaları, çıkış örnekleri) döndürür; örnekler float demetlerdir."""
+        count = len(samples)
+        if not count: return [], []
+        ends = range(self.factor - 1 - self._phase, count, self.factor) # Çıkış üreten giriş indeksleri
+        self._phase = (self._phase + count) % self.factor
+        outputs = self._filter_numpy(samples, ends) if np is not None else self._filter_python(samples, ends)
+        return ([timestamps[end] for end in ends] if timestamps is not None else []), outputs
+
+    def _filter_numpy(self, samples, ends):
+        history_length = len(self.taps) - 1
+        batch = np.asarray(samples, dtype=float)
+        if self._history is None: # İlk partide geçmiş ilk örnekle doldurulur (açılış geçici rejimi olmaz)
+            self._history = np.repeat(batch[:1], history_length, axis=0)
+        full = np.concatenate((self._history, batch))
+        self._history = full[len(full) - history_length:]
+        if not len(ends): return []
+        windows = np.lib.stride_tricks.sliding_window_view(full, len(self.taps), axis=0) # (n, kanal, taps)
+        return [tuple(row) for row in (windows[ends.start:ends.stop:ends.step] @ self._reversed_array).tolist()]
+
+    def _filter_python(self, samples, ends):
+        history_length = len(self.taps) - 1
+        if self._history is None:
+            self._history = [tuple(samples[0])] * history_length
+        full = self._history + [tuple(sample) for sample in samples]
+        self._history = full[len(full) - history_length:]
+        taps, channels, outputs = self._reversed, range(len(full[0])), []
+        for end in ends:
+            window = full[end:end + len(taps)]
+            outputs.append(tuple(sum(tap * sample[channel] for tap, sample in zip(taps, window)) for channel in channels))
+        return outputs
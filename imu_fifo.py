@@ -0,0 +1,110 @@
+import collections
+import struct
+import time
+
+FifoBatch = collections.namedtuple('FifoBatch', ['timestamps', 'samples', 'overflow'])
+FifoBatch.__doc__ = """FIFO'dan tek seferde boşaltılan örnekler.
+
+timestamps: her örnek için time.perf_counter_ns() zamanı (tamsayı ns)
+samples   : (ax, ay, az, temp, gx, gy, gz) ham int16 demetleri
+overflow  : FIFO taştıysa True (bu durumda FIFO sıfırlanır, samples boştur)
+"""
+
+
+class ImuFifo:
+    """MPU6050 dahili FIFO'sunu kullanarak toplu veri okuyan sınıf.
+
+    Sensör her örneklemede ivme, sıcaklık ve jiroskop verisini (14 byte) FIFO'ya
+    yazar; read() çağrısı biriken tüm tam örnekleri blok okumalarla boşaltır.
+    """
+    SMPLRT_DIV, CONFIG = 0x19, 0x1A
+    FIFO_EN, INT_ENABLE, INT_STATUS = 0x23, 0x38, 0x3A
+    USER_CTRL, FIFO_COUNT_H, FIFO_R_W = 0x6A, 0x72, 0x74
+
+    # FIFO_EN: sıcaklık + XG + YG + ZG + ivme, veri registerlarıyla aynı sırada
+    FIFO_SOURCES = 0xF8
+    USER_CTRL_FIFO_EN, USER_CTRL_FIFO_RESET = 0x40, 0x04
+    FIFO_OFLOW_BIT = 0x10
+
+    FIFO_SIZE = 1024
+    SAMPLE_SIZE, SAMPLE_FORMAT = 14, struct.Struct('>7h')
+    COUNT_FORMAT = struct.Struct('>H')
+
+    def __init__(self, i2c_device, max_block_size=32):
+        self.i2c = i2c_device
+        # Bir blok okumada alınacak byte sayısı, örnek boyutunun katı olmalı
+        self.chunk_size = max(self.SAMPLE_SIZE, max_block_size - max_block_size % self.SAMPLE_SIZE)
+        self.sample_period, self.sample_period_ns = 0.0, 0
+        self.enabled = False
+        self.overflows = 0
+        self._last_timestamp = None
+
+    def enable(self):
+        """FIFO'yu sıfırlar ve ivme/sıcaklık/jiroskop verisiyle doldurmaya başlar."""
+        self.sample_period = self.read_sample_period()
+        self.sample_period_ns = round(self.sample_period * 1e9)
+        self.i2c.write_byte(self.USER_CTRL, self.USER_CTRL_FIFO_RESET)
+        self.i2c.write_byte(self.INT_ENABLE, self.i2c.read_byte(self.INT_ENABLE) | self.FIFO_OFLOW_BIT)
+        self.i2c.write_byte(self.FIFO_EN, self.FIFO_SOURCES)
+        self.i2c.write_byte(self.USER_CTRL, self.USER_CTRL_FIFO_EN)
+        self.i2c.read_byte(self.INT_STATUS)  # Eski taşma bayrağını temizle
+        self.enabled, self._last_timestamp = True, None
+
+    def disable(self):
+        self.i2c.write_byte(self.FIFO_EN, 0x00)
+        self.i2c.write_byte(self.USER_CTRL, self.USER_CTRL_FIFO_RESET)
+        self.enabled, self._last_timestamp = False, None
+
+    def reset(self):
+        """Taşma sonrası hizası bozulan FIFO'yu boşaltıp yeniden başlatır."""
+        self.i2c.write_byte(self.USER_CTRL, self.USER_CTRL_FIFO_EN | self.USER_CTRL_FIFO_RESET)
+        self._last_timestamp = None
+
+    def read_sample_period(self):
+        """SMPLRT_DIV ve DLPF ayarından örnekleme periyodunu (saniye) hesaplar."""
+        return read_sample_period(self.i2c)
+
+    def count(self):
+        return self.COUNT_FORMAT.unpack(self.i2c.read_block(self.FIFO_COUNT_H, 2))[0]
+
+    def read(self):
+        """FIFO'daki tüm tam örnekleri okur ve zaman damgalı bir FifoBatch döndürür."""
+        overflow = bool(self.i2c.read_byte(self.INT_STATUS) & self.FIFO_OFLOW_BIT)
+        count = self.count()
+        now = time.perf_counter_ns()
+
+        if overflow or count >= self.FIFO_SIZE:
+            self.overflows += 1
+            self.reset()
+            return FifoBatch([], [], True)
+
+        sample_count = count // self.SAMPLE_SIZE
+        remaining, data = sample_count * self.SAMPLE_SIZE, bytearray()
+        while remaining > 0:
+            length = min(remaining, self.chunk_size)
+            data += self.i2c.read_block(self.FIFO_R_W, length)
+            remaining -= length
+
+        samples = list(self.SAMPLE_FORMAT.iter_unpack(data))
+        return FifoBatch(self._timestamps(sample_count, now), samples, False)
+
+    def _timestamps(self, sample_count, now):
+        # Son örnek okuma anında üretilmiş kabul edilir, öncekiler sensör
+        # periyoduyla geriye doğru dizilir. Zaman çizgisi bir önceki partiden
+        # devam ettirilir; okuma gecikmesi bir periyodu aşarsa yeniden hizalanır.
+        if sample_count == 0:
+            return []
+        period = self.sample_period_ns
+        first = now - (sample_count - 1) * period
+        if self._last_timestamp is not None and abs(self._last_timestamp + period - first) < period:
+            first = self._last_timestamp + period
+        timestamps = [first + i * period for i in range(sample_count)]
+        self._last_timestamp = timestamps[-1]
+        return timestamps
+
+
+def read_sample_period(i2c_device):
+    """SMPLRT_DIV ve DLPF ayarından sensörün örnekleme periyodunu (saniye) hesaplar."""
+    dlpf_cfg = i2c_device.read_byte(ImuFifo.CONFIG) & 0x07
+    gyro_rate = 8000.0 if dlpf_cfg in (0, 7) else 1000.0
+    return (1 + i2c_device.read_byte(ImuFifo.SMPLRT_DIV)) / gyro_rate
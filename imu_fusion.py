@@ -0,0 +1,198 @@
+# Görevi: İvmeölçer ve jiroskop verisini roll/pitch açılarına çeviren
+# birbirinin yerine kullanılabilir füzyon motorları sağlamak. Kalman motoru
+# imu_kalman.KalmanFusion'dadır ve 'kalman' adıyla buraya kaydolur.
+#
+#     sensor = imu_kalman.ImuDevice(fusion='complementary')
+#     imu_fusion.create('madgwick', beta=0.05).update_cost()  # ns/güncelleme
+#
+# Tüm motorlar fuse(ax, ay, az, gx, gy, gz, dt) alır (ivme g, açısal hız
+# dps, dt saniye) ve roll/pitch'i derece olarak sunar. Açı ve eksen yönleri
+# ImuDevice.compute_angles ile aynıdır.
+
+import copy
+import math
+import time
+
+ENGINES = {}  # isim -> sınıf
+
+
+def register(name):
+    def decorator(cls):
+        ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+def create(engine='kalman', **options):
+    """İsimden (ENGINES) motor oluşturur; hazır bir motor nesnesi verilirse olduğu gibi döndürür."""
+    if not isinstance(engine, str): return engine
+    try:
+        return ENGINES[engine](**options)
+    except KeyError:
+        raise ValueError("Bilinmeyen füzyon motoru: '{}' (mevcut: {})".format(engine, ', '.join(sorted(ENGINES))))
+
+
+def accel_angles(ax, ay, az, roll=0.0, pitch=0.0):
+    """İvme vektöründen (roll, pitch) derece; tanımsız durumda verilen önceki açılar kullanılır."""
+    roll_acc = math.degrees(math.atan2(ay, az)) if az != 0 else roll
+    denominator = math.sqrt(ay * ay + az * az)
+    pitch_acc = math.degrees(math.atan2(-ax, denominator)) if denominator != 0 else pitch
+    return roll_acc, pitch_acc
+
+
+class FusionEngine:
+    """Füzyon motoru arayüzü: fuse(), setAngles(), roll ve pitch."""
+    __slots__ = ()
+
+    def fuse(self, ax, ay, az, gx, gy, gz, dt):
+        raise NotImplementedError
+
+    def setAngles(self, roll, pitch):
+        raise NotImplementedError
+
+    def fuse_batch(self, samples, dt, accel_scale, gyro_scale):
+        """Ham (ax, ay, az, temp, gx, gy, gz) örneklerini sabit dt ile sırayla işler (ör. FIFO partisi)."""
+        fuse, accel_lsb, gyro_lsb = self.fuse, 1.0 / accel_scale, 1.0 / gyro_scale
+        for ax, ay, az, _, gx, gy, gz in samples:
+            fuse(ax * accel_lsb, ay * accel_lsb, az * accel_lsb, gx * gyro_lsb, gy * gyro_lsb, gz * gyro_lsb, dt)
+
+    def update_cost(self, updates=20000, dt=0.005):
+        """Bir fuse() çağrısının ortalama maliyeti (ns); ölçüm motorun bir kopyası üzerinde yapılır."""
+        fuse = copy.copy(self).fuse
+        start = time.perf_counter_ns()
+        for _ in range(updates):
+            fuse(0.05, -0.02, 0.99, 1.5, -0.5, 0.2, dt)
+        return (time.perf_counter_ns() - start) / updates
+
+
+@register('complementary')
+class ComplementaryFilter(FusionEngine):
+    """Jiroskop integrali ile ivme açısının ağırlıklı ortalaması.
+
+    time_constant (s): ivme ölçümünün jiroskop sapmasını düzelttiği zaman
+    sabiti; ağırlık dt'ye göre her adımda hesaplanır, bu yüzden değişken
+    dt'de de aynı davranır.
+    """
+    __slots__ = ('time_constant', 'roll', 'pitch')
+
+    def __init__(self, time_constant=0.5):
+        self.time_constant = time_constant
+        self.roll, self.pitch = 0.0, 0.0
+
+    def fuse(self, ax, ay, az, gx, gy, gz, dt):
+        roll, pitch = self.roll, self.pitch
+        roll_acc = math.degrees(math.atan2(ay, az)) if az != 0 else roll
+        denominator = math.sqrt(ay * ay + az * az)
+        pitch_acc = math.degrees(math.atan2(-ax, denominator)) if denominator != 0 else pitch
+        alpha = self.time_constant / (self.time_constant + dt)
+        self.roll = alpha * (roll + gx * dt) + (1.0 - alpha) * roll_acc
+        self.pitch = alpha * (pitch + gy * dt) + (1.0 - alpha) * pitch_acc
+
+    def setAngles(self, roll, pitch): self.roll, self.pitch = roll, pitch
+
+
+class QuaternionEngine(FusionEngine):
+    """Durumu birim kuaterniyon (q0 skaler) olan motorlar için ortak kısım; açılar istendiğinde hesaplanır."""
+    __slots__ = ('q0', 'q1', 'q2', 'q3')
+
+    def __init__(self):
+        self.q0, self.q1, self.q2, self.q3 = 1.0, 0.0, 0.0, 0.0
+
+    @property
+    def roll(self):
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        return math.degrees(math.atan2(2.0 * (q0 * q1 + q2 * q3), 1.0 - 2.0 * (q1 * q1 + q2 * q2)))
+
+    @property
+    def pitch(self):
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        return math.degrees(math.asin(max(-1.0, min(1.0, 2.0 * (q0 * q2 - q3 * q1)))))
+
+    @property
+    def yaw(self):
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        return math.degrees(math.atan2(2.0 * (q0 * q3 + q1 * q2), 1.0 - 2.0 * (q2 * q2 + q3 * q3)))
+
+    def setAngles(self, roll, pitch, yaw=0.0):
+        cr, sr = math.cos(math.radians(roll) / 2), math.sin(math.radians(roll) / 2)
+        cp, sp = math.cos(math.radians(pitch) / 2), math.sin(math.radians(pitch) / 2)
+        cy, sy = math.cos(math.radians(yaw) / 2), math.sin(math.radians(yaw) / 2)
+        self.q0 = cr * cp * cy + sr * sp * sy
+        self.q1 = sr * cp * cy - cr * sp * sy
+        self.q2 = cr * sp * cy + sr * cp * sy
+        self.q3 = cr * cp * sy - sr * sp * cy
+
+
+@register('mahony')
+class MahonyFilter(QuaternionEngine):
+    """Mahony tamamlayıcı filtresi: ivme hatasıyla PI geri beslemeli kuaterniyon integrali."""
+    __slots__ = ('kp', 'ki', 'integral_x', 'integral_y', 'integral_z')
+
+    def __init__(self, kp=1.0, ki=0.0):
+        super().__init__()
+        self.kp, self.ki = kp, ki
+        self.integral_x, self.integral_y, self.integral_z = 0.0, 0.0, 0.0
+
+    def fuse(self, ax, ay, az, gx, gy, gz, dt):
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        gx, gy, gz = math.radians(gx), math.radians(gy), math.radians(gz)
+        norm = math.sqrt(ax * ax + ay * ay + az * az)
+        if norm > 0.0:
+            ax, ay, az = ax / norm, ay / norm, az / norm
+            # Kuaterniyona göre beklenen yerçekimi yönü ile ölçülenin vektörel çarpımı
+            vx, vy, vz = 2.0 * (q1 * q3 - q0 * q2), 2.0 * (q0 * q1 + q2 * q3), q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3
+            ex, ey, ez = ay * vz - az * vy, az * vx - ax * vz, ax * vy - ay * vx
+            if self.ki > 0.0:
+                self.integral_x += self.ki * ex * dt
+                self.integral_y += self.ki * ey * dt
+                self.integral_z += self.ki * ez * dt
+                gx, gy, gz = gx + self.integral_x, gy + self.integral_y, gz + self.integral_z
+            kp = self.kp
+            gx, gy, gz = gx + kp * ex, gy + kp * ey, gz + kp * ez
+
+        half_dt = 0.5 * dt
+        gx, gy, gz = gx * half_dt, gy * half_dt, gz * half_dt
+        q0, q1, q2, q3 = (q0 - q1 * gx - q2 * gy - q3 * gz, q1 + q0 * gx + q2 * gz - q3 * gy,
+                          q2 + q0 * gy - q1 * gz + q3 * gx, q3 + q0 * gz + q1 * gy - q2 * gx)
+        norm = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        self.q0, self.q1, self.q2, self.q3 = q0 * norm, q1 * norm, q2 * norm, q3 * norm
+
+
+@register('madgwick')
+class MadgwickFilter(QuaternionEngine):
+    """Madgwick gradyan iniş filtresi (ivme + jiroskop); beta (rad/s) düzeltme kazancıdır."""
+    __slots__ = ('beta',)
+
+    def __init__(self, beta=0.1):
+        super().__init__()
+        self.beta = beta
+
+    def fuse(self, ax, ay, az, gx, gy, gz, dt):
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        gx, gy, gz = math.radians(gx), math.radians(gy), math.radians(gz)
+        # Jiroskoptan kuaterniyon türevi
+        dq0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+        dq1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+        dq2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+        dq3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+        norm = math.sqrt(ax * ax + ay * ay + az * az)
+        if norm > 0.0:
+            ax, ay, az = ax / norm, ay / norm, az / norm
+            _2q0, _2q1, _2q2, _2q3 = 2.0 * q0, 2.0 * q1, 2.0 * q2, 2.0 * q3
+            _4q0, _4q1, _4q2 = 4.0 * q0, 4.0 * q1, 4.0 * q2
+            _8q1, _8q2 = 8.0 * q1, 8.0 * q2
+            q0q0, q1q1, q2q2, q3q3 = q0 * q0, q1 * q1, q2 * q2, q3 * q3
+            # Amaç fonksiyonunun gradyanı
+            s0 = _4q0 * q2q2 + _2q2 * ax + _4q0 * q1q1 - _2q1 * ay
+            s1 = _4q1 * q3q3 - _2q3 * ax + 4.0 * q0q0 * q1 - _2q0 * ay - _4q1 + _8q1 * q1q1 + _8q1 * q2q2 + _4q1 * az
+            s2 = 4.0 * q0q0 * q2 + _2q0 * ax + _4q2 * q3q3 - _2q3 * ay - _4q2 + _8q2 * q1q1 + _8q2 * q2q2 + _4q2 * az
+            s3 = 4.0 * q1q1 * q3 - _2q1 * ax + 4.0 * q2q2 * q3 - _2q2 * ay
+            norm = math.sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+            if norm > 0.0:
+                beta = self.beta / norm
+                dq0, dq1, dq2, dq3 = dq0 - beta * s0, dq1 - beta * s1, dq2 - beta * s2, dq3 - beta * s3
+
+        q0, q1, q2, q3 = q0 + dq0 * dt, q1 + dq1 * dt, q2 + dq2 * dt, q3 + dq3 * dt
+        norm = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        self.q0, self.q1, self.q2, self.q3 = q0 * norm, q1 * norm, q2 * norm, q3 * norm
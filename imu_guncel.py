@@ -1,5 +1,9 @@
 import i2c
-import math
+import imu_bringup
+import imu_fifo
+import imu_sample
+import imu_settings
+import struct
 import time
 
 class ImuDevice:
@@ -13,23 +17,25 @@ class ImuDevice:
     ACCEL_SCALE = 16384.0
     GYRO_SCALE = 131.0
 
+    # ACCEL_XOUT_H..GYRO_ZOUT_L: ivme x/y/z, sıcaklık, jiroskop x/y/z
+    SENSOR_DATA_LENGTH = 14
+    SENSOR_DATA_FORMAT = struct.Struct('>7h')
+
     def __init__(self, bus=1, address=0x68):
         self.i2c = i2c.I2cDevice(bus, address)
         
-        self.accel = {'x': 0, 'y': 0, 'z': 0}
-        self.gyro = {'x': 0, 'y': 0, 'z': 0}
+        # Son okuma; her okumada yeni bir değişmez ImuSample ile değiştirilir
+        self.sample = imu_sample.ImuSample.from_raw((0,) * 7, time.perf_counter_ns(), self.ACCEL_SCALE, self.GYRO_SCALE)
         self.offsets = {
             'accel': {'x': 0, 'y': 0, 'z': 0},
             'gyro': {'x': 0, 'y': 0, 'z': 0}
         }
         
-        self._roll = 0
-        self._pitch = 0
+        self._angle_sample = None # compute_angles çağrısındaki örnek
+        self.fifo = None
         
-        self.i2c.write_byte(self.PWR_MGMT_1, 0x01)
-        self.i2c.write_byte(self.CONFIG, 0x02)
-        self.i2c.write_byte(self.GYRO_CONFIG, 0x00)
-        self.i2c.write_byte(self.SMPLRT_DIV, 0x04)
+        # Uyandırma ve ayarlar (CONFIG=0x02, GYRO_CONFIG=0x00, SMPLRT_DIV=0x04) tek blokta, sadece farklıysa yazılır
+        imu_bringup.bring_up(self.i2c, imu_settings.DEFAULT_CONFIG)
 
     def _read_word(self, register):
         high = self.i2c.read_byte(register)
@@ -46,49 +52,103 @@ class ImuDevice:
         self.offsets['gyro']['z'] = offset_data.get('GYROSCOPE_Z_OFFSET', 0)
         print("-> IMU ofsetleri başarıyla yüklendi.")
 
+    def read_raw_sample(self):
+        # Tüm eksenler tek I2C işleminde okunur, böylece aynı sensör güncellemesine aittir
+        data = self.i2c.read_block(self.ACCEL_XOUT_H, self.SENSOR_DATA_LENGTH)
+        return self.SENSOR_DATA_FORMAT.unpack(data)
+
+    def read_sample(self):
+        # Ofsetleri düşülmüş değişmez bir ImuSample döndürür ve self.sample'a atar
+        ax, ay, az, temperature, gx, gy, gz = self.read_raw_sample()
+        timestamp_ns = time.perf_counter_ns()
+        accel_offsets, gyro_offsets = self.offsets['accel'], self.offsets['gyro']
+        sample = imu_sample.ImuSample.from_raw(
+            (ax - accel_offsets['x'], ay - accel_offsets['y'], az - accel_offsets['z'], temperature,
+             gx - gyro_offsets['x'], gy - gyro_offsets['y'], gz - gyro_offsets['z']),
+            timestamp_ns, self.ACCEL_SCALE, self.GYRO_SCALE)
+        self.sample = sample # Tek referans ataması: okuyucular yarım güncellenmiş veri görmez
+        return sample
+
     def read_sensor_data(self):
-        base_reg_accel = self.ACCEL_XOUT_H
-        base_reg_gyro = self.GYRO_XOUT_H
-        
-        for axis in ['x', 'y', 'z']:
-            self.accel[axis] = self._read_word(base_reg_accel) - self.offsets['accel'][axis]
-            self.gyro[axis] = self._read_word(base_reg_gyro) - self.offsets['gyro'][axis]
-            base_reg_accel += 2
-            base_reg_gyro += 2
+        self.read_sample()
+
+    # Eski sözlük arayüzü; her erişimde son örnekten yeni bir sözlük oluşturulur
+    @property
+    def accel(self):
+        sample = self.sample
+        return {'x': sample.ax, 'y': sample.ay, 'z': sample.az}
+
+    @property
+    def gyro(self):
+        sample = self.sample
+        return {'x': sample.gx, 'y': sample.gy, 'z': sample.gz}
+
+    @property
+    def temperature(self):
+        return self.sample.temp
+
+    def enable_fifo(self):
+        # Sensörün dahili FIFO'sunu aç; veriler read_fifo() ile toplu okunur
+        self.fifo = imu_fifo.ImuFifo(self.i2c)
+        self.fifo.enable()
+
+    def disable_fifo(self):
+        if self.fifo is not None:
+            self.fifo.disable()
+        self.fifo = None
+
+    def read_fifo(self):
+        # FIFO'da biriken örnekleri ofsetleri düşülmüş olarak döndür
+        batch = self.fifo.read()
+        accel_offsets, gyro_offsets = self.offsets['accel'], self.offsets['gyro']
+        oax, oay, oaz = accel_offsets['x'], accel_offsets['y'], accel_offsets['z']
+        ogx, ogy, ogz = gyro_offsets['x'], gyro_offsets['y'], gyro_offsets['z']
+        samples = [(ax - oax, ay - oay, az - oaz, temperature, gx - ogx, gy - ogy, gz - ogz)
+                   for ax, ay, az, temperature, gx, gy, gz in batch.samples]
+        return imu_fifo.FifoBatch(batch.timestamps, samples, batch.overflow)
+
+    def read_fifo_samples(self):
+        # FIFO partisini zaman damgalı ImuSample listesi olarak döndür; son örnek self.sample olur
+        batch = self.read_fifo()
+        make, accel_scale, gyro_scale = imu_sample.ImuSample.from_raw, self.ACCEL_SCALE, self.GYRO_SCALE
+        samples = [make(sample, timestamp, accel_scale, gyro_scale)
+                   for timestamp, sample in zip(batch.timestamps, batch.samples)]
+        if samples:
+            self.sample = samples[-1]
+        return samples
             
     def compute_angles(self):
-        ax, ay, az = self.accel['x'], self.accel['y'], self.accel['z']
-        self._roll = math.degrees(math.atan2(ay, math.sqrt(ax**2 + az**2)))
-        self._pitch = math.degrees(math.atan2(-ax, math.sqrt(ay**2 + az**2)))
+        # Açılar son örnekte ilk erişimde hesaplanır (ImuSample.roll/pitch)
+        self._angle_sample = self.sample
         
     @property
     def roll(self):
-        return self._roll
+        return self._angle_sample.roll if self._angle_sample is not None else 0
 
     @property
     def pitch(self):
-        return self._pitch
+        return self._angle_sample.pitch if self._angle_sample is not None else 0
 
     @property
     def accel_x_scaled(self):
-        return self.accel['x'] / self.ACCEL_SCALE
+        return self.sample.accel[0]
     
     @property
     def accel_y_scaled(self):
-        return self.accel['y'] / self.ACCEL_SCALE
+        return self.sample.accel[1]
 
     @property
     def accel_z_scaled(self):
-        return self.accel['z'] / self.ACCEL_SCALE
+        return self.sample.accel[2]
         
     @property
     def gyro_x_scaled(self):
-        return self.gyro['x'] / self.GYRO_SCALE
+        return self.sample.gyro[0]
         
     @property
     def gyro_y_scaled(self):
-        return self.gyro['y'] / self.GYRO_SCALE
+        return self.sample.gyro[1]
         
     @property
     def gyro_z_scaled(self):
-        return self.gyro['z'] / self.GYRO_SCALE
+        return self.sample.gyro[2]
@@ -1,38 +1,60 @@
-import smbus
+import array
+import calibration_store
+import i2c
 import json
 import math
+import struct
+import sys
 import time
 import os
+import i2c_rdwr
+import imu_acquisition
+import imu_async
+import imu_bringup
+import imu_decimation
+import imu_fifo
+import imu_fusion
+import imu_orientation
+import imu_settings
+import streaming_calibration
+import temperature_compensation
 
 # --- KalmanAngle Sınıfı ---
 class KalmanAngle:
+    """Tek eksen için açı/bias Kalman filtresi; kovaryans P00..P11 skalerlerinde tutulur."""
+    __slots__ = ('QAngle', 'QBias', 'RMeasure', 'angle', 'bias', 'rate', 'P00', 'P01', 'P10', 'P11')
+
     def __init__(self):
         self.QAngle, self.QBias, self.RMeasure = 0.001, 0.003, 0.03
         self.angle, self.bias, self.rate = 0.0, 0.0, 0.0
-        self.P = [[0.0, 0.0], [0.0, 0.0]]
+        self.P00, self.P01, self.P10, self.P11 = 0.0, 0.0, 0.0, 0.0
 
     def getAngle(self, newAngle, newRate, dt):
-        self.rate = newRate - self.bias
-        self.angle += dt * self.rate
-        
-        self.P[0][0] += dt * (dt * self.P[1][1] - self.P[0][1] - self.P[1][0] + self.QAngle)
-        self.P[0][1] -= dt * self.P[1][1]
-        self.P[1][0] -= dt * self.P[1][1]
-        self.P[1][1] += self.QBias * dt
+        # Alanlar yerel değişkenlere alınır; çağrı başına liste oluşturulmaz
+        rate = newRate - self.bias
+        angle = self.angle + dt * rate
+        P11 = self.P11
+        P00 = self.P00 + dt * (dt * P11 - self.P01 - self.P10 + self.QAngle)
+        P01 = self.P01 - dt * P11
+        P10 = self.P10 - dt * P11
+        P11 += self.QBias * dt
 
-        y = newAngle - self.angle
-        s = self.P[0][0] + self.RMeasure
-        K = [self.P[0][0] / s, self.P[1][0] / s]
+        y = newAngle - angle
+        s = P00 + self.RMeasure
+        K0, K1 = P00 / s, P10 / s
 
-        self.angle += K[0] * y
-        self.bias  += K[1] * y
+        self.angle = angle = angle + K0 * y
+        self.bias += K1 * y
+        self.rate = rate
 
-        P00Temp, P01Temp = self.P[0][0], self.P[0][1] # Tek satırda atama
-        self.P[0][0] -= K[0] * P00Temp
-        self.P[0][1] -= K[0] * P01Temp
-        self.P[1][0] -= K[1] * P00Temp
-        self.P[1][1] -= K[1] * P01Temp
-        return self.angle
+        self.P00, self.P01 = P00 - K0 * P00, P01 - K0 * P01
+        self.P10, self.P11 = P10 - K1 * P00, P11 - K1 * P01
+        return angle
+
+    @property
+    def P(self): return [[self.P00, self.P01], [self.P10, self.P11]]
+    @P.setter
+    def P(self, P): (self.P00, self.P01), (self.P10, self.P11) = P
 
     def setAngle(self, angle): self.angle = angle
     def setQAngle(self, QAngle): self.QAngle = QAngle
@@ -42,53 +64,249 @@ class KalmanAngle:
     def getQAngle(self): return self.QAngle
     def getQBias(self): return self.QBias
     def getRMeasure(self): return self.RMeasure
+
+
+class KalmanRollPitch:
+    """Roll ve pitch'i tek çağrıda güncelleyen birleşik Kalman filtresi.
+
+    İki eksen aynı Q/R parametrelerini ve aynı dt'yi kullandığından kovaryans
+    (ve dolayısıyla Kalman kazancı) iki eksen için de aynıdır; bir kez
+    hesaplanıp iki eksene uygulanır. Sonuçlar iki ayrı KalmanAngle ile aynıdır.
+    """
+    __slots__ = ('QAngle', 'QBias', 'RMeasure', 'roll', 'pitch', 'roll_bias', 'pitch_bias',
+                 'roll_rate', 'pitch_rate', 'P00', 'P01', 'P10', 'P11')
+
+    def __init__(self):
+        self.QAngle, self.QBias, self.RMeasure = 0.001, 0.003, 0.03
+        self.roll, self.pitch = 0.0, 0.0
+        self.roll_bias, self.pitch_bias = 0.0, 0.0
+        self.roll_rate, self.pitch_rate = 0.0, 0.0
+        self.P00, self.P01, self.P10, self.P11 = 0.0, 0.0, 0.0, 0.0
+
+    def update(self, roll_acc, pitch_acc, roll_rate, pitch_rate, dt):
+        """Sonuçlar self.roll ve self.pitch alanlarına yazılır."""
+        P11 = self.P11
+        P00 = self.P00 + dt * (dt * P11 - self.P01 - self.P10 + self.QAngle)
+        P01 = self.P01 - dt * P11
+        P10 = self.P10 - dt * P11
+        P11 += self.QBias * dt
+        s = P00 + self.RMeasure
+        K0, K1 = P00 / s, P10 / s
+        self.P00, self.P01 = P00 - K0 * P00, P01 - K0 * P01
+        self.P10, self.P11 = P10 - K1 * P00, P11 - K1 * P01
+
+        rate = roll_rate - self.roll_bias
+        angle = self.roll + dt * rate
+        y = roll_acc - angle
+        self.roll, self.roll_bias, self.roll_rate = angle + K0 * y, self.roll_bias + K1 * y, rate
+
+        rate = pitch_rate - self.pitch_bias
+        angle = self.pitch + dt * rate
+        y = pitch_acc - angle
+        self.pitch, self.pitch_bias, self.pitch_rate = angle + K0 * y, self.pitch_bias + K1 * y, rate
+
+    def setAngles(self, roll, pitch): self.roll, self.pitch = roll, pitch
+    def setQAngle(self, QAngle): self.QAngle = QAngle
+    def setQBias(self, QBias): self.QBias = QBias
+    def setRMeasure(self, RMeasure): self.RMeasure = RMeasure
+
+
+@imu_fusion.register('kalman')
+class KalmanFusion(KalmanRollPitch, imu_fusion.FusionEngine):
+    """KalmanRollPitch'in füzyon motoru arayüzü: ivme açıları burada hesaplanır."""
+    __slots__ = ()
+
+    def fuse(self, ax, ay, az, gx, gy, gz, dt):
+        roll_acc = math.degrees(math.atan2(ay, az)) if az != 0 else self.roll
+        denominator = math.sqrt(ay * ay + az * az)
+        pitch_acc = math.degrees(math.atan2(-ax, denominator)) if denominator != 0 else self.pitch
+        self.update(roll_acc, pitch_acc, gx, gy, dt)
 # --- KalmanAngle Sınıfı Sonu ---
 
 
-class I2cDevice:
-    def __init__(self, bus, address):
-        self.bus, self.address = smbus.SMBus(bus), address # Tek satırda atama
-    def read_byte(self, register): return self.bus.read_byte_data(self.address, register)
-    def write_byte(self, register, value): self.bus.write_byte_data(self.address, register, value)
+def _clamp_int16(value): return max(-32768, min(32767, value))
+
+_LITTLE_ENDIAN = sys.byteorder == 'little' # Sensör verisi big-endian
+
+
+class IntervalStats(streaming_calibration.RunningStats):
+    """Ardışık okumalar arasındaki sürelerin (s) ortalama, sapma ve uç değerleri."""
+    __slots__ = ('minimum', 'maximum')
+
+    def __init__(self):
+        super().__init__()
+        self.minimum, self.maximum = float('inf'), 0.0
+
+    def add(self, value):
+        super().add(value)
+        if value < self.minimum: self.minimum = value
+        if value > self.maximum: self.maximum = value
+
+
+TransportStats = i2c.TransportStats
+
+
+class I2cDevice(i2c.I2cDevice):
+    """i2c.I2cDevice (bütçeli yeniden deneme ve TransportStats) ile bus seçimi ve tampona okuma.
+
+    transport bus numarasından açılacak bus'ı seçer: 'smbus' (smbus eklentisi)
+    ya da 'rdwr' (i2c_rdwr.I2cRdwrBus, /dev/i2c-N üzerinde I2C_RDWR ioctl'ü).
+    """
+    TRANSPORTS = ('smbus', 'rdwr')
+
+    def __init__(self, bus, address, retries=2, budget=0.002, transport='smbus'):
+        # bus: bus numarası ya da SMBus arayüzüne sahip bir nesne (ör. mpu6050_emulator.EmulatedBus)
+        if transport not in self.TRANSPORTS:
+            raise ValueError("Bilinmeyen transport: '{}' (mevcut: {})".format(transport, ', '.join(self.TRANSPORTS)))
+        self.bus_number = bus if isinstance(bus, int) else getattr(bus, 'bus_number', None)
+        if isinstance(bus, int) and transport == 'rdwr':
+            bus = i2c_rdwr.I2cRdwrBus(bus)
+        super().__init__(bus, address, retries, budget)
+        # Bus hazır bir tampona okuyabiliyorsa (read_i2c_block_data_into) ara liste oluşmaz
+        self._read_into = getattr(self.bus, 'read_i2c_block_data_into', None) or self._read_block_copy
+
+    def read_block_into(self, register, buffer):
+        """len(buffer) byte'ı yazılabilir buffer'a (bytearray, memoryview) okur."""
+        self._transfer(self._read_into, register, buffer)
+
+    def _read_block_copy(self, address, register, buffer):
+        buffer[:] = bytes(self.bus.read_i2c_block_data(address, register, len(buffer)))
 
 
 class ImuDevice:
     """MPU6050 sensörünün modern ve kısa versiyonu."""
     PWR_MGMT_1, CONFIG, GYRO_CONFIG, SMPLRT_DIV = 0x6B, 0x1A, 0x1B, 0x19
     ACCEL_XOUT_H, GYRO_XOUT_H = 0x3B, 0x43
+    XA_OFFSET_H, XG_OFFSET_H = 0x06, 0x13 # Donanım ofset (trim) registerları, eksen başına 16 bit
     ACCEL_SCALE, GYRO_SCALE = 16384.0, 131.0
+    # Trim registerlarının birimleri: ivme ±16 g (2048 LSB/g), jiroskop ±1000 dps (32.8 LSB/dps)
+    ACCEL_TRIM_SCALE, GYRO_TRIM_SCALE = 2048.0, 32.8
+    TRIM_FORMAT = struct.Struct('>3h')
+    ACCEL_TRIM_KEYS = ('ACCELERATION_X_TRIM', 'ACCELERATION_Y_TRIM', 'ACCELERATION_Z_TRIM')
+    GYRO_TRIM_KEYS = ('GYROSCOPE_X_TRIM', 'GYROSCOPE_Y_TRIM', 'GYROSCOPE_Z_TRIM')
+    # ACCEL_XOUT_H..GYRO_ZOUT_L: ivme x/y/z, sıcaklık, jiroskop x/y/z (tek blok)
+    SENSOR_DATA_LENGTH, SENSOR_DATA_FORMAT = 14, struct.Struct('>7h')
 
-    def __init__(self, bus=1, address=0x68):
-        self.i2c = I2cDevice(bus, address)
+    def __init__(self, bus=1, address=0x68, config=None, fusion='kalman', transport='smbus'):
+        self.i2c = I2cDevice(bus, address, transport=transport)
+        self.config = None # imu_settings.ImuConfig; configure() ile değiştirilir
         self.accel, self.gyro = {'x': 0, 'y': 0, 'z': 0}, {'x': 0, 'y': 0, 'z': 0}
         self.offsets = {'accel': self.accel.copy(), 'gyro': self.gyro.copy()}
+        # Ayırmasız okuma yolu (read_sample_into) için önceden ayrılmış tamponlar
+        self._raw = array.array('h', bytes(2 * 7))
+        self._raw_bytes = memoryview(self._raw).cast('B') # Sensörden gelen big-endian byte'lar
+        self._offset_vector = array.array('i', bytes(4 * 7)) # ax ay az temp gx gy gz
+        self.temperature = 0
+        self.hardware_offsets = False
         
-        self._roll, self._pitch = 0, 0
-        self._last_time = time.time()
+        self.timestamp_ns = self._last_timestamp_ns = time.perf_counter_ns()
+        self.intervals = IntervalStats() # compute_angles çağrıları arasında ölçülen süreler
+        self.skipped_updates = 0
+        # Bus hataları: okunamayan örnekler geçersiz sayılır; art arda reinit_after hatada sensör yeniden kurulur
+        self.sample_valid, self.invalid_samples, self.consecutive_failures, self.reinit_after = True, 0, 0, 3
+        # Okuma yolundaki yeniden kurma en fazla reinit_timeout sürer; başarısız denemeler arası bekleme
+        # reinit_backoff'tan başlayıp her seferinde ikiye katlanır (en fazla reinit_backoff_max)
+        self.reinit_timeout, self.reinit_backoff, self.reinit_backoff_max = 0.005, 0.01, 1.0
+        self._reinit_delay, self._reinit_at_ns = 0.0, 0
+        self._hardware_offset_data = None
+        self.fifo = None
+        self.decimator = None # set_decimation(); compute_angles_fifo'da füzyondan önce süzme ve seyreltme
+        self.acquisition = None
 
-        self.kalmanX, self.kalmanY = KalmanAngle(), KalmanAngle() # Tek satırda oluşturma
+        self.fusion = self.kalman = None # set_fusion() ile seçilir
+        # Sıcaklık kompanzasyonu: ofsetler TEMP_OUT bu kadar (LSB, ~0.1 °C) değişince modelden yeniden hesaplanır
+        self.bias_model, self.compensation_step, self._compensated_temp = None, 34, None
         
-        # Sensörü Başlat (Tek satırda toplama)
-        self.i2c.write_byte(self.PWR_MGMT_1, 0x01)
-        self.i2c.write_byte(self.CONFIG, 0x02)
-        self.i2c.write_byte(self.GYRO_CONFIG, 0x00)
-        self.i2c.write_byte(self.SMPLRT_DIV, 0x04)
+        # Sensörü başlat: WHO_AM_I yoklanır, güç ve ayar registerları yalnızca farklıysa yazılır
+        imu_bringup.bring_up(self.i2c)
+        self.quantize_dt = False # True: dt sensörün kendi örnekleme periyodunun katlarına yuvarlanır
+        self.configure(config or imu_settings.DEFAULT_CONFIG)
 
-        # İlk Kalman Filtresi Başlatma
+        # Füzyon motorunu ilk ivme açılarıyla başlat
         self.read_sensor_data()
-        ax_g_init, ay_g_init, az_g_init = self.accel['x'] / self.ACCEL_SCALE, \
-                                          self.accel['y'] / self.ACCEL_SCALE, \
-                                          self.accel['z'] / self.ACCEL_SCALE
+        self.set_fusion(fusion)
 
-        initial_roll_acc, initial_pitch_acc = 0.0, 0.0
-        if az_g_init != 0: initial_roll_acc = math.degrees(math.atan2(ay_g_init, az_g_init))
-        
-        denominator_pitch = math.sqrt(ay_g_init**2 + az_g_init**2) 
-        if denominator_pitch != 0: initial_pitch_acc = math.degrees(math.atan2(-ax_g_init, denominator_pitch))
-        
-        self.kalmanX.setAngle(initial_roll_acc)
-        self.kalmanY.setAngle(initial_pitch_acc)
+    def set_fusion(self, engine='kalman', **options):
+        """Füzyon motorunu seçer: imu_fusion.ENGINES'teki bir isim ya da hazır bir motor nesnesi.
+
+        Yeni motor, son okunan ivme değerlerinden hesaplanan açılarla başlatılır.
+        """
+        fusion = imu_fusion.create(engine, **options)
+        scale = self.ACCEL_SCALE
+        fusion.setAngles(*imu_fusion.accel_angles(self.accel['x'] / scale, self.accel['y'] / scale,
+                                                  self.accel['z'] / scale))
+        self.fusion = fusion
+        self.kalman = fusion if isinstance(fusion, KalmanRollPitch) else None
+        return fusion
+
+
+    def configure(self, config=None, **changes):
+        """Örnekleme hızı, DLPF ve ölçüm aralıklarını uygular; uygulanan ImuConfig'i döndürür.
+
+        Verilmeyen alanlar mevcut ayardan alınır (ör. configure(gyro_range=2000)).
+        ACCEL_SCALE/GYRO_SCALE ayardan türetilir; yazılımda tutulan ofsetler yeni
+        ölçeğe çevrilir.
+        """
+        config, _ = imu_settings.apply_config(self.i2c, (config or self.config)._replace(**changes))
+        accel_scale, gyro_scale = imu_settings.scales(config)
+        if self.config is not None and not self.hardware_offsets:
+            self._rescale_offsets(accel_scale / self.ACCEL_SCALE, gyro_scale / self.GYRO_SCALE)
+        self.config, self.ACCEL_SCALE, self.GYRO_SCALE = config, accel_scale, gyro_scale
+        self.sample_period_ns = round(1e9 / config.sample_rate)
+        if self.fifo is not None: self.fifo.enable() # Yeni periyotla yeniden başlat
+        return config
+
+    def reset(self):
+        """Sensörü resetler (sabit bekleme yerine DEVICE_RESET/WHO_AM_I yoklanır) ve ayarları yeniden uygular.
+
+        Reset trim registerlarını fabrika değerlerine döndürür; donanım ofsetleri
+        kullanılıyorsa load_hardware_offsets yeniden çağrılmalıdır.
+        """
+        imu_bringup.bring_up(self.i2c, reset_first=True)
+        return self.configure(self.config)
+
+    def reinitialize(self, timeout=0.2):
+        """Resetlemeden sensörü yeniden kurar: uyandırma, ayarlar, varsa donanım ofsetleri ve FIFO.
+
+        Sensör bir kesinti ya da gerilim düşüşüyle registerlarını kaybettiyse
+        okumalar bu çağrıyla kaldığı yerden devam eder. timeout, sensörün
+        yanıt vermesi için beklenecek en uzun süredir (s).
+        """
+        self.i2c.stats.reinits += 1
+        imu_bringup.bring_up(self.i2c, timeout=timeout)
+        self.configure(self.config)
+        if self._hardware_offset_data is not None: self.load_hardware_offsets(self._hardware_offset_data)
+
+    def _bus_failed(self):
+        # Okuma bütçesi içinde başarılamadı: örnek geçersiz; hata sürerse sensör yeniden kurulur.
+        # Ölü bus'ta okuma yolu bloklanmasın diye deneme kısa sürelidir ve denemeler seyrekleşir.
+        self.sample_valid, self.invalid_samples = False, self.invalid_samples + 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.reinit_after and time.perf_counter_ns() >= self._reinit_at_ns:
+            self.consecutive_failures = 0
+            self._try_reinitialize()
+
+    def _bus_recovered(self):
+        # Okumalar düzeldi ama son yeniden kurma başarısızdı: sensör (ör. gerilim düşüşünden sonra) uykuda olabilir
+        if time.perf_counter_ns() >= self._reinit_at_ns: self._try_reinitialize()
+
+    def _try_reinitialize(self):
+        try:
+            self.reinitialize(self.reinit_timeout)
+            self._reinit_delay = 0.0
+        except OSError: # TimeoutError dahil; bekleme süresi dolunca yeniden denenir
+            self._reinit_delay = min(max(2 * self._reinit_delay, self.reinit_backoff), self.reinit_backoff_max)
+            self._reinit_at_ns = time.perf_counter_ns() + int(self._reinit_delay * 1e9)
+
+    def _rescale_offsets(self, accel_ratio, gyro_ratio):
+        for axis in 'xyz':
+            self.offsets['accel'][axis] = int(round(self.offsets['accel'][axis] * accel_ratio))
+            self.offsets['gyro'][axis] = int(round(self.offsets['gyro'][axis] * gyro_ratio))
+        self._sync_offset_vector()
 
+    def _sync_offset_vector(self):
+        oa, og = self.offsets['accel'], self.offsets['gyro']
+        self._offset_vector[:] = array.array('i', (oa['x'], oa['y'], oa['z'], 0, og['x'], og['y'], og['z']))
 
     def _read_word(self, register):
         high, low = self.i2c.read_byte(register), self.i2c.read_byte(register + 1) # Tek satırda okuma
@@ -102,47 +320,324 @@ class ImuDevice:
         self.offsets['gyro']['x'] = offset_data.get('GYROSCOPE_X_OFFSET', 0)
         self.offsets['gyro']['y'] = offset_data.get('GYROSCOPE_Y_OFFSET', 0)
         self.offsets['gyro']['z'] = offset_data.get('GYROSCOPE_Z_OFFSET', 0)
+        # Ofsetler kalibrasyondaki ölçüm aralığının LSB'si cinsindendir
+        self._rescale_offsets(self.ACCEL_SCALE / offset_data.get('ACCEL_SCALE', self.ACCEL_SCALE),
+                              self.GYRO_SCALE / offset_data.get('GYRO_SCALE', self.GYRO_SCALE))
+        if temperature_compensation.SETUP_KEY in offset_data:
+            self.set_bias_model(temperature_compensation.BiasModel.from_setup(offset_data[temperature_compensation.SETUP_KEY]))
+
+    def set_bias_model(self, model):
+        """Sıcaklık modelini (temperature_compensation.BiasModel) etkinleştirir; None kapatır.
+
+        Model açıkken yazılım ofsetleri her okumada gelen TEMP_OUT'a göre
+        güncellenir. Donanım ofsetleri (load_hardware_offsets) kullanılırken
+        kompanzasyon yapılmaz.
+        """
+        self.bias_model, self._compensated_temp = model, None
+
+    def _compensate(self, temperature):
+        # Sıcak yolda sadece karşılaştırma; ofsetler yalnızca sıcaklık compensation_step kadar değişince hesaplanır
+        if self._compensated_temp is not None and abs(temperature - self._compensated_temp) < self.compensation_step:
+            return
+        self._compensated_temp = temperature
+        model = self.bias_model
+        offsets = model.offsets(calibration_store.die_temperature(temperature))
+        for group, name, ratio in (('accel', 'ACCELERATION', self.ACCEL_SCALE / model.accel_scale),
+                                   ('gyro', 'GYROSCOPE', self.GYRO_SCALE / model.gyro_scale)):
+            for axis in 'xyz':
+                key = '{}_{}_OFFSET'.format(name, axis.upper())
+                if key in offsets: self.offsets[group][axis] = int(round(offsets[key] * ratio))
+        self._sync_offset_vector()
+
+    def load_calibration(self, store, strict=False, compensate=True):
+        """Bu sensöre, ölçüm aralıklarına ve şu anki sıcaklığa uyan kaydı depodan yükler.
+
+        store bir calibration_store.CalibrationStore'dur. Kayıt HARDWARE_OFFSETS
+        içeriyorsa ofsetler trim registerlarına, değilse yazılıma yüklenir.
+        Uyarılar ekrana yazılır; strict=True ise uyarılı kayıtlar reddedilir.
+        compensate=True iken geçmişte farklı sıcaklıklarda yapılmış kalibrasyonlar
+        varsa bunlardan sıcaklık modeli kurulur (set_bias_model).
+        Kullanılan Match'i, uygun kayıt yoksa None döndürür.
+        """
+        key = calibration_store.device_key(self)
+        temperature = calibration_store.die_temperature(self.read_raw_sample()[3])
+        match = store.find(key, temperature)
+        if match is None:
+            for entry in store.mismatches(key):
+                print("!!! UYARI: bus {} adres 0x{:02x} için kayıt farklı sensör/ayarlara ait "
+                      "(WHO_AM_I 0x{:02x}, ±{} g, ±{} dps)".format(key.bus, key.address, entry['WHO_AM_I'],
+                                                                  entry.get('ACCEL_RANGE'), entry.get('GYRO_RANGE')))
+            return None
+        for problem in match.problems: print("!!! UYARI:", problem)
+        if strict and match.problems: return None
+        if match.entry.get('HARDWARE_OFFSETS', False): self.load_hardware_offsets(match.entry)
+        else: self.load_offsets(match.entry)
+        model = temperature_compensation.fit_history(store.history(key)) if compensate else None
+        if model is not None and not self.hardware_offsets: self.set_bias_model(model)
+        return match
+
+    def read_trim_registers(self):
+        """Sensördeki ivme/jiroskop trim registerlarını setup.json anahtarlarıyla döndürür."""
+        accel = self.TRIM_FORMAT.unpack(self.i2c.read_block(self.XA_OFFSET_H, 6))
+        gyro = self.TRIM_FORMAT.unpack(self.i2c.read_block(self.XG_OFFSET_H, 6))
+        return dict(zip(self.ACCEL_TRIM_KEYS + self.GYRO_TRIM_KEYS, accel + gyro))
+
+    def load_hardware_offsets(self, offset_data):
+        """Kalibrasyon ofsetlerini sensörün trim registerlarına yazar, geri okuyarak doğrular.
+
+        Ofsetler kalibrasyon sırasında geçerli olan trim değerlerine (setup.json'daki
+        *_TRIM anahtarları; yoksa sensördeki mevcut değerler) göre hesaplanır.
+        Sonrasında okumalardan yazılımda ofset çıkarılmaz.
+        """
+        current = self.read_trim_registers()
+        base = {key: offset_data.get(key, current[key]) for key in current}
+        accel_ratio = self.ACCEL_TRIM_SCALE / offset_data.get('ACCEL_SCALE', self.ACCEL_SCALE)
+        gyro_ratio = self.GYRO_TRIM_SCALE / offset_data.get('GYRO_SCALE', self.GYRO_SCALE)
+
+        accel = []
+        for axis, key in zip('XYZ', self.ACCEL_TRIM_KEYS):
+            # Bit 0 ayrılmış (korunur), bu yüzden düzeltme 2'nin katlarına yuvarlanır
+            trim = (base[key] & ~1) - 2 * round(offset_data.get(f'ACCELERATION_{axis}_OFFSET', 0) * accel_ratio / 2)
+            accel.append(_clamp_int16(trim | (current[key] & 1)))
+        gyro = [_clamp_int16(base[key] - round(offset_data.get(f'GYROSCOPE_{axis}_OFFSET', 0) * gyro_ratio))
+                for axis, key in zip('XYZ', self.GYRO_TRIM_KEYS)]
+
+        self.i2c.write_block(self.XA_OFFSET_H, self.TRIM_FORMAT.pack(*accel))
+        self.i2c.write_block(self.XG_OFFSET_H, self.TRIM_FORMAT.pack(*gyro))
+        written = self.read_trim_registers()
+        if [written[key] for key in self.ACCEL_TRIM_KEYS + self.GYRO_TRIM_KEYS] != accel + gyro:
+            raise IOError("Donanım ofsetleri doğrulanamadı: yazılan {}, okunan {}".format(accel + gyro, written))
+
+        self.offsets = {'accel': {'x': 0, 'y': 0, 'z': 0}, 'gyro': {'x': 0, 'y': 0, 'z': 0}}
+        self._sync_offset_vector()
+        self.hardware_offsets, self._hardware_offset_data = True, offset_data
+
+    def read_raw_sample(self):
+        """Tüm eksenleri ve sıcaklığı tek bir I2C işleminde okur (ofsetsiz)."""
+        data = self.i2c.read_block(self.ACCEL_XOUT_H, self.SENSOR_DATA_LENGTH)
+        return self.SENSOR_DATA_FORMAT.unpack(data)
+
+    def read_sample(self):
+        """Ofsetleri uygulanmış (ax, ay, az, temp, gx, gy, gz) demeti döndürür.
+
+        Okuma başarısız olursa OSError yükseltilir (arka plan okuyucuları hatayı
+        sayar); hata invalid_samples'a işlenir ve yeniden kurma sayacını ilerletir.
+        """
+        try:
+            sample = self.read_raw_sample()
+        except OSError:
+            self._bus_failed()
+            raise
+        self.consecutive_failures = 0
+        if self._reinit_delay: self._bus_recovered()
+        if self.hardware_offsets: return sample
+        ax, ay, az, temperature, gx, gy, gz = sample
+        if self.bias_model is not None: self._compensate(temperature)
+        oa, og = self.offsets['accel'], self.offsets['gyro']
+        return (ax - oa['x'], ay - oa['y'], az - oa['z'], temperature, gx - og['x'], gy - og['y'], gz - og['z'])
+
+    def read_sample_into(self, out):
+        """Ofsetleri uygulanmış örneği önceden ayrılmış out dizisine (array('i', 7)) yazar.
+
+        Sıcak yol: sözlük, liste ya da demet oluşturulmaz. Ham byte'lar sabit
+        bir int16 dizisine okunur, yerinde byte sırası çevrilir ve ofset
+        vektörü çıkarılır. Bus read_i2c_block_data_into sunmuyorsa okuma başına
+        bir ara liste oluşur.
+        """
+        raw, offsets = self._raw, self._offset_vector
+        try:
+            self.i2c.read_block_into(self.ACCEL_XOUT_H, self._raw_bytes)
+        except OSError:
+            self._bus_failed()
+            raise
+        self.consecutive_failures = 0
+        if self._reinit_delay: self._bus_recovered()
+        if _LITTLE_ENDIAN: raw.byteswap()
+        if self.bias_model is not None: self._compensate(raw[3])
+        out[0] = raw[0] - offsets[0]; out[1] = raw[1] - offsets[1]; out[2] = raw[2] - offsets[2]
+        out[3] = raw[3]
+        out[4] = raw[4] - offsets[4]; out[5] = raw[5] - offsets[5]; out[6] = raw[6] - offsets[6]
+        return out
 
     def read_sensor_data(self):
-        accel_reg, gyro_reg = self.ACCEL_XOUT_H, self.GYRO_XOUT_H
-        for axis in ['x', 'y', 'z']:
-            self.accel[axis] = self._read_word(accel_reg) - self.offsets['accel'][axis]
-            self.gyro[axis] = self._read_word(gyro_reg) - self.offsets['gyro'][axis]
-            accel_reg, gyro_reg = accel_reg + 2, gyro_reg + 2 # Tek satırda artırma
+        """Son örneği accel/gyro/temperature'a yazar; okunamazsa değerler korunur ve False döner (sample_valid)."""
+        try:
+            ax, ay, az, temperature, gx, gy, gz = self.read_raw_sample()
+        except OSError:
+            self._bus_failed()
+            return False
+        self.sample_valid, self.consecutive_failures = True, 0
+        if self._reinit_delay: self._bus_recovered()
+        if self.hardware_offsets: # Ofsetler sensörde uygulanıyor
+            self.accel['x'], self.accel['y'], self.accel['z'] = ax, ay, az
+            self.gyro['x'], self.gyro['y'], self.gyro['z'] = gx, gy, gz
+            self.temperature = temperature
+            return True
+        if self.bias_model is not None: self._compensate(temperature)
+        accel_offsets, gyro_offsets = self.offsets['accel'], self.offsets['gyro']
+        self.accel['x'], self.accel['y'], self.accel['z'] = ax - accel_offsets['x'], ay - accel_offsets['y'], az - accel_offsets['z']
+        self.gyro['x'], self.gyro['y'], self.gyro['z'] = gx - gyro_offsets['x'], gy - gyro_offsets['y'], gz - gyro_offsets['z']
+        self.temperature = temperature
+        return True
+
+    def enable_fifo(self):
+        """Sensörün dahili FIFO'sunu açar; veriler read_fifo() ile toplu okunur."""
+        self.fifo = imu_fifo.ImuFifo(self.i2c)
+        self.fifo.enable()
+
+    def disable_fifo(self):
+        if self.fifo is not None: self.fifo.disable()
+        self.fifo = None
+
+    def read_fifo(self):
+        """FIFO'da biriken örnekleri ofsetleri düşülmüş olarak bir FifoBatch içinde döndürür."""
+        batch = self.fifo.read()
+        if self.bias_model is not None and batch.samples: self._compensate(batch.samples[-1][3])
+        oa, og = self.offsets['accel'], self.offsets['gyro']
+        oax, oay, oaz, ogx, ogy, ogz = oa['x'], oa['y'], oa['z'], og['x'], og['y'], og['z']
+        samples = [(ax - oax, ay - oay, az - oaz, t, gx - ogx, gy - ogy, gz - ogz)
+                   for ax, ay, az, t, gx, gy, gz in batch.samples]
+        return imu_fifo.FifoBatch(batch.timestamps, samples, batch.overflow)
+
+    def start_acquisition(self, rate=200.0, capacity=1024):
+        """Sensörü arka planda sabit hızda okuyan iş parçacığını başlatır ve döndürür.
+
+        Örnekler acquisition.ring halka tamponuna yazılır; latest_sample() en son
+        örneği, acquisition.ring.reader() ise kayıp sayaçlı bir okuyucu verir.
+        """
+        self.stop_acquisition()
+        self.acquisition = imu_acquisition.AcquisitionThread(self.read_sample, rate, capacity,
+                                                                read_into=self.read_sample_into)
+        self.acquisition.start()
+        return self.acquisition
+
+    def stop_acquisition(self):
+        if self.acquisition is not None: self.acquisition.stop()
+        self.acquisition = None
+
+    def stream_samples(self, rate=200.0, batch_size=1, max_batches=8, drop_oldest=False):
+        """(timestamp_ns, sample) partileri üreten asyncio akışı; bus okuması olay döngüsü dışında yapılır.
+
+        Okunamayan örnekler partiye girmez (akışın errors sayacı ve invalid_samples artar); akış sürer.
+        """
+        return imu_async.ImuStream(self.read_sample, rate, batch_size, max_batches, drop_oldest)
+
+    def stream_orientation(self, rate=200.0, batch_size=1, max_batches=8, drop_oldest=False):
+        """(timestamp_ns, (roll, pitch, sample_valid)) partileri üreten asyncio akışı (Kalman filtreli).
+
+        sample_valid False ise okuma başarısız olmuştur ve açılar bir önceki geçerli örneğe aittir.
+        """
+        return imu_async.ImuStream(self._read_orientation, rate, batch_size, max_batches, drop_oldest)
+
+    def _read_orientation(self):
+        self.compute_angles()
+        return self.fusion.roll, self.fusion.pitch, self.sample_valid
+
+    def latest_sample(self):
+        """Arka plan okumasındaki en son örnek: (timestamp_ns, (ax, ay, az, temp, gx, gy, gz)) ya da None."""
+        return self.acquisition.ring.latest()
             
     def compute_angles(self):
-        self.read_sensor_data()
+        """Sensörü okuyup filtreyi günceller; güncelleme yapıldıysa True döndürür.
 
-        current_time = time.time()
-        dt = current_time - self._last_time
-        self._last_time = current_time
+        Okuma zamanı time.perf_counter_ns() ile alınır ve dt varsayılan olarak
+        son güncellemeden beri ölçülen süredir. quantize_dt açıkken dt bu sürenin
+        en yakın sensör periyodu katıdır; yuvarlama artığı bir sonraki dt'ye
+        aktarılır, böylece çağıranın hızı sensör hızından farklı olsa da dt'lerin
+        toplamı geçen süreden en fazla yarım periyot sapar. Sensör son
+        güncellemeden beri yeni örnek üretmediyse (süre yarım periyottan kısa)
+        ya da okuma bus hatası yüzünden geçersizse filtre güncellenmez; süre bir
+        sonraki geçerli örneğe aktarılır.
+        """
+        if not self.read_sensor_data(): return False
 
-        ax_g, ay_g, az_g = self.accel['x'] / self.ACCEL_SCALE, \
-                           self.accel['y'] / self.ACCEL_SCALE, \
-                           self.accel['z'] / self.ACCEL_SCALE
+        now = time.perf_counter_ns()
+        elapsed, period = now - self._last_timestamp_ns, self.sample_period_ns
+        self.intervals.add((now - self.timestamp_ns) / 1e9)
+        self.timestamp_ns = now
+        if self.quantize_dt and period:
+            periods = (elapsed + period // 2) // period
+            if periods == 0:
+                self.skipped_updates += 1
+                return False
+            dt_ns = periods * period
+        else:
+            dt_ns = elapsed
+        self._last_timestamp_ns += dt_ns # now değil: yuvarlama artığı kaybolmaz
+        self.update_angles(dt_ns / 1e9)
+        return True
 
-        gx_dps, gy_dps = self.gyro['x'] / self.GYRO_SCALE, \
-                         self.gyro['y'] / self.GYRO_SCALE
+    def set_decimation(self, factor=1, taps='fir', length=None):
+        """compute_angles_fifo'da füzyondan önce örtüşme önleyici süzgeç ve factor'de bir seyreltme uygular.
 
-        roll_acc, pitch_acc = 0.0, 0.0
-        if az_g != 0: roll_acc = math.degrees(math.atan2(ay_g, az_g))
-        else: roll_acc = self._roll
+        taps: 'fir', 'boxcar' ya da katsayılar (imu_decimation.Decimator);
+        factor=1 aşamayı kapatır. Füzyon sample_rate / factor hızında çalışır.
+        """
+        self.decimator = imu_decimation.Decimator(factor, taps, length) if factor > 1 else None
+        return self.decimator
+
+    def compute_angles_fifo(self):
+        """FIFO'da biriken tüm örnekleri filtreden geçirir; dt sensör periyodudur. FifoBatch döndürür.
+
+        set_decimation ile seyreltme açıksa parti önce süzülüp seyreltilir;
+        füzyona ve dönüş değerine seyreltilmiş örnekler gider, dt periyot x factor olur.
+        """
+        if self.fifo is None: self.enable_fifo()
+        try:
+            batch = self.read_fifo()
+        except OSError:
+            self._bus_failed() # Örnekler FIFO'da kalır, sonraki çağrıda okunur
+            return imu_fifo.FifoBatch([], [], False)
+        self.sample_valid, self.consecutive_failures = True, 0
+        if self._reinit_delay: self._bus_recovered()
+        dt = self.fifo.sample_period
+        if self.decimator is not None:
+            if batch.overflow: self.decimator.reset() # Kayıp örnekler: süzgeç geçmişi artık geçersiz
+            timestamps, samples = self.decimator.process(batch.samples, batch.timestamps)
+            batch, dt = imu_fifo.FifoBatch(timestamps, samples, batch.overflow), dt * self.decimator.factor
+        self.fusion.fuse_batch(batch.samples, dt, self.ACCEL_SCALE, self.GYRO_SCALE)
+        if batch.samples:
+            ax, ay, az, self.temperature, gx, gy, gz = batch.samples[-1]
+            self.accel['x'], self.accel['y'], self.accel['z'] = ax, ay, az
+            self.gyro['x'], self.gyro['y'], self.gyro['z'] = gx, gy, gz
+            self.timestamp_ns = self._last_timestamp_ns = batch.timestamps[-1]
+        return batch
+
+    def timing(self):
+        """compute_angles zamanlama istatistikleri (s); jitter, sapmanın sensör periyoduna oranıdır."""
+        stats, period = self.intervals, self.sample_period_ns / 1e9
+        return {
+            'count': stats.count, 'mean': stats.mean, 'std': stats.std,
+            'min': stats.minimum if stats.count else 0.0, 'max': stats.maximum,
+            'sample_period': period, 'jitter': stats.std / period if period else 0.0,
+            'skipped_updates': self.skipped_updates,
+        }
+
+    def update_angles(self, dt):
+        """Son okunan accel/gyro değerleriyle füzyon motorunu dt saniye ilerletir (ör. kayıt oynatırken)."""
+        accel, gyro, a, g = self.accel, self.gyro, self.ACCEL_SCALE, self.GYRO_SCALE
+        self.fusion.fuse(accel['x'] / a, accel['y'] / a, accel['z'] / a,
+                         gyro['x'] / g, gyro['y'] / g, gyro['z'] / g, dt)
 
-        denominator_pitch = math.sqrt(ay_g**2 + az_g**2) 
-        if denominator_pitch != 0: pitch_acc = math.degrees(math.atan2(-ax_g, denominator_pitch))
-        else: pitch_acc = self._pitch
-            
-        self._roll = self.kalmanX.getAngle(roll_acc, gx_dps, dt)
-        self._pitch = self.kalmanY.getAngle(pitch_acc, gy_dps, dt)
-        
     @property
-    def roll(self): return self._roll
+    def orientation(self):
+        """fusion='quaternion' ise 3 boyutlu yönelim (quaternion, rotation_matrix, euler); değilse None."""
+        return self.fusion if isinstance(self.fusion, imu_orientation.Orientation) else None
+
+    @property
+    def roll(self): return self.fusion.roll
     
     @property
-    def pitch(self): return self._pitch
+    def pitch(self): return self.fusion.pitch
 
     @staticmethod
-    def perform_calibration(filename='setup.json'):
+    def perform_calibration(filename='setup.json', bus=1, store=None, hardware_offsets=False):
+        """Ofsetleri ölçüp filename'e (ve verildiyse store geçmişine) yazar.
+
+        hardware_offsets=True ise HARDWARE_OFFSETS anahtarı kaydedilir; kalibrasyon
+        yüklenirken ofsetler yazılımda çıkarılmak yerine sensörün trim
+        registerlarına yazılır (load_hardware_offsets).
+        """
         os.system("clear")
         print("\n" + "="*40)
         print("      IMU KALİBRASYONU BAŞLATILIYOR")
@@ -155,37 +650,27 @@ class ImuDevice:
             print(f"-> '{filename}' bulunamadı, işlem sonunda yenisi oluşturulacak.")
             setup_data = {}
         
-        sensor = ImuDevice() 
-        loop_count = 10000
-        measures = {'ax': 0, 'ay': 0, 'az': 0, 'gx': 0, 'gy': 0, 'gz': 0}
-        
-        print(f"{loop_count} adet veri toplanıyor, lütfen bekleyin...")
-        
-        for i in range(loop_count):
-            print("\b" + ['/', '-', '\\', '|'][i % 4], end='', flush=True)
-            
-            original_accel_offsets, original_gyro_offsets = sensor.offsets['accel'].copy(), sensor.offsets['gyro'].copy() # Tek satırda kopyalama
-            sensor.offsets = {'accel': {'x': 0, 'y': 0, 'z': 0}, 'gyro': {'x': 0, 'y': 0, 'z': 0}}
-            sensor.read_sensor_data()
-
-            measures['ax'] += sensor.accel['x']
-            measures['ay'] += sensor.accel['y']
-            measures['az'] += sensor.accel['z']
-            measures['gx'] += sensor.gyro['x']
-            measures['gy'] += sensor.gyro['y']
-            measures['gz'] += sensor.gyro['z']
-            
-            sensor.offsets['accel'], sensor.offsets['gyro'] = original_accel_offsets, original_gyro_offsets # Tek satırda geri yükleme
-
-        print("\n\nVeri toplama tamamlandı. Ofsetler hesaplanıyor...")
+        sensor = ImuDevice(bus=bus, config=imu_settings.from_setup(setup_data)) # Kayıtlı ayarlarla ölç
+        print("Veri toplanıyor, ortalamalar kesinleşince duracak...")
 
-        setup_data['ACCELERATION_X_OFFSET'] = int(measures['ax'] / loop_count)
-        setup_data['ACCELERATION_Y_OFFSET'] = int(measures['ay'] / loop_count)
-        setup_data['ACCELERATION_Z_OFFSET'] = int(measures['az'] / loop_count) - 16384
-        setup_data['GYROSCOPE_X_OFFSET'] = int(measures['gx'] / loop_count)
-        setup_data['GYROSCOPE_Y_OFFSET'] = int(measures['gy'] / loop_count)
-        setup_data['GYROSCOPE_Z_OFFSET'] = int(measures['gz'] / loop_count)
+        # Ham (ofsetsiz) blok okumalarla akışlı kalibrasyon; her ekseni yeterince kesinleşince durur
+        result = streaming_calibration.calibrate(sensor, accel_scale=sensor.ACCEL_SCALE)
+        streaming_calibration.print_result(result)
+        setup_data.pop(temperature_compensation.SETUP_KEY, None) # Eski model geçmişe karışmasın
+        setup_data.update(result.offsets)
+        setup_data.update(sensor.read_trim_registers()) # Ofsetlerin ölçüldüğü trim değerleri
+        setup_data.update(imu_settings.to_setup(sensor.config)) # Ofsetlerin ölçüldüğü ayarlar ve ölçekler
+        setup_data['HARDWARE_OFFSETS'] = bool(hardware_offsets)
         
+        if store is not None: # Sensör kimliği ve sıcaklıkla birlikte geçmişe eklenir
+            key = calibration_store.device_key(sensor)
+            store.record(key, setup_data, calibration_store.die_temperature(result.mean['temp']))
+            print(f"-> Başarılı: Kalibrasyon '{store.filename}' geçmişine eklendi.")
+            model = temperature_compensation.fit_history(store.history(key))
+            if model is not None: # Farklı sıcaklıklardaki kalibrasyonlardan ofset-sıcaklık modeli
+                setup_data[temperature_compensation.SETUP_KEY] = model.to_setup()
+                print(f"-> Başarılı: {len(store.history(key))} kalibrasyondan sıcaklık modeli oluşturuldu.")
+
         with open(filename, "w") as f: json.dump(setup_data, f, indent=4) # Tek satırda yazma
             
         print(f"-> Başarılı: Ofsetler '{filename}' dosyasına kaydedildi.")
@@ -210,4 +695,6 @@ if __name__ == '__main__':
     print("Bu dosya bir modül (alet kutusu) olarak tasarlanmıştır.")
     print("Doğrudan çalıştırıldığında, sadece kalibrasyon işlemi yapacaktır.")
     input("Lütfen sensörün düz bir zeminde olduğundan emin olun ve devam etmek için Enter'a basın...")
-    ImuDevice.perform_calibration()
+    # --hardware-offsets: ofsetler yüklenirken sensörün trim registerlarına yazılır
+    ImuDevice.perform_calibration(store=calibration_store.CalibrationStore(),
+                                  hardware_offsets='--hardware-offsets' in sys.argv[1:])
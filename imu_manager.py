@@ -0,0 +1,185 @@
+# Görevi: Birden fazla MPU6050'yi (0x68/0x69, birden çok bus) tek yerden
+# yönetmek. Her bus numarası için tek bir SMBus tanıtıcısı açılır ve paylaşılır;
+# her fiziksel bus için bir okuma iş parçacığı çalışır. Böylece ayrı bus'lar
+# paralel okunur, aynı bus'taki sensörler ise sırayla okunur.
+#
+#     manager = ImuManager()
+#     manager.add(1, 0x68, 'sol')
+#     manager.add(1, 0x69, 'sag')
+#     manager.add(3, 0x68, 'govde')
+#     manager.start(rate=500)
+#     aligned = manager.read_aligned()
+#     aligned.samples['sol']  # (timestamp_ns, (ax, ay, az, temp, gx, gy, gz))
+
+import collections
+import time
+
+import imu_acquisition
+import imu_kalman
+
+try:
+    import smbus
+except ImportError:
+    smbus = None
+
+AlignedSamples = collections.namedtuple('AlignedSamples', ['timestamp_ns', 'samples', 'skew_ns'])
+AlignedSamples.__doc__ = """Zamanca hizalanmış örnek seti.
+
+timestamp_ns: referans zaman (en geride kalan sensörün son örneği)
+samples     : isim -> (timestamp_ns, sample)
+skew_ns     : seçilen örneklerin zaman damgaları arasındaki en büyük fark
+"""
+
+
+class BusPool:
+    """Bus numarası başına tek, referans sayaçlı SMBus tanıtıcısı."""
+
+    def __init__(self):
+        self._handles, self._users = {}, {}
+
+    def register(self, bus_number, bus):
+        """bus_number için hazır bir bus nesnesi kullanır (ör. mpu6050_emulator.EmulatedBus)."""
+        self._handles[bus_number] = bus
+        self._users.setdefault(bus_number, 0)
+
+    def get(self, bus_number):
+        if bus_number not in self._handles:
+            if smbus is None: raise ImportError("smbus modülü bulunamadı; register() ile bir bus nesnesi verin.")
+            self._handles[bus_number], self._users[bus_number] = smbus.SMBus(bus_number), 0
+        self._users[bus_number] += 1
+        return self._handles[bus_number]
+
+    def release(self, bus_number):
+        """Son kullanıcı bıraktığında tanıtıcı kapatılır."""
+        self._users[bus_number] -= 1
+        if self._users[bus_number] <= 0:
+            bus = self._handles.pop(bus_number)
+            del self._users[bus_number]
+            close = getattr(bus, 'close', None)
+            if close is not None: close()
+
+    @property
+    def open_handles(self):
+        return len(self._handles)
+
+
+class BusWorker(imu_acquisition.AcquisitionThread):
+    """Bir bus'taki tüm sensörleri her periyotta sırayla okuyup kendi halka tamponlarına yazar.
+
+    ring alanı None'dır; her sensörün tamponu rings[name] altındadır. Zaman
+    damgası, AcquisitionThread'deki gibi okuma başlamadan önce alınır.
+    errors toplam, device_errors sensör başına hata sayısıdır.
+    """
+
+    def __init__(self, bus_number, devices, rate=200.0, capacity=1024):
+        super().__init__(None, rate, None)
+        self.name = 'imu-bus-{}'.format(bus_number)
+        self.readers = [(name, device.read_sample) for name, device in devices.items()]
+        self.rings = {name: imu_acquisition.SampleRing(capacity) for name in devices}
+        self.device_errors = dict.fromkeys(devices, 0)
+
+    def acquire(self):
+        rings = self.rings
+        for name, read in self.readers:
+            try:
+                timestamp_ns = time.perf_counter_ns()
+                rings[name].push(timestamp_ns, read())
+            except OSError as error:
+                self.errors, self.last_error = self.errors + 1, error
+                self.device_errors[name] += 1
+
+
+class ImuManager:
+    """Birden çok ImuDevice'ı paylaşılan bus tanıtıcıları ve bus başına iş parçacıklarıyla okur."""
+
+    def __init__(self, pool=None, device_factory=imu_kalman.ImuDevice):
+        self.pool = pool if pool is not None else BusPool()
+        self.device_factory = device_factory
+        self.devices = {}   # isim -> ImuDevice
+        self.locations = {}  # isim -> (bus_number, address)
+        self.workers = {}   # bus_number -> BusWorker
+
+    def add(self, bus_number, address=0x68, name=None):
+        """Sensörü ekler ve ImuDevice'ı döndürür; isim verilmezse 'bus:adres' kullanılır."""
+        name = name or '{}:0x{:02x}'.format(bus_number, address)
+        if name in self.devices: raise ValueError("'{}' isimli sensör zaten ekli".format(name))
+        if (bus_number, address) in self.locations.values():
+            raise ValueError("bus {} adres 0x{:02x} zaten ekli".format(bus_number, address))
+        bus = self.pool.get(bus_number)
+        try:
+            device = self.device_factory(bus=bus, address=address)
+        except Exception:
+            self.pool.release(bus_number)
+            raise
+        self.devices[name], self.locations[name] = device, (bus_number, address)
+        return device
+
+    def remove(self, name):
+        if self.workers: raise RuntimeError("Okuma sürerken sensör çıkarılamaz; önce stop() çağırın")
+        del self.devices[name]
+        bus_number, _ = self.locations.pop(name)
+        self.pool.release(bus_number)
+
+    def start(self, rate=200.0, capacity=1024):
+        """Her bus için bir BusWorker başlatır; her sensör rate Hz'de okunur."""
+        self.stop()
+        by_bus = collections.defaultdict(dict)
+        for name, (bus_number, _) in self.locations.items():
+            by_bus[bus_number][name] = self.devices[name]
+        for bus_number, devices in by_bus.items():
+            self.workers[bus_number] = BusWorker(bus_number, devices, rate, capacity)
+        for worker in self.workers.values():
+            worker.start()
+        return self
+
+    def stop(self):
+        for worker in self.workers.values():
+            worker.stop()
+        self.workers = {}
+
+    def close(self):
+        """Okumayı durdurur ve tüm bus tanıtıcılarını bırakır."""
+        self.stop()
+        for name in list(self.devices):
+            self.remove(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def ring(self, name):
+        bus_number, _ = self.locations[name]
+        return self.workers[bus_number].rings[name]
+
+    def latest(self):
+        """isim -> en son (timestamp_ns, sample); henüz örneği olmayan sensörler atlanır."""
+        samples = {}
+        for worker in self.workers.values():
+            for name, ring in worker.rings.items():
+                item = ring.latest()
+                if item is not None: samples[name] = item
+        return samples
+
+    def read_aligned(self, timestamp_ns=None):
+        """Her sensörden timestamp_ns'e en yakın örneği seçer.
+
+        timestamp_ns verilmezse sensörlerin son örneklerinden en eskisi
+        referans alınır; böylece hiçbir sensör için gelecekten örnek
+        beklenmez. Henüz hiç örnek yoksa None döndürülür.
+        """
+        rings = {name: ring for worker in self.workers.values() for name, ring in worker.rings.items()}
+        if not rings: return None
+        if timestamp_ns is None:
+            latest = [ring.latest() for ring in rings.values()]
+            if any(item is None for item in latest): return None
+            timestamp_ns = min(item[0] for item in latest)
+        samples = {name: ring.nearest(timestamp_ns) for name, ring in rings.items()}
+        if any(item is None for item in samples.values()): return None
+        stamps = [item[0] for item in samples.values()]
+        return AlignedSamples(timestamp_ns, samples, max(stamps) - min(stamps))
+
+    @property
+    def missed_deadlines(self):
+        return {bus_number: worker.missed_deadlines for bus_number, worker in self.workers.items()}
@@ -0,0 +1,119 @@
+# Görevi: Üç jiroskop eksenini de (yaw dahil) integre eden kuaterniyon tabanlı
+# yönelim durumu. İvmeölçer yalnızca eğimi (roll/pitch) düzeltir; yaw
+# jiroskop integralidir ve manyetometre olmadan zamanla kayar.
+#
+#     sensor = imu_kalman.ImuDevice(fusion='quaternion')
+#     sensor.compute_angles_fifo()          # FIFO partisi tek çağrıda
+#     sensor.fusion.quaternion, sensor.fusion.rotation_matrix, sensor.fusion.euler
+#
+# Güncelleme adımında trigonometrik fonksiyon yoktur: dönüş artışı ikinci
+# dereceden kuaterniyon yaklaşımıyla çarpılır, ivme düzeltmesi vektörel çarpımla
+# yapılır. Euler açıları ve dönüş matrisi sadece istendiğinde hesaplanıp
+# bir sonraki güncellemeye kadar saklanır.
+
+import math
+
+import imu_fusion
+
+DEG_TO_RAD = math.pi / 180.0
+
+
+@imu_fusion.register('quaternion')
+class Orientation(imu_fusion.QuaternionEngine):
+    """Mahony tipi ivme düzeltmeli 3 boyutlu kuaterniyon yönelimi.
+
+    kp/ki: ivme hatasının oransal/integral kazancı (ki > 0 jiroskop bias'ını
+    roll/pitch eksenlerinde kestirir). accel_gate: ivme büyüklüğü 1 g'den bu
+    orandan fazla saparsa (hızlanma, darbe) o örnekte düzeltme yapılmaz.
+    """
+    __slots__ = ('kp', 'ki', 'accel_gate', 'bias_x', 'bias_y', 'bias_z', 'rejected', '_euler', '_matrix')
+    # bias_*: ki ile kestirilen jiroskop düzeltmesi (rad/s)
+
+    def __init__(self, kp=1.0, ki=0.0, accel_gate=0.2):
+        super().__init__()
+        self.kp, self.ki, self.accel_gate = kp, ki, accel_gate
+        self.bias_x, self.bias_y, self.bias_z = 0.0, 0.0, 0.0
+        self.rejected = 0  # Kapı dışında kaldığı için düzeltilmeyen örnek sayısı
+        self._euler = self._matrix = None
+
+    def fuse(self, ax, ay, az, gx, gy, gz, dt):
+        self.fuse_batch(((ax, ay, az, 0, gx, gy, gz),), dt, 1.0, 1.0)
+
+    def fuse_batch(self, samples, dt, accel_scale, gyro_scale):
+        """Ham örnekleri sabit dt ile integre eder; kuaterniyon parti sonunda bir kez normalize edilir.
+
+        İkinci dereceden artış q ⊗ (1 - |h|²/2, h), h = ω·dt/2, normu dördüncü
+        dereceye kadar korur; bu yüzden FIFO partisi boyunca normalizasyon
+        gerekmez.
+        """
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        accel_lsb = 1.0 / accel_scale
+        half_angle = 0.5 * dt * DEG_TO_RAD / gyro_scale  # LSB -> yarım açı (rad)
+        low, high = (1.0 - self.accel_gate) ** 2, (1.0 + self.accel_gate) ** 2
+        half_dt = 0.5 * dt
+        kp, ki = self.kp * half_dt, self.ki * dt
+        bx, by, bz = self.bias_x, self.bias_y, self.bias_z  # rad/s
+        rejected = 0
+
+        for ax, ay, az, _, gx, gy, gz in samples:
+            hx, hy, hz = gx * half_angle, gy * half_angle, gz * half_angle
+            ax, ay, az = ax * accel_lsb, ay * accel_lsb, az * accel_lsb
+            norm = ax * ax + ay * ay + az * az
+            if low <= norm <= high:
+                # Ölçülen ve kuaterniyondan beklenen yerçekimi arasındaki açı hatası (≈1 g, normalize edilmez)
+                vx, vy, vz = q1 * q3 - q0 * q2, q0 * q1 + q2 * q3, 0.5 - q1 * q1 - q2 * q2
+                ex, ey, ez = 2.0 * (ay * vz - az * vy), 2.0 * (az * vx - ax * vz), 2.0 * (ax * vy - ay * vx)
+                if ki:
+                    bx, by, bz = bx + ki * ex, by + ki * ey, bz + ki * ez
+                hx, hy, hz = hx + kp * ex, hy + kp * ey, hz + kp * ez
+            else:
+                rejected += 1
+            if ki:
+                hx, hy, hz = hx + bx * half_dt, hy + by * half_dt, hz + bz * half_dt
+            c = 1.0 - 0.5 * (hx * hx + hy * hy + hz * hz)
+            q0, q1, q2, q3 = (c * q0 - q1 * hx - q2 * hy - q3 * hz, c * q1 + q0 * hx + q2 * hz - q3 * hy,
+                              c * q2 + q0 * hy - q1 * hz + q3 * hx, c * q3 + q0 * hz + q1 * hy - q2 * hx)
+
+        norm = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        self.q0, self.q1, self.q2, self.q3 = q0 * norm, q1 * norm, q2 * norm, q3 * norm
+        self.bias_x, self.bias_y, self.bias_z = bx, by, bz
+        self.rejected += rejected
+        self._euler = self._matrix = None
+
+    def setAngles(self, roll, pitch, yaw=0.0):
+        super().setAngles(roll, pitch, yaw)
+        self._euler = self._matrix = None
+
+    @property
+    def quaternion(self):
+        """(w, x, y, z) birim kuaterniyon: gövde ekseninden dünya eksenine dönüş."""
+        return self.q0, self.q1, self.q2, self.q3
+
+    @property
+    def rotation_matrix(self):
+        """Gövde -> dünya 3x3 dönüş matrisi (satır demetleri)."""
+        if self._matrix is None:
+            q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+            self._matrix = (
+                (1 - 2 * (q2 * q2 + q3 * q3), 2 * (q1 * q2 - q0 * q3), 2 * (q1 * q3 + q0 * q2)),
+                (2 * (q1 * q2 + q0 * q3), 1 - 2 * (q1 * q1 + q3 * q3), 2 * (q2 * q3 - q0 * q1)),
+                (2 * (q1 * q3 - q0 * q2), 2 * (q2 * q3 + q0 * q1), 1 - 2 * (q1 * q1 + q2 * q2)),
+            )
+        return self._matrix
+
+    @property
+    def euler(self):
+        """(roll, pitch, yaw) derece."""
+        if self._euler is None:
+            self._euler = (imu_fusion.QuaternionEngine.roll.fget(self), imu_fusion.QuaternionEngine.pitch.fget(self),
+                           imu_fusion.QuaternionEngine.yaw.fget(self))
+        return self._euler
+
+    @property
+    def roll(self): return self.euler[0]
+
+    @property
+    def pitch(self): return self.euler[1]
+
+    @property
+    def yaw(self): return self.euler[2]
@@ -0,0 +1,322 @@
+# Görevi: Ham IMU akışını sabit boyutlu ikili kayıtlar halinde bellek eşlemeli
+# (mmap) bir dosyaya yazmak ve kaydı daha sonra ImuDevice/KalmanAngle'a canlı
+# veriymiş gibi geri oynatmak.
+#
+#     with Recorder('oturum.imu', sample_rate=1000) as recorder:
+#         recorder.append_batch(sensor.fifo.read())
+#
+#     bus = ReplayBus(Recording('oturum.imu'))
+#     sensor = replay_device(bus)   # Kayıttaki hız ve ölçüm aralıklarıyla; bus başa sarılır
+#     for timestamp_ns, roll, pitch in replay_angles(bus, sensor): ...
+#
+# Dosya düzeni (little-endian): 64 byte başlık, ardından 24 byte'lık kayıtlar
+# (int64 timestamp_ns, 7 x int16 ax ay az temp gx gy gz, uint16 flags).
+# Dosyanın tamamı değil, chunk_records kayıtlık bir pencere eşlenir; böylece
+# çok GB'lık kayıtlar 32 bit sistemlerde de adres alanına sığar.
+
+import mmap
+import os
+import struct
+import time
+
+import imu_kalman
+import imu_settings
+
+MAGIC, VERSION = b'IMUREC\r\n', 1
+HEADER = struct.Struct('<8sHHIqddd16x')  # magic, version, record_size, reserved, count, sample_rate, accel_scale, gyro_scale
+RECORD = struct.Struct('<q7hH')
+
+# Kayıt bayrakları
+FLAG_FIFO = 0x0001      # Örnek FIFO'dan geldi, zaman damgası örnekleme periyodundan türetildi
+FLAG_OVERFLOW = 0x0002  # Bu örnekten önce veri kaybı oldu (FIFO taşması, kaçırılan okuma)
+FLAG_OFFSETS = 0x0004   # Ofsetler uygulanmış (ham olmayan) değerler
+FLAG_VALID = 0x8000     # Yazılmış kayıt; çökme sonrası kayıt sayısını kurtarmak için
+
+
+def _map_window(fileno, first, count, access):
+    """first. kayıttan başlayan count kayıtlık pencereyi eşler; (mmap, pencere içi byte kayması) döndürür."""
+    start = HEADER.size + first * RECORD.size
+    aligned = start - start % mmap.ALLOCATIONGRANULARITY
+    return mmap.mmap(fileno, start - aligned + count * RECORD.size, access=access, offset=aligned), start - aligned
+
+
+class Recorder:
+    """Kayıtları mmap penceresine doğrudan yazan kaydedici.
+
+    Dosya chunk_records kayıtlık adımlarla büyütülür; her pencere değişiminde
+    başlıktaki kayıt sayısı güncellenir. close() dosyayı tam boyuta kırpar.
+    """
+
+    def __init__(self, filename, sample_rate=0.0, accel_scale=16384.0, gyro_scale=131.0, chunk_records=1 << 16):
+        self.filename, self.chunk_records = filename, chunk_records
+        self.sample_rate, self.accel_scale, self.gyro_scale = sample_rate, accel_scale, gyro_scale
+        self.count = 0
+        self._file = open(filename, 'w+b')
+        self._map, self._window_start, self._window_end, self._base = None, 0, 0, 0
+        self._write_header()
+        self._open_window(0)
+
+    def append(self, timestamp_ns, sample, flags=0):
+        """Tek örnek ekler; sample (ax, ay, az, temp, gx, gy, gz) int16 demetidir."""
+        index = self.count
+        if index >= self._window_end:
+            self._open_window(index)
+        ax, ay, az, temperature, gx, gy, gz = sample
+        RECORD.pack_into(self._map, self._base + (index - self._window_start) * RECORD.size,
+                         timestamp_ns, ax, ay, az, temperature, gx, gy, gz, flags | FLAG_VALID)
+        self.count = index + 1
+
+    def append_many(self, items, flags=0):
+        """(timestamp_ns, sample) çiftlerini ekler (ör. SampleReader.read() çıktısı)."""
+        append = self.append
+        for timestamp_ns, sample in items:
+            append(timestamp_ns, sample, flags)
+
+    def append_batch(self, batch, flags=0):
+        """imu_fifo.FifoBatch ekler."""
+        flags |= FLAG_FIFO
+        if batch.overflow: flags |= FLAG_OVERFLOW
+        append = self.append
+        for timestamp, sample in zip(batch.timestamps, batch.samples):
+            append(timestamp, sample, flags)
+            flags &= ~FLAG_OVERFLOW  # Kayıp işareti sadece taşmadan sonraki ilk örnekte
+
+    def flush(self):
+        """Yazılan kayıtları ve kayıt sayısını diske aktarır."""
+        self._map.flush()
+        self._write_header()
+
+    def close(self):
+        if self._file.closed: return
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(HEADER.size + self.count * RECORD.size)
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open_window(self, first):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._write_header()  # Çökme durumunda en fazla bir pencere taranır
+        end = first + self.chunk_records
+        self._file.truncate(HEADER.size + end * RECORD.size)
+        self._map, self._base = _map_window(self._file.fileno(), first, self.chunk_records, mmap.ACCESS_WRITE)
+        self._window_start, self._window_end = first, end
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, self.count,
+                                     self.sample_rate, self.accel_scale, self.gyro_scale))
+        self._file.flush()
+
+
+class Recording:
+    """Kayıt dosyasını okur: len(), indeksleme ve (timestamp_ns, sample, flags) üzerinde yineleme.
+
+    Kaydedici düzgün kapatılmadıysa başlıktaki sayıdan sonra FLAG_VALID
+    taşıyan kayıtlar da sayılır.
+    """
+
+    def __init__(self, filename, chunk_records=1 << 16):
+        self.filename, self.chunk_records = filename, chunk_records
+        self._file = open(filename, 'rb')
+        magic, version, record_size, _, count, self.sample_rate, self.accel_scale, self.gyro_scale = \
+            HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError("'{}' bir IMU kayıt dosyası değil".format(filename))
+        if version != VERSION:
+            raise ValueError("Desteklenmeyen kayıt sürümü: {}".format(version))
+        capacity = (os.fstat(self._file.fileno()).st_size - HEADER.size) // RECORD.size
+        self.count = self._recover(count, capacity)
+        self._map, self._window_start, self._window_end, self._base = None, 0, 0, 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0: index += self.count
+        if not 0 <= index < self.count: raise IndexError("kayıt indeksi aralık dışında")
+        if not self._window_start <= index < self._window_end:
+            self._open_window(index - index % self.chunk_records)
+        timestamp_ns, *sample, flags = RECORD.unpack_from(self._map, self._base + (index - self._window_start) * RECORD.size)
+        return timestamp_ns, tuple(sample), flags & ~FLAG_VALID
+
+    def __iter__(self):
+        for first in range(0, self.count, self.chunk_records):
+            records, base = _map_window(self._file.fileno(), first, min(self.chunk_records, self.count - first),
+                                        mmap.ACCESS_READ)
+            try:
+                with memoryview(records) as view:
+                    for timestamp_ns, ax, ay, az, temperature, gx, gy, gz, flags in RECORD.iter_unpack(view[base:]):
+                        yield timestamp_ns, (ax, ay, az, temperature, gx, gy, gz), flags & ~FLAG_VALID
+            finally:
+                records.close()
+
+    def config(self, default=imu_settings.DEFAULT_CONFIG):
+        """Başlıktaki örnekleme hızı ve ölçeklerden ImuConfig; DLPF kayıtta yoktur, default'tan alınır."""
+        accel_range = min(imu_settings.ACCEL_SCALES, key=lambda g: abs(imu_settings.ACCEL_SCALES[g] - self.accel_scale))
+        gyro_range = min(imu_settings.GYRO_SCALES, key=lambda dps: abs(imu_settings.GYRO_SCALES[dps] - self.gyro_scale))
+        config = default._replace(accel_range=accel_range, gyro_range=gyro_range,
+                                  sample_rate=self.sample_rate or default.sample_rate)
+        try:
+            return imu_settings.validate(config)
+        except ValueError: # Hız bu DLPF ile elde edilemiyor (ör. 8 kHz): DLPF kapalı
+            return imu_settings.validate(config._replace(dlpf=260))
+
+    @property
+    def duration(self):
+        """İlk ve son örnek arasındaki süre (s)."""
+        return (self[-1][0] - self[0][0]) / 1e9 if self.count > 1 else 0.0
+
+    def close(self):
+        if self._map is not None: self._map.close()
+        self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open_window(self, first):
+        if self._map is not None: self._map.close()
+        count = min(self.chunk_records, self.count - first)
+        self._map, self._base = _map_window(self._file.fileno(), first, count, mmap.ACCESS_READ)
+        self._window_start, self._window_end = first, first + count
+
+    def _recover(self, count, capacity):
+        count = min(count, capacity)
+        if count == capacity: return count
+        self._file.seek(HEADER.size + count * RECORD.size)
+        data = self._file.read((capacity - count) * RECORD.size)
+        for _, *_, flags in RECORD.iter_unpack(data):
+            if not flags & FLAG_VALID: break
+            count += 1
+        return count
+
+
+class ReplayBus:
+    """Bir kaydı smbus arayüzüyle sunar; replay_device(ReplayBus(...)) canlı sensör gibi çalışır.
+
+    Ayar registerları kayda göre kurulmaz; sensör ImuDevice(bus=...) ile
+    doğrudan kurulursa kaydın ölçüm aralıkları ayrıca verilmelidir
+    (config=recording.config()).
+
+    ACCEL_XOUT_H'den başlayan her okuma bir sonraki kaydı getirir. Diğer
+    registerlar yazılan değerleri tutar (WHO_AM_I 0x68 döner); FIFO taklit
+    edilmez. realtime=True ise okumalar kayıttaki zamanlara göre (speed kat
+    hızla) bekletilir. Kayıt bitince EOFError fırlatılır, loop=True ise başa
+    dönülür.
+    """
+    ACCEL_XOUT_H, WHO_AM_I = 0x3B, 0x75
+    SENSOR_DATA_FORMAT = struct.Struct('>7h')
+
+    def __init__(self, recording, address=0x68, realtime=False, speed=1.0, loop=False):
+        self.recording, self.address = recording, address
+        self.realtime, self.speed, self.loop = realtime, speed, loop
+        self.registers = bytearray(128)
+        self.registers[self.WHO_AM_I] = 0x68
+        self.rewind()
+
+    def rewind(self):
+        """Oynatmayı ilk kayda döndürür (ör. ImuDevice kurulurken yapılan ilk okumadan sonra)."""
+        self.index, self.timestamp_ns, self.flags = 0, None, 0
+        self.dt = 0.0  # Son iki oynatılan kayıt arasındaki süre (s)
+        self._records = iter(self.recording)
+        self._start = None
+
+    def read_byte_data(self, address, register):
+        return self._read(address, register, 1)[0]
+
+    def write_byte_data(self, address, register, value):
+        self._check(address)
+        self.registers[register] = value & 0xFF
+
+    def read_i2c_block_data(self, address, register, length=32):
+        return self._read(address, register, length)
+
+    def write_i2c_block_data(self, address, register, values):
+        self._check(address)
+        self.registers[register:register + len(values)] = bytes(values)
+
+    def close(self):
+        pass
+
+    def _check(self, address):
+        if address != self.address:
+            raise OSError(121, "Remote I/O error (adres 0x{:02x})".format(address))
+
+    def _read(self, address, register, length):
+        self._check(address)
+        if register == self.ACCEL_XOUT_H: self._advance()
+        return list(self.registers[register:register + length])
+
+    def _advance(self):
+        try:
+            timestamp_ns, sample, self.flags = next(self._records)
+        except StopIteration:
+            if not self.loop or not len(self.recording): raise EOFError("kayıt sonu")
+            self._records, self._start, self.timestamp_ns = iter(self.recording), None, None
+            timestamp_ns, sample, self.flags = next(self._records)
+
+        if self.realtime:
+            if self._start is None: self._start = (time.perf_counter_ns(), timestamp_ns)
+            wall_start, record_start = self._start
+            delay = wall_start + (timestamp_ns - record_start) / self.speed - time.perf_counter_ns()
+            if delay > 0: time.sleep(delay / 1e9)
+
+        self.dt = (timestamp_ns - self.timestamp_ns) / 1e9 if self.timestamp_ns is not None else 0.0
+        self.timestamp_ns = timestamp_ns
+        self.index += 1
+        self.SENSOR_DATA_FORMAT.pack_into(self.registers, self.ACCEL_XOUT_H, *sample)
+
+
+def replay_device(bus, device_factory=imu_kalman.ImuDevice, **options):
+    """ReplayBus için kayıt başlığındaki hız ve ölçüm aralıklarıyla bir sensör kurar.
+
+    Sensör kurulurken ilk kaydı okur (füzyonun başlangıç açıları); ardından
+    bus başa sarılır, böylece replay_angles kaydın tüm örneklerini oynatır.
+    """
+    sensor = device_factory(bus=bus, address=bus.address, config=bus.recording.config(), **options)
+    bus.rewind()
+    return sensor
+
+
+def replay_angles(bus, sensor):
+    """ReplayBus'taki kalan kayıtları sensörün Kalman filtresinden geçirir.
+
+    dt kayıttaki zaman damgalarından alınır, bu yüzden oynatma gerçek zamandan
+    hızlı yapılabilir. (timestamp_ns, roll, pitch) üretir.
+    """
+    while True:
+        try:
+            sensor.read_sensor_data()
+        except EOFError:
+            return
+        sensor.update_angles(bus.dt)
+        yield bus.timestamp_ns, sensor.roll, sensor.pitch
+
+
+def record(sensor, filename, duration, flags=0):
+    """Sensörün FIFO'sunu duration saniye boyunca filename dosyasına kaydeder, kayıt sayısını döndürür."""
+    sensor.enable_fifo()
+    fifo = sensor.fifo
+    with Recorder(filename, sample_rate=1.0 / fifo.sample_period,
+                  accel_scale=sensor.ACCEL_SCALE, gyro_scale=sensor.GYRO_SCALE) as recorder:
+        deadline = time.perf_counter() + duration
+        try:
+            while time.perf_counter() < deadline:
+                batch = fifo.read()
+                recorder.append_batch(batch, flags)
+                if not batch.samples: time.sleep(fifo.sample_period * 10)
+        finally:
+            sensor.disable_fifo()
+        return recorder.count
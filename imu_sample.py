@@ -0,0 +1,74 @@
+# Görevi: Her okumayı değişmez (immutable) bir örnek nesnesi olarak sunmak.
+# Ham değerler ve zaman damgası demet (tuple) içinde tutulur; ölçeklenmiş
+# değerler, açılar ve büyüklükler ilk erişimde hesaplanıp saklanır. Ham veriyle
+# yetinen kod trigonometri maliyeti ödemez, başka iş parçacığındaki okuyucu ise
+# her zaman tutarlı (aynı okumaya ait) eksenler görür.
+#
+#     sample = sensor.read_sample()
+#     sample.ax, sample.timestamp_ns     # ham, anında
+#     sample.roll, sample.accel          # ilk erişimde hesaplanır
+
+import collections
+import functools
+import math
+
+_ImuSampleBase = collections.namedtuple(
+    '_ImuSampleBase', ['ax', 'ay', 'az', 'temp', 'gx', 'gy', 'gz', 'timestamp_ns', 'accel_scale', 'gyro_scale'])
+
+
+class ImuSample(_ImuSampleBase):
+    """Tek okuma: ofsetleri düşülmüş ham int16 değerler, perf_counter_ns zamanı ve ölçekler.
+
+    İlk yedi alan diğer modüllerdeki (ax, ay, az, temp, gx, gy, gz) demetleriyle
+    aynı sıradadır; sample.raw bu demeti verir. Türetilen değerler
+    functools.cached_property ile örnek başına bir kez hesaplanır.
+    """
+
+    @classmethod
+    def from_raw(cls, raw, timestamp_ns, accel_scale, gyro_scale):
+        return tuple.__new__(cls, (*raw, timestamp_ns, accel_scale, gyro_scale))
+
+    @property
+    def raw(self):
+        return self[:7]
+
+    @functools.cached_property
+    def accel(self):
+        """(x, y, z) ivme, g."""
+        scale = self.accel_scale
+        return self.ax / scale, self.ay / scale, self.az / scale
+
+    @functools.cached_property
+    def gyro(self):
+        """(x, y, z) açısal hız, derece/s."""
+        scale = self.gyro_scale
+        return self.gx / scale, self.gy / scale, self.gz / scale
+
+    @functools.cached_property
+    def temperature(self):
+        """Sıcaklık, °C (datasheet: TEMP_OUT / 340 + 36.53)."""
+        return self.temp / 340.0 + 36.53
+
+    @functools.cached_property
+    def roll(self):
+        """İvmeden roll, derece."""
+        ax, ay, az = self.ax, self.ay, self.az
+        return math.degrees(math.atan2(ay, math.sqrt(ax * ax + az * az)))
+
+    @functools.cached_property
+    def pitch(self):
+        """İvmeden pitch, derece."""
+        ax, ay, az = self.ax, self.ay, self.az
+        return math.degrees(math.atan2(-ax, math.sqrt(ay * ay + az * az)))
+
+    @functools.cached_property
+    def accel_magnitude(self):
+        """İvme vektörünün büyüklüğü, g (durağanken ~1)."""
+        ax, ay, az = self.ax, self.ay, self.az
+        return math.sqrt(ax * ax + ay * ay + az * az) / self.accel_scale
+
+    @functools.cached_property
+    def gyro_magnitude(self):
+        """Toplam açısal hız, derece/s."""
+        gx, gy, gz = self.gx, self.gy, self.gz
+        return math.sqrt(gx * gx + gy * gy + gz * gz) / self.gyro_scale
@@ -0,0 +1,109 @@
+# Görevi: MPU6050'nin örnekleme hızı, DLPF bant genişliği ve ivme/jiroskop
+# ölçüm aralığı ayarlarını tek bir yerde tanımlamak. Register değerleri ve
+# ölçek çarpanları (LSB/g, LSB/dps) bu ayarlardan türetilir; ayarlar setup.json
+# içinde ofsetlerin yanında saklanır.
+#
+#     sensor.configure(sample_rate=1000, dlpf=184, gyro_range=2000)
+#     sensor.GYRO_SCALE  # 16.4
+
+import collections
+
+SMPLRT_DIV, CONFIG, GYRO_CONFIG, ACCEL_CONFIG = 0x19, 0x1A, 0x1B, 0x1C
+
+# Ölçüm aralığı -> ölçek (datasheet tablosu); FS_SEL/AFS_SEL aralığın sırasıdır
+ACCEL_SCALES = {2: 16384.0, 4: 8192.0, 8: 4096.0, 16: 2048.0}      # g -> LSB/g
+GYRO_SCALES = {250: 131.0, 500: 65.5, 1000: 32.8, 2000: 16.4}      # dps -> LSB/dps
+# İvme bant genişliği (Hz) -> DLPF_CFG; 260 Hz'de DLPF kapalıdır ve jiroskop 8 kHz'de örneklenir
+DLPF_BANDWIDTHS = {260: 0, 184: 1, 94: 2, 44: 3, 21: 4, 10: 5, 5: 6}
+
+SETUP_KEYS = ('SAMPLE_RATE', 'DLPF_BANDWIDTH', 'ACCEL_RANGE', 'GYRO_RANGE')
+
+ImuConfig = collections.namedtuple('ImuConfig', ['sample_rate', 'dlpf', 'accel_range', 'gyro_range'])
+ImuConfig.__doc__ = """Sensör ayarları.
+
+sample_rate: çıkış veri hızı (Hz); SMPLRT_DIV ile elde edilebilen en yakın değere yuvarlanır
+dlpf       : ivme DLPF bant genişliği (Hz), DLPF_BANDWIDTHS anahtarlarından biri
+accel_range: ±g (2, 4, 8, 16)
+gyro_range : ±dps (250, 500, 1000, 2000)
+"""
+
+# Sürücülerin önceden yazdığı sabit değerler: CONFIG=0x02, SMPLRT_DIV=0x04, ±2 g, ±250 dps
+DEFAULT_CONFIG = ImuConfig(sample_rate=200.0, dlpf=94, accel_range=2, gyro_range=250)
+
+
+def gyro_output_rate(dlpf):
+    return 8000.0 if DLPF_BANDWIDTHS[dlpf] == 0 else 1000.0
+
+
+def validate(config):
+    """Geçersiz ayarda ValueError fırlatır; SMPLRT_DIV ile elde edilen gerçek hızı içeren ayarı döndürür."""
+    for name, table in (('dlpf', DLPF_BANDWIDTHS), ('accel_range', ACCEL_SCALES), ('gyro_range', GYRO_SCALES)):
+        if getattr(config, name) not in table:
+            raise ValueError("Geçersiz {}: {} (geçerli değerler: {})".format(name, getattr(config, name), sorted(table)))
+    base = gyro_output_rate(config.dlpf)
+    divider = round(base / config.sample_rate) - 1
+    if not 0 <= divider <= 255:
+        raise ValueError("Örnekleme hızı {} Hz, DLPF {} Hz ile elde edilemez ({:.2f}..{:.0f} Hz)".format(
+            config.sample_rate, config.dlpf, base / 256, base))
+    return config._replace(sample_rate=base / (1 + divider))
+
+
+def registers(config):
+    """SMPLRT_DIV, CONFIG, GYRO_CONFIG, ACCEL_CONFIG (0x19..0x1C) register değerleri."""
+    config = validate(config)
+    divider = round(gyro_output_rate(config.dlpf) / config.sample_rate) - 1
+    fs_sel = sorted(GYRO_SCALES).index(config.gyro_range)
+    afs_sel = sorted(ACCEL_SCALES).index(config.accel_range)
+    return bytes((divider, DLPF_BANDWIDTHS[config.dlpf], fs_sel << 3, afs_sel << 3))
+
+
+def decode(values):
+    """0x19..0x1C register değerlerinden ImuConfig oluşturur."""
+    divider, dlpf_cfg, gyro_config, accel_config = values
+    dlpf = next((hz for hz, cfg in DLPF_BANDWIDTHS.items() if cfg == dlpf_cfg & 0x07), 260)
+    return ImuConfig(sample_rate=gyro_output_rate(dlpf) / (1 + divider), dlpf=dlpf,
+                     accel_range=sorted(ACCEL_SCALES)[(accel_config >> 3) & 0x03],
+                     gyro_range=sorted(GYRO_SCALES)[(gyro_config >> 3) & 0x03])
+
+
+def read_config(i2c_device):
+    """Sensördeki mevcut ayarları okur."""
+    return decode(i2c_device.read_block(SMPLRT_DIV, 4))
+
+
+def write_config(i2c_device, config):
+    """Ayarları dört registera tek blok yazımıyla uygular; uygulanan (doğrulanmış) ayarı döndürür."""
+    config = validate(config)
+    i2c_device.write_block(SMPLRT_DIV, registers(config))
+    return config
+
+
+def apply_config(i2c_device, config):
+    """write_config gibi, ancak registerlar zaten aynıysa yazmaz: (ayar, yazma sayısı 0/1).
+
+    Gereksiz yazım sensörün örnek sayacını ve FIFO zamanlamasını yeniden başlatır.
+    """
+    config = validate(config)
+    if i2c_device.read_block(SMPLRT_DIV, 4) == registers(config): return config, 0
+    i2c_device.write_block(SMPLRT_DIV, registers(config))
+    return config, 1
+
+
+def scales(config):
+    """(ACCEL_SCALE, GYRO_SCALE): LSB/g ve LSB/dps."""
+    return ACCEL_SCALES[config.accel_range], GYRO_SCALES[config.gyro_range]
+
+
+def to_setup(config):
+    """setup.json'a yazılacak anahtarlar; türetilen ölçekler de kaydedilir."""
+    accel_scale, gyro_scale = scales(config)
+    return {
+        'SAMPLE_RATE': config.sample_rate, 'DLPF_BANDWIDTH': config.dlpf,
+        'ACCEL_RANGE': config.accel_range, 'GYRO_RANGE': config.gyro_range,
+        'ACCEL_SCALE': accel_scale, 'GYRO_SCALE': gyro_scale,
+    }
+
+
+def from_setup(setup_data, default=DEFAULT_CONFIG):
+    """setup.json içeriğinden ImuConfig; eksik anahtarlar default'tan alınır."""
+    return ImuConfig(*(setup_data.get(key, value) for key, value in zip(SETUP_KEYS, default)))
@@ -0,0 +1,163 @@
+# Görevi: imu_kalman.KalmanAngle filtresini kayıtlı veriler ya da FIFO partileri
+# üzerinde NumPy ile toplu çalıştırmak. Sonuçlar skaler filtreyle (getAngle)
+# kayan nokta toleransı içinde aynıdır. NumPy gerektirir.
+#
+# Yöntem: Kalman kazancı ölçümlerden bağımsızdır, yalnızca dt dizisine ve
+# Q/R parametrelerine bağlıdır. Kazançlar bir kez hesaplanır (sabit dt'de P
+# yakınsayınca döngü kısa kesilir) ve aynı dt'yi paylaşan tüm kanallar için
+# ortak kullanılır. Durum güncellemesi her adımda bir afin dönüşüm olduğundan
+# dizi bloklara bölünür: bloklar içinde dönüşümler tüm bloklar için aynı anda
+# birleştirilir, blok başlangıç durumları sırayla taşınır, son olarak tüm
+# çıktılar tek seferde hesaplanır.
+
+import math
+
+import numpy as np
+
+
+def filter_batch(angles, rates, dt, kalman=None, q_angle=0.001, q_bias=0.003, r_measure=0.03,
+                 angle0=0.0, bias0=0.0, P0=None):
+    """Ölçüm açıları, açısal hızlar ve dt dizileri için filtrelenmiş açı ve bias dizilerini döndürür.
+
+    angles, rates: (N,) ya da C bağımsız kanal için (C, N) dizileri.
+    dt: sabit, (N,) (tüm kanallarda ortak) ya da (C, N).
+    kalman: verilirse (tek KalmanAngle ya da kanal başına bir liste) başlangıç
+    durumu ve parametreler ondan alınır, parti sonundaki durum geri yazılır;
+    böylece FIFO partileri canlı filtreyle kesintisiz işlenebilir.
+    """
+    angles, rates = np.asarray(angles, dtype=float), np.asarray(rates, dtype=float)
+    single = angles.ndim == 1
+    z, r = np.atleast_2d(angles), np.atleast_2d(rates)
+    channels, length = z.shape
+    dts = np.broadcast_to(np.asarray(dt, dtype=float), (channels, length) if np.ndim(dt) == 2 else (length,))
+
+    filters = None
+    if kalman is not None:
+        filters = list(kalman) if isinstance(kalman, (list, tuple)) else [kalman]
+        params = [(k.QAngle, k.QBias, k.RMeasure, _flat_P(k.P)) for k in filters]
+        x0 = np.array([[k.angle, k.bias] for k in filters], dtype=float)
+    else:
+        P = (0.0, 0.0, 0.0, 0.0) if P0 is None else tuple(np.ravel(P0))
+        params = [(q_angle, q_bias, r_measure, P)]
+        x0 = np.broadcast_to(np.array([angle0, bias0], dtype=float), (channels, 2))
+
+    if length == 0:
+        empty = np.empty((channels, 0))
+        return (empty[0], empty[0]) if single else (empty, empty.copy())
+
+    # Aynı parametre ve dt'yi paylaşan kanallar ortak kazanç kullanır
+    if dts.ndim == 1 and len(set(params)) == 1:
+        gains = [_gains(dts, *params[0])]
+    else:
+        per_channel_dt = np.broadcast_to(dts, (channels, length))
+        gains = [_gains(per_channel_dt[c], *params[c % len(params)]) for c in range(channels)]
+    K0 = np.array([g[0] for g in gains])
+    K1 = np.array([g[1] for g in gains])
+    g_dt = np.atleast_2d(dts)
+
+    # x_k = M_k x_{k-1} + u_k,  x = (angle, bias)
+    one_minus_k0 = 1.0 - K0
+    a, b = one_minus_k0, -one_minus_k0 * g_dt
+    c, d = -K1, 1.0 + K1 * g_dt
+    rate_dt = g_dt * r
+    u = one_minus_k0 * rate_dt + K0 * z
+    v = K1 * z - K1 * rate_dt
+
+    out_angle, out_bias = _affine_scan(a, b, c, d, u, v, x0)
+
+    if filters is not None:
+        for channel, k in enumerate(filters):
+            gain = gains[channel if len(gains) > 1 else 0]
+            previous_bias = out_bias[channel, -2] if length > 1 else x0[channel, 1]
+            k.angle, k.bias = float(out_angle[channel, -1]), float(out_bias[channel, -1])
+            k.rate = float(r[channel, -1] - previous_bias)
+            P = gain[2]
+            k.P = [[P[0], P[1]], [P[2], P[3]]]
+
+    if single:
+        return out_angle[0], out_bias[0]
+    return out_angle, out_bias
+
+
+def _flat_P(P):
+    return (P[0][0], P[0][1], P[1][0], P[1][1])
+
+
+def _gains(dts, q_angle, q_bias, r_measure, P):
+    """KalmanAngle.getAngle ile aynı sırada kovaryans güncellemesi; (K0, K1, son P) döndürür."""
+    length = len(dts)
+    K0, K1 = np.empty(length), np.empty(length)
+    P00, P01, P10, P11 = P
+    dt_list = dts.tolist()
+
+    i = 0
+    while i < length:
+        step = dt_list[i]
+        old = (P00, P01, P10, P11)
+        P00 += step * (step * P11 - P01 - P10 + q_angle)
+        P01 -= step * P11
+        P10 -= step * P11
+        P11 += q_bias * step
+        s = P00 + r_measure
+        k0, k1 = P00 / s, P10 / s
+        P00, P01, P10, P11 = P00 - k0 * P00, P01 - k0 * P01, P10 - k1 * P00, P11 - k1 * P01
+        K0[i], K1[i] = k0, k1
+        i += 1
+
+        # P sabitlendiyse aynı dt devam ettiği sürece kazanç değişmez
+        if i < length and dt_list[i] == step and _converged(old, (P00, P01, P10, P11)):
+            changed = np.flatnonzero(dts[i:] != step)
+            end = i + (int(changed[0]) if len(changed) else length - i)
+            K0[i:end], K1[i:end] = k0, k1
+            i = end
+    return K0, K1, (P00, P01, P10, P11)
+
+
+def _converged(old, new):
+    return all(abs(n - o) <= 1e-15 * abs(o) for o, n in zip(old, new))
+
+
+def _affine_scan(a, b, c, d, u, v, x0):
+    """x_k = [[a, b], [c, d]]_k x_{k-1} + (u, v)_k yinelemesini bloklar halinde çözer."""
+    channels, length = u.shape
+    block = max(1, int(math.sqrt(length)))
+    blocks = -(-length // block)
+    pad = blocks * block - length
+
+    def layout(x, fill):
+        # (..., N) -> (..., block, blocks): adım j'deki tüm blokların değerleri bitişik
+        x = np.broadcast_to(x, (x.shape[0], length))
+        if pad:
+            x = np.concatenate([x, np.full((x.shape[0], pad), fill)], axis=1)
+        return np.ascontiguousarray(x.reshape(x.shape[0], blocks, block).swapaxes(1, 2))
+
+    a, b, c, d = layout(a, 1.0), layout(b, 0.0), layout(c, 0.0), layout(d, 1.0)
+    u, v = layout(u, 0.0), layout(v, 0.0)
+
+    # Blok başından j. adıma kadar birleşik dönüşüm (A, cu/cv), tüm bloklar için aynı anda
+    Aa, Ab, Ac, Ad = a.copy(), b.copy(), c.copy(), d.copy()
+    cu, cv = u.copy(), v.copy()
+    for j in range(1, block):
+        aj, bj, cj, dj = a[:, j], b[:, j], c[:, j], d[:, j]
+        Aa[:, j] = aj * Aa[:, j - 1] + bj * Ac[:, j - 1]
+        Ab[:, j] = aj * Ab[:, j - 1] + bj * Ad[:, j - 1]
+        Ac[:, j] = cj * Aa[:, j - 1] + dj * Ac[:, j - 1]
+        Ad[:, j] = cj * Ab[:, j - 1] + dj * Ad[:, j - 1]
+        cu[:, j] = aj * cu[:, j - 1] + bj * cv[:, j - 1] + u[:, j]
+        cv[:, j] = cj * cu[:, j - 1] + dj * cv[:, j - 1] + v[:, j]
+
+    # Blok başlangıç durumlarını sırayla taşı
+    start_angle, start_bias = np.empty((channels, blocks)), np.empty((channels, blocks))
+    s_angle, s_bias = x0[:, 0].copy(), x0[:, 1].copy()
+    last = block - 1
+    for k in range(blocks):
+        start_angle[:, k], start_bias[:, k] = s_angle, s_bias
+        s_angle, s_bias = (Aa[:, last, k] * s_angle + Ab[:, last, k] * s_bias + cu[:, last, k],
+                           Ac[:, last, k] * s_angle + Ad[:, last, k] * s_bias + cv[:, last, k])
+
+    angle = Aa * start_angle[:, None, :] + Ab * start_bias[:, None, :] + cu
+    bias = Ac * start_angle[:, None, :] + Ad * start_bias[:, None, :] + cv
+
+    def unlayout(x):
+        return x.swapaxes(1, 2).reshape(x.shape[0], -1)[:, :length]
+    return unlayout(angle), unlayout(bias)
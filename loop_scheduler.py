@@ -0,0 +1,124 @@
+# Görevi: Bir döngü adımını (okuma -> filtre -> yayın) mutlak zaman hedefleriyle
+# sabit hızda çalıştırmak. "İş + sleep(0.1)" kalıbında hız işin süresi kadar
+# kayar; burada her adımın hedef zamanı başlangıçtan itibaren k * periyottur.
+#
+#     loop = FixedRateLoop(step, rate=200)
+#     loop.run()            # Ctrl+C ya da loop.stop() ile durur
+#     print(loop.report())
+#
+# Adım periyodu aşarsa (overrun) iki politika vardır:
+#     'skip'     : kaçırılan hedefler atlanır, bir sonraki hedefe hizalanır
+#     'catch_up' : kaçırılan adımlar beklemeden art arda çalıştırılır
+#                  (en fazla max_catch_up; daha fazlası atlanır)
+
+import array
+import time
+
+SKIP, CATCH_UP = 'skip', 'catch_up'
+
+
+class FixedRateLoop:
+    """step() fonksiyonunu rate Hz'de çalıştırır; gecikme, overrun ve atlama sayaçlarını tutar.
+
+    step False döndürürse döngü durur. Gecikme (hedef zamana göre başlama
+    gecikmesi) son history_size adım için saklanır ve yüzdelikleri report()
+    ile alınır. spin > 0 ise son spin saniye sleep yerine meşgul beklemeyle
+    geçirilir (daha düşük titreme, daha yüksek CPU).
+    """
+
+    def __init__(self, step, rate=200.0, policy=SKIP, max_catch_up=5, spin=0.0, history_size=10000):
+        if policy not in (SKIP, CATCH_UP): raise ValueError("Bilinmeyen politika: {}".format(policy))
+        self.step, self.policy, self.max_catch_up = step, policy, max_catch_up
+        self.period_ns, self.spin_ns = int(1e9 / rate), int(spin * 1e9)
+        self.history_size = history_size
+        self.reset()
+
+    def reset(self):
+        self.iterations, self.overruns, self.skipped = 0, 0, 0
+        self.lateness = array.array('q', bytes(8 * self.history_size))
+        self.started_ns = self.stopped_ns = None
+        self._running = False
+
+    @property
+    def rate(self):
+        return 1e9 / self.period_ns
+
+    def stop(self):
+        """Döngüyü mevcut adımdan sonra durdurur (step içinden ya da başka iş parçacığından)."""
+        self._running = False
+
+    def run(self, duration=None, iterations=None):
+        """Döngüyü çalıştırır; duration saniye ya da iterations adım sonra (verildiyse) döner.
+
+        Sayaçlar ve report() her çalıştırmada sıfırdan başlar (son çalıştırmayı gösterir).
+        """
+        period, spin, step = self.period_ns, self.spin_ns, self.step
+        lateness, history = self.lateness, self.history_size
+        now = time.perf_counter_ns()
+        end = now + int(duration * 1e9) if duration is not None else None
+        last = iterations
+        self.iterations, self.overruns, self.skipped = 0, 0, 0
+        limit = 0 if self.policy == SKIP else self.max_catch_up
+        self.started_ns, deadline = now, now
+        self._running = True
+        try:
+            while self._running:
+                start = time.perf_counter_ns()
+                lateness[self.iterations % history] = start - deadline
+                self.iterations += 1
+                if step() is False or self.iterations == last:
+                    break
+
+                deadline += period
+                now = time.perf_counter_ns()
+                if now - start > period:
+                    self.overruns += 1
+                if end is not None and now >= end:
+                    break
+                if now >= deadline:
+                    # Tamamen kaçırılan hedefler: politika sınırını aşanlar atlanır,
+                    # kalanlar beklemeden art arda çalıştırılır
+                    missed = (now - deadline) // period
+                    if missed > limit:
+                        self.skipped += missed - limit
+                        deadline += (missed - limit) * period
+                    continue
+                self._wait(deadline, spin)
+        finally:
+            self._running = False
+            self.stopped_ns = time.perf_counter_ns()
+
+    def _wait(self, deadline, spin):
+        delay = deadline - spin - time.perf_counter_ns()
+        if delay > 0:
+            time.sleep(delay / 1e9)
+        while time.perf_counter_ns() < deadline:
+            pass
+
+    def percentiles(self, points=(50, 90, 99, 100)):
+        """Başlama gecikmesi yüzdelikleri (s)."""
+        count = min(self.iterations, self.history_size)
+        if count == 0: return {p: 0.0 for p in points}
+        values = sorted(self.lateness[:count])
+        return {p: values[min(count - 1, (p * count) // 100)] / 1e9 for p in points}
+
+    def report(self):
+        """Hedef ve ulaşılan hız, gecikme yüzdelikleri ve overrun/atlama sayaçları."""
+        elapsed = ((self.stopped_ns or time.perf_counter_ns()) - self.started_ns) / 1e9 if self.started_ns else 0.0
+        late = self.percentiles()
+        return {
+            'target_rate': self.rate,
+            'achieved_rate': self.iterations / elapsed if elapsed else 0.0,
+            'iterations': self.iterations,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'lateness_p50': late[50], 'lateness_p90': late[90], 'lateness_p99': late[99], 'lateness_max': late[100],
+        }
+
+
+def print_report(report):
+    """report() çıktısını tek satırlık bir özet olarak yazar."""
+    print("Hız: {achieved_rate:.1f} / {target_rate:.1f} Hz | Gecikme p50/p99/max: "
+          "{p50:.2f} / {p99:.2f} / {pmax:.2f} ms | Overrun: {overruns} | Atlanan: {skipped}".format(
+              p50=report['lateness_p50'] * 1e3, p99=report['lateness_p99'] * 1e3,
+              pmax=report['lateness_max'] * 1e3, **report))
@@ -0,0 +1,381 @@
+# Görevi: Donanım ve smbus olmadan çalışabilmek için MPU6050'nin register
+# haritasını süreç içinde taklit etmek. EmulatedBus, smbus.SMBus ile aynı
+# metotları sunar ve I2cDevice'a bus numarası yerine verilebilir:
+#
+#     bus = EmulatedBus(Mpu6050Emulator(seed=1), latency=100e-6)
+#     sensor = imu_kalman.ImuDevice(bus=bus)
+
+import ctypes
+import errno
+import math
+import random
+import struct
+import threading
+import time
+
+import i2c_rdwr
+
+
+class ManualClock:
+    """Elle ilerletilen saat; emülatörü gerçek zamandan bağımsız ve tekrarlanabilir yapar."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class StaticMotion:
+    """Sabit duruşta (roll/pitch derece) bekleyen sensör."""
+
+    def __init__(self, roll=0.0, pitch=0.0):
+        self.accel = gravity_vector(roll, pitch)
+
+    def __call__(self, t):
+        return self.accel, (0.0, 0.0, 0.0)
+
+
+class OscillatingMotion:
+    """X (roll) ya da Y (pitch) ekseni etrafında sinüzoidal salınım."""
+
+    def __init__(self, axis='x', amplitude=30.0, frequency=0.5):
+        self.axis, self.amplitude, self.frequency = axis, amplitude, frequency
+
+    def __call__(self, t):
+        w = 2 * math.pi * self.frequency
+        angle = self.amplitude * math.sin(w * t)
+        rate = self.amplitude * w * math.cos(w * t)
+        if self.axis == 'x':
+            return gravity_vector(angle, 0.0), (rate, 0.0, 0.0)
+        return gravity_vector(0.0, angle), (0.0, rate, 0.0)
+
+
+def gravity_vector(roll, pitch):
+    """Verilen roll/pitch (derece) duruşunda ivmeölçerin gördüğü yerçekimi (g)."""
+    roll, pitch = math.radians(roll), math.radians(pitch)
+    return (-math.sin(pitch), math.sin(roll) * math.cos(pitch), math.cos(roll) * math.cos(pitch))
+
+
+class Mpu6050Emulator:
+    """MPU6050 register haritasının deterministik emülatörü.
+
+    Güç, konfigürasyon ve örnekleme hızı registerlarını, SMPLRT_DIV/DLPF
+    hızında ilerleyen veri registerlarını, FIFO'yu ve ofset (trim)
+    registerlarını modeller. Gürültü yoğunluğu (g/√Hz, dps/√Hz) DLPF bant
+    genişliğiyle ölçeklenir; bias değerleri g ve dps cinsindendir.
+    """
+    XA_OFFSET_H, XG_OFFSET_H = 0x06, 0x13
+    SMPLRT_DIV, CONFIG, GYRO_CONFIG, ACCEL_CONFIG = 0x19, 0x1A, 0x1B, 0x1C
+    FIFO_EN, INT_ENABLE, INT_STATUS = 0x23, 0x38, 0x3A
+    ACCEL_XOUT_H, DATA_LENGTH = 0x3B, 14
+    USER_CTRL, PWR_MGMT_1 = 0x6A, 0x6B
+    FIFO_COUNT_H, FIFO_COUNT_L, FIFO_R_W, WHO_AM_I = 0x72, 0x73, 0x74, 0x75
+
+    DEVICE_RESET, SLEEP = 0x80, 0x40
+    FIFO_ENABLE, FIFO_RESET = 0x40, 0x04
+    DATA_RDY_INT, FIFO_OFLOW_INT = 0x01, 0x10
+    FIFO_SIZE = 1024
+
+    # DLPF_CFG 0..7 için ivme/jiroskop bant genişlikleri (Hz)
+    ACCEL_BANDWIDTH = (260, 184, 94, 44, 21, 10, 5, 260)
+    GYRO_BANDWIDTH = (256, 188, 98, 42, 20, 10, 5, 256)
+
+    DATA_FORMAT, WORD_FORMAT = struct.Struct('>7h'), struct.Struct('>h')
+
+    def __init__(self, address=0x68, clock=None, seed=0, motion=None,
+                 accel_bias=(0.02, -0.015, 0.03), gyro_bias=(1.5, -0.8, 0.4),
+                 accel_noise_density=400e-6, gyro_noise_density=0.005,
+                 gyro_bias_tempco=(0.0, 0.0, 0.0), temperature=25.0,
+                 factory_accel_trim=(-2796, 1203, 1489), reset_duration=0.05):
+        self.address = address
+        self.clock = clock or time.perf_counter
+        self.motion = motion or StaticMotion()
+        self.accel_bias, self.gyro_bias = accel_bias, gyro_bias
+        self.accel_noise_density, self.gyro_noise_density = accel_noise_density, gyro_noise_density
+        self.gyro_bias_tempco = gyro_bias_tempco
+        self.temperature = temperature
+        self.factory_accel_trim = factory_accel_trim
+        self.reset_duration = reset_duration
+        self.random = random.Random(seed)
+        self.samples_generated = 0
+        self.power_on_reset()
+
+    # --- Register erişimi (EmulatedBus tarafından çağrılır) ---
+
+    def read(self, register, length):
+        self._update()
+        if register == self.FIFO_R_W:
+            return self._pop_fifo(length)
+        end = register + length
+        data = list(self.regs[register:end])
+        if register <= self.INT_STATUS < end:
+            self.regs[self.INT_STATUS] = 0  # Okununca temizlenir
+        if register <= self.FIFO_R_W < end:
+            data[self.FIFO_R_W - register:] = self._pop_fifo(end - self.FIFO_R_W)
+        return data
+
+    def write(self, register, values):
+        self._update()
+        for offset, value in enumerate(values):
+            self._write_register(register + offset, value & 0xFF)
+
+    # --- Durum ---
+
+    def power_on_reset(self):
+        self.regs = bytearray(128)
+        self.regs[self.PWR_MGMT_1] = self.SLEEP
+        self.regs[self.WHO_AM_I] = 0x68
+        for axis, trim in enumerate(self.factory_accel_trim):
+            self._set_word(self.XA_OFFSET_H + 2 * axis, trim)
+        self.fifo = bytearray()
+        self._reset_until = None
+        self._rebase(self.clock())
+
+    @property
+    def sample_rate(self):
+        dlpf_cfg = self.regs[self.CONFIG] & 0x07
+        gyro_rate = 8000.0 if dlpf_cfg in (0, 7) else 1000.0
+        return gyro_rate / (1 + self.regs[self.SMPLRT_DIV])
+
+    @property
+    def accel_lsb_per_g(self):
+        return 16384.0 / (1 << ((self.regs[self.ACCEL_CONFIG] >> 3) & 0x03))
+
+    @property
+    def gyro_lsb_per_dps(self):
+        return 131.0 / (1 << ((self.regs[self.GYRO_CONFIG] >> 3) & 0x03))
+
+    def _rebase(self, now):
+        # Hız ya da uyku durumu değişince örnek sayacı yeniden başlatılır
+        self._t0, self._index = now, 0
+
+    def _write_register(self, register, value):
+        if register == self.PWR_MGMT_1:
+            if value & self.DEVICE_RESET:
+                self.power_on_reset()
+                self.regs[self.PWR_MGMT_1] = self.DEVICE_RESET | self.SLEEP
+                self._reset_until = self.clock() + self.reset_duration
+                return
+            self.regs[register] = value
+            self._rebase(self.clock())
+        elif register == self.USER_CTRL:
+            if value & self.FIFO_RESET:
+                self.fifo.clear()
+                self._update_fifo_count()
+            self.regs[register] = value & ~self.FIFO_RESET
+        elif register in (self.SMPLRT_DIV, self.CONFIG):
+            self.regs[register] = value
+            self._rebase(self.clock())
+        elif register in (self.INT_STATUS, self.FIFO_COUNT_H, self.FIFO_COUNT_L, self.WHO_AM_I):
+            pass  # Salt okunur
+        elif register == self.FIFO_R_W:
+            self._push_fifo(bytes([value]))
+        elif self.ACCEL_XOUT_H <= register < self.ACCEL_XOUT_H + self.DATA_LENGTH:
+            pass  # Salt okunur veri registerları
+        else:
+            self.regs[register] = value
+
+    def _update(self):
+        now = self.clock()
+        if self._reset_until is not None:
+            if now < self._reset_until:
+                return
+            self._reset_until = None
+            self.regs[self.PWR_MGMT_1] = self.SLEEP
+            self._rebase(now)
+        if self.regs[self.PWR_MGMT_1] & self.SLEEP:
+            return
+
+        rate = self.sample_rate
+        target = int((now - self._t0) * rate)
+        if target <= self._index:
+            return
+
+        fifo_on = self.regs[self.USER_CTRL] & self.FIFO_ENABLE and self.regs[self.FIFO_EN]
+        # FIFO kapalıyken sadece en son örnek, açıkken FIFO'yu dolduracak kadar örnek üretilir
+        keep = self.FIFO_SIZE // self.DATA_LENGTH + 1 if fifo_on else 1
+        first = max(self._index + 1, target - keep + 1)
+        if first > self._index + 1 and fifo_on:
+            self.regs[self.INT_STATUS] |= self.FIFO_OFLOW_INT
+        for index in range(first, target + 1):
+            data = self._generate(self._t0 + index / rate)
+            if fifo_on:
+                self._push_fifo(data)
+        self.regs[self.ACCEL_XOUT_H:self.ACCEL_XOUT_H + self.DATA_LENGTH] = data
+        self.regs[self.INT_STATUS] |= self.DATA_RDY_INT
+        self._index = target
+
+    def _generate(self, t):
+        accel, gyro = self.motion(t)
+        dlpf_cfg = self.regs[self.CONFIG] & 0x07
+        accel_sigma = self.accel_noise_density * math.sqrt(self.ACCEL_BANDWIDTH[dlpf_cfg])
+        gyro_sigma = self.gyro_noise_density * math.sqrt(self.GYRO_BANDWIDTH[dlpf_cfg])
+        accel_lsb, gyro_lsb = self.accel_lsb_per_g, self.gyro_lsb_per_dps
+        gauss, dtemp = self.random.gauss, self.temperature - 25.0
+
+        values = []
+        for axis in range(3):
+            g = accel[axis] + self.accel_bias[axis] + gauss(0.0, accel_sigma)
+            trim = (self._word(self.XA_OFFSET_H + 2 * axis) & ~1) - (self.factory_accel_trim[axis] & ~1)
+            values.append(round(g * accel_lsb + trim * accel_lsb / 2048.0))
+        values.append(round((self.temperature - 36.53) * 340.0))
+        for axis in range(3):
+            dps = gyro[axis] + self.gyro_bias[axis] + self.gyro_bias_tempco[axis] * dtemp + gauss(0.0, gyro_sigma)
+            trim = self._word(self.XG_OFFSET_H + 2 * axis)
+            values.append(round(dps * gyro_lsb + trim * gyro_lsb / 32.8))
+
+        self.samples_generated += 1
+        return self.DATA_FORMAT.pack(*[max(-32768, min(32767, v)) for v in values])
+
+    def _push_fifo(self, data):
+        self.fifo += data
+        if len(self.fifo) > self.FIFO_SIZE:
+            del self.fifo[:len(self.fifo) - self.FIFO_SIZE]  # En eski veri üzerine yazılır
+            self.regs[self.INT_STATUS] |= self.FIFO_OFLOW_INT
+        self._update_fifo_count()
+
+    def _pop_fifo(self, length):
+        data = list(self.fifo[:length])
+        del self.fifo[:length]
+        self._update_fifo_count()
+        return data + [0] * (length - len(data))
+
+    def _update_fifo_count(self):
+        self.regs[self.FIFO_COUNT_H], self.regs[self.FIFO_COUNT_L] = len(self.fifo) >> 8, len(self.fifo) & 0xFF
+
+    def _word(self, register):
+        return self.WORD_FORMAT.unpack_from(self.regs, register)[0]
+
+    def _set_word(self, register, value):
+        self.WORD_FORMAT.pack_into(self.regs, register, value)
+
+
+class EmulatedBus:
+    """smbus.SMBus yerine kullanılabilen, emülatörleri adreslerine göre yönlendiren bus.
+
+    latency: her işlem için sabit gecikme (s), byte_latency: aktarılan byte başına
+    gecikme (s; 400 kHz'de ~22.5e-6). ManualClock ile kullanıldığında gecikme
+    uyumak yerine saati ilerletir. Aynı bus'taki işlemler, gerçek I2C
+    adaptöründe olduğu gibi sırayla yürütülür. error_rate: işlemlerin rastgele
+    OSError (EIO) ile başarısız olma olasılığı; fail_next() ile belirli sayıda
+    işlem kesin olarak başarısız yapılabilir.
+    """
+
+    def __init__(self, *devices, latency=0.0, byte_latency=0.0, max_block_size=32, error_rate=0.0, seed=0):
+        self.devices = {device.address: device for device in devices}
+        self.latency, self.byte_latency = latency, byte_latency
+        self.max_block_size = max_block_size
+        self.error_rate, self.random, self.pending_failures = error_rate, random.Random(seed), 0
+        self.transactions, self.bytes_read, self.bytes_written = 0, 0, 0
+        self._lock = threading.Lock()
+
+    def reset_statistics(self):
+        self.transactions, self.bytes_read, self.bytes_written = 0, 0, 0
+
+    def read_byte_data(self, address, register):
+        return self._transfer(address, register, 1, None)[0]
+
+    def write_byte_data(self, address, register, value):
+        self._transfer(address, register, 0, [value])
+
+    def read_i2c_block_data(self, address, register, length=32):
+        if length > self.max_block_size:
+            raise ValueError("Blok uzunluğu en fazla {} byte olabilir".format(self.max_block_size))
+        return self._transfer(address, register, length, None)
+
+    def read_i2c_block_data_into(self, address, register, buffer):
+        """read_i2c_block_data gibi, ancak sonucu yazılabilir buffer'a kopyalar."""
+        length = len(buffer)
+        if length > self.max_block_size:
+            raise ValueError("Blok uzunluğu en fazla {} byte olabilir".format(self.max_block_size))
+        buffer[:] = bytes(self._transfer(address, register, length, None))
+
+    def write_i2c_block_data(self, address, register, values):
+        if len(values) > self.max_block_size:
+            raise ValueError("Blok uzunluğu en fazla {} byte olabilir".format(self.max_block_size))
+        self._transfer(address, register, 0, values)
+
+    def fail_next(self, count=1):
+        """Sonraki count işlemi OSError ile başarısız yapar (hat paraziti, arbitrasyon kaybı)."""
+        self.pending_failures += count
+
+    def close(self):
+        pass
+
+    def _transfer(self, address, register, length, values):
+        device = self.devices.get(address)
+        with self._lock:
+            self.transactions += 1
+            self._wait(1 + length + (len(values) if values else 0))
+            if device is None:
+                raise OSError(121, "Remote I/O error")  # Adres NACK
+            if self.pending_failures:
+                self.pending_failures -= 1
+                raise OSError(5, "Input/output error")
+            if self.error_rate and self.random.random() < self.error_rate:
+                raise OSError(5, "Input/output error")
+            if values is not None:
+                self.bytes_written += len(values)
+                device.write(register, values)
+                return None
+            self.bytes_read += length
+            return device.read(register, length)
+
+    def _wait(self, byte_count):
+        delay = self.latency + self.byte_latency * byte_count
+        if delay <= 0:
+            return
+        clocks = {getattr(device, 'clock', None) for device in self.devices.values()}
+        manual = [clock for clock in clocks if isinstance(clock, ManualClock)]
+        if manual:
+            for clock in manual:
+                clock.advance(delay)
+        else:
+            time.sleep(delay)
+
+
+class FakeI2cCharDevice:
+    """/dev/i2c-N yerine geçen sahte karakter aygıtı (i2c_rdwr.I2cRdwrBus testleri için).
+
+    open/ioctl/close os.open/fcntl.ioctl/os.close gibi davranır. I2C_RDWR
+    mesajları ctypes belleğinden çözülür ve EmulatedBus'a tek işlem olarak
+    iletilir; böylece gecikme, hata enjeksiyonu ve işlem sayaçları geçerlidir.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.opened, self.ioctls, self._next_fd = {}, 0, 3
+
+    def open(self, path, flags):
+        fd, self._next_fd = self._next_fd, self._next_fd + 1
+        self.opened[fd] = path
+        return fd
+
+    def close(self, fd):
+        if self.opened.pop(fd, None) is None:
+            raise OSError(errno.EBADF, "Bad file descriptor")
+
+    def ioctl(self, fd, request, argument):
+        if fd not in self.opened:
+            raise OSError(errno.EBADF, "Bad file descriptor")
+        if request != i2c_rdwr.I2C_RDWR:
+            raise OSError(errno.ENOTTY, "Inappropriate ioctl for device")
+        self.ioctls += 1
+        data = i2c_rdwr.I2cRdwrIoctlData.from_buffer_copy(argument)
+        messages = data.msgs[:data.nmsgs]
+        reads = [bool(message.flags & i2c_rdwr.I2C_M_RD) for message in messages]
+        if reads == [False, True] and messages[0].len == 1:
+            # Register yaz + repeated start + oku
+            address, length = messages[1].addr, messages[1].len
+            values = self.bus.read_i2c_block_data(address, messages[0].buf[0], length)
+            ctypes.memmove(messages[1].buf, bytes(values), length)
+        elif reads == [False] and messages[0].len >= 2:
+            payload = messages[0].buf[:messages[0].len]
+            self.bus.write_i2c_block_data(messages[0].addr, payload[0], payload[1:])
+        else:
+            raise OSError(errno.EOPNOTSUPP, "Desteklenmeyen I2C_RDWR mesaj dizisi")
+        return 0
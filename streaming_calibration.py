@@ -0,0 +1,146 @@
+# Görevi: Sabit 10000 örnek yerine, her eksenin ortalaması yeterince kesinleşir
+# kesinleşmez duran akışlı bir kalibrasyon motoru sağlamak. Ortalama ve varyans
+# Welford yöntemiyle örnek örnek güncellenir; her eksenin güven aralığı yarı
+# genişliği toleransın altına indiğinde toplama biter.
+
+import collections
+import statistics
+import struct
+import time
+
+import imu_fifo
+
+AXES = ('ax', 'ay', 'az', 'temp', 'gx', 'gy', 'gz')
+OFFSET_KEYS = {
+    'ax': 'ACCELERATION_X_OFFSET', 'ay': 'ACCELERATION_Y_OFFSET', 'az': 'ACCELERATION_Z_OFFSET',
+    'gx': 'GYROSCOPE_X_OFFSET', 'gy': 'GYROSCOPE_Y_OFFSET', 'gz': 'GYROSCOPE_Z_OFFSET',
+}
+# INT_STATUS (0x3A) veri registerlarının hemen önündedir: bayrak ve örnek tek blok okumada gelir
+DATA_RDY_BIT, STATUS_SAMPLE_FORMAT = 0x01, struct.Struct('>B7h')
+
+CalibrationResult = collections.namedtuple(
+    'CalibrationResult', ['offsets', 'mean', 'std', 'half_width', 'samples', 'duration', 'converged'])
+CalibrationResult.__doc__ = """Kalibrasyon sonucu.
+
+offsets   : setup.json anahtarlarıyla tamsayı ofsetler
+mean, std : eksen başına ('ax' .. 'gz', 'temp') ham ortalama ve gürültü (standart sapma)
+half_width: ortalamanın güven aralığı yarı genişliği (LSB)
+converged : tüm eksenler max_samples'a ulaşmadan toleransa indiyse True
+"""
+
+
+class RunningStats:
+    """Welford yöntemiyle akan veriden ortalama ve varyans."""
+    __slots__ = ('count', 'mean', 'M2')
+
+    def __init__(self):
+        self.count, self.mean, self.M2 = 0, 0.0, 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.M2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self.M2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+    def half_width(self, z):
+        return z * self.std / self.count ** 0.5 if self.count else float('inf')
+
+
+def calibrate(sensor, accel_scale=16384.0, confidence=0.95, accel_tolerance=8.0, gyro_tolerance=1.0,
+              min_samples=200, max_samples=10000, use_fifo=False, check_every=50, warmup=10):
+    """Sensör düz ve hareketsizken ofsetleri hesaplar.
+
+    Örnekler INT_STATUS ile birlikte tek blokta okunur ve yalnızca DATA_RDY
+    bayrağı kalkmışsa (sensör yeni örnek üretmişse) sayılır; okumalar arasında
+    sensör periyodu kadar beklenir. use_fifo=True ise örnekler sensörün
+    FIFO'sundan toplu okunur. Toleranslar ham LSB
+    cinsindendir; ofsetler tamsayı olduğundan daha dar toleranslar anlamsızdır.
+    Sensör uyandıktan hemen sonraki ilk warmup örnek (sıfır ya da oturmamış
+    değerler) istatistiğe katılmaz.
+    """
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    stats = {axis: RunningStats() for axis in AXES}
+    tolerances = {axis: (gyro_tolerance if axis[0] == 'g' else accel_tolerance) for axis in OFFSET_KEYS}
+    batches = _fifo_batches(sensor) if use_fifo else _burst_batches(sensor)
+    skipped = 0
+    while skipped < warmup:
+        skipped += len(next(batches))
+
+    start, converged, next_check = time.perf_counter(), False, min_samples
+    count = 0
+    while count < max_samples:
+        for sample in next(batches):
+            for axis_stats, value in zip(stats.values(), sample):
+                axis_stats.add(value)
+            count += 1
+            if count >= max_samples:
+                break
+        if count >= next_check:
+            next_check = count + check_every
+            if all(stats[axis].half_width(z) <= tolerance for axis, tolerance in tolerances.items()):
+                converged = True
+                break
+    batches.close()
+
+    offsets = {key: int(round(stats[axis].mean)) for axis, key in OFFSET_KEYS.items()}
+    offsets['ACCELERATION_Z_OFFSET'] -= int(accel_scale)  # Z ekseni 1 g görür
+    return CalibrationResult(
+        offsets=offsets,
+        mean={axis: s.mean for axis, s in stats.items()},
+        std={axis: s.std for axis, s in stats.items()},
+        half_width={axis: stats[axis].half_width(z) for axis in OFFSET_KEYS},
+        samples=count,
+        duration=time.perf_counter() - start,
+        converged=converged,
+    )
+
+
+def print_result(result):
+    """Kalibrasyon özetini ekrana yazar."""
+    durum = "yakınsadı" if result.converged else "örnek sınırına ulaşıldı"
+    print(f"-> {result.samples} örnek, {result.duration:.2f} s ({durum})")
+    print("   Gürültü (std, LSB)  ivme: {:.1f} / {:.1f} / {:.1f}   jiroskop: {:.1f} / {:.1f} / {:.1f}".format(
+        *(result.std[axis] for axis in ('ax', 'ay', 'az', 'gx', 'gy', 'gz'))))
+
+
+def _burst_batches(sensor):
+    # Okuma bayrağı temizler; yeni örnek yoksa periyodun küçük bir kısmı kadar sonra yeniden bakılır,
+    # varsa bir sonraki örneğe kadar uyunur. Bus örnek başına bir-iki işlemle meşgul edilir.
+    i2c = getattr(sensor, 'i2c', None) or sensor.i2c_device
+    period = imu_fifo.read_sample_period(i2c)
+    interrupts = i2c.read_byte(imu_fifo.ImuFifo.INT_ENABLE)
+    i2c.write_byte(imu_fifo.ImuFifo.INT_ENABLE, interrupts | DATA_RDY_BIT)
+    i2c.read_byte(imu_fifo.ImuFifo.INT_STATUS) # Eski bayrağı temizle
+    try:
+        while True:
+            status, *sample = STATUS_SAMPLE_FORMAT.unpack(
+                i2c.read_block(imu_fifo.ImuFifo.INT_STATUS, STATUS_SAMPLE_FORMAT.size))
+            if status & DATA_RDY_BIT:
+                yield (tuple(sample),)
+                time.sleep(period)
+            else:
+                yield ()
+                time.sleep(period / 8)
+    finally:
+        i2c.write_byte(imu_fifo.ImuFifo.INT_ENABLE, interrupts)
+
+
+def _fifo_batches(sensor):
+    fifo = imu_fifo.ImuFifo(getattr(sensor, 'i2c', None) or sensor.i2c_device)
+    fifo.enable()
+    try:
+        while True:
+            batch = fifo.read()
+            if not batch.samples:
+                time.sleep(fifo.sample_period)
+            yield batch.samples
+    finally:
+        fifo.disable()
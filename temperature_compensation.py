@@ -0,0 +1,79 @@
+# Görevi: Ofsetlerin (özellikle jiroskop bias'ının) yonga sıcaklığıyla
+# değişimini farklı sıcaklıklarda yapılmış kalibrasyonlardan doğrusal bir
+# modelle kestirmek. ImuDevice her okumada zaten gelen TEMP_OUT değerine göre
+# ofsetleri günceller; ısınma sırasında yeniden kalibrasyon gerekmez.
+#
+#     model = temperature_compensation.fit_history(store.history(key))
+#     sensor.set_bias_model(model)
+#     sensor.bias_model.offsets(45.0)   # 45 °C'de beklenen ofsetler
+#
+# Model, kalibrasyon geçmişindeki ya da setup.json'daki anahtarlarla çalışır
+# (ACCELERATION_X_OFFSET ... GYROSCOPE_Z_OFFSET); ölçekler kayıtla birlikte
+# saklanır, farklı ölçüm aralığında ImuDevice ofsetleri yeniden ölçekler.
+
+import statistics
+
+import streaming_calibration
+
+OFFSET_KEYS = tuple(streaming_calibration.OFFSET_KEYS.values())
+SETUP_KEY = 'TEMPERATURE_MODEL'
+
+
+class BiasModel:
+    """Anahtar başına offset(T) = intercept + slope * (T - reference), LSB ve °C.
+
+    coefficients: {setup anahtarı: (intercept, slope)}; modelde olmayan
+    anahtarların ofseti sıcaklıktan bağımsız kabul edilir.
+    """
+    __slots__ = ('reference', 'coefficients', 'accel_scale', 'gyro_scale')
+
+    def __init__(self, reference, coefficients, accel_scale=16384.0, gyro_scale=131.0):
+        self.reference, self.coefficients = reference, dict(coefficients)
+        self.accel_scale, self.gyro_scale = accel_scale, gyro_scale
+
+    def offset(self, key, temperature):
+        intercept, slope = self.coefficients[key]
+        return intercept + slope * (temperature - self.reference)
+
+    def offsets(self, temperature):
+        """temperature (°C) için setup.json anahtarlarıyla tamsayı ofsetler."""
+        return {key: int(round(self.offset(key, temperature))) for key in self.coefficients}
+
+    def to_setup(self):
+        """setup.json'a (SETUP_KEY altında) yazılabilir sözlük."""
+        return {'REFERENCE': self.reference, 'ACCEL_SCALE': self.accel_scale, 'GYRO_SCALE': self.gyro_scale,
+                'COEFFICIENTS': {key: list(value) for key, value in self.coefficients.items()}}
+
+    @classmethod
+    def from_setup(cls, data):
+        return cls(data['REFERENCE'], {key: tuple(value) for key, value in data['COEFFICIENTS'].items()},
+                   data.get('ACCEL_SCALE', 16384.0), data.get('GYRO_SCALE', 131.0))
+
+
+def fit(points, accel_scale=16384.0, gyro_scale=131.0, keys=OFFSET_KEYS):
+    """(sıcaklık °C, ofset sözlüğü) noktalarına en küçük kareler doğrusu uydurur.
+
+    En az iki farklı sıcaklık gerekir, yoksa ValueError. Referans sıcaklık
+    noktaların ortalamasıdır; kesişim bu sıcaklıktaki ofsettir.
+    """
+    temperatures = [temperature for temperature, _ in points]
+    if len(set(temperatures)) < 2:
+        raise ValueError("Sıcaklık modeli için en az iki farklı sıcaklıkta kalibrasyon gerekir")
+    reference = statistics.fmean(temperatures)
+    centered = [temperature - reference for temperature in temperatures]
+    coefficients = {}
+    for key in keys:
+        values = [offsets[key] for _, offsets in points if key in offsets]
+        if len(values) != len(points): continue
+        slope, intercept = statistics.linear_regression(centered, values)
+        coefficients[key] = (intercept, slope)
+    return BiasModel(reference, coefficients, accel_scale, gyro_scale)
+
+
+def fit_history(entries):
+    """calibration_store kayıtlarından (aynı sensör ve ölçüm aralıkları) model; uygun değilse None."""
+    if len({entry['TEMPERATURE'] for entry in entries}) < 2:
+        return None
+    latest = entries[-1]
+    return fit([(entry['TEMPERATURE'], entry) for entry in entries],
+               latest.get('ACCEL_SCALE', 16384.0), latest.get('GYRO_SCALE', 131.0))
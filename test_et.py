@@ -1,6 +1,6 @@
 import json
 import imu
-import time
+import loop_scheduler
 
 print("="*40)
 print("      IMU TEST VE VERİ OKUMA PROGRAMI")
@@ -39,19 +39,22 @@ except KeyError as e:
 print("-" * 40)
 print("Kalibre edilmiş veriler okunuyor... (Durdurmak için Ctrl+C)")
 
-try:
-    while True:
-        sensor.read_acceleration_data()
-        sensor.read_gyroscope_data()
-        sensor.compute_angles()
+def adim():
+    sensor.read_sensor_data()
+    sensor.compute_angles()
+
+    roll = sensor.get_roll()
+    pitch = sensor.get_pitch()
 
-        roll = sensor.get_roll()
-        pitch = sensor.get_pitch()
+    print(f"Roll Açısı: {roll:7.2f} derece   |   Pitch Açısı: {pitch:7.2f} derece", end='\r')
 
-        print(f"Roll Açısı: {roll:7.2f} derece   |   Pitch Açısı: {pitch:7.2f} derece", end='\r')
+# Sabit 10 Hz: hedef zamanlar işin süresinden bağımsız (loop_scheduler)
+dongu = loop_scheduler.FixedRateLoop(adim, rate=10)
 
-        time.sleep(0.1)
+try:
+    dongu.run()
 
 except KeyboardInterrupt:
     print("\n\nProgram kullanıcı tarafından başarıyla sonlandırıldı.")
+    loop_scheduler.print_report(dongu.report())
     print("="*40)
@@ -2,7 +2,7 @@
 # Görevi: imu_configuration.py modülünü kullanarak sensörden veri okumak.
 
 import json
-import time
+import loop_scheduler
 import imu_configuration
 
 print("="*40)
@@ -31,17 +31,22 @@ sensor.load_offsets(ayarlar)
 print("-" * 40)
 print("Kalibre edilmiş veriler okunuyor... (Durdurmak için Ctrl+C)")
 
-try:
-    while True:
-        sensor.read_sensor_data()
-        sensor.compute_angles()
+def adim():
+    sensor.read_sensor_data()
+    sensor.compute_angles()
+
+    # @property sayesinde verilere daha temiz erişiyoruz
+    roll = sensor.roll
+    pitch = sensor.pitch
 
-        # @property sayesinde verilere daha temiz erişiyoruz
-        roll = sensor.roll
-        pitch = sensor.pitch
+    print(f"Roll Açısı: {roll:7.2f} derece   |   Pitch Açısı: {pitch:7.2f} derece", end='\r')
 
-        print(f"Roll Açısı: {roll:7.2f} derece   |   Pitch Açısı: {pitch:7.2f} derece", end='\r')
-        time.sleep(0.1)
+# Sabit 10 Hz: hedef zamanlar işin süresinden bağımsız (loop_scheduler)
+dongu = loop_scheduler.FixedRateLoop(adim, rate=10)
+
+try:
+    dongu.run()
 
 except KeyboardInterrupt:
     print("\n\nProgram kullanıcı tarafından başarıyla sonlandırıldı.")
+    loop_scheduler.print_report(dongu.report())
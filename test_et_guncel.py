@@ -1,6 +1,6 @@
 import json
 import imu_guncel  # Dosya adını doğru yazdık
-import time
+import loop_scheduler
 
 print("="*40)
 print("      IMU TEST PROGRAMI (Açı + Jiroskop)")
@@ -25,20 +25,25 @@ sensor.load_offsets(ayarlar)
 print("-" * 40)
 print("Kalibre edilmiş veriler okunuyor... (Durdurmak için Ctrl+C)")
 
-try:
-    while True:
-        sensor.read_sensor_data()
-        sensor.compute_angles()
+def adim():
+    sensor.read_sensor_data()
+    sensor.compute_angles()
+
+    roll = sensor.roll
+    pitch = sensor.pitch
+    
+    # property'yi kullanıyoruz
+    pitch_rate = sensor.gyro_y_scaled
 
-        roll = sensor.roll
-        pitch = sensor.pitch
-        
-        # property'yi kullanıyoruz
-        pitch_rate = sensor.gyro_y_scaled
+    print(f"Roll: {roll:7.2f} | Pitch: {pitch:7.2f} | Pitch Hızı: {pitch_rate:7.2f} dps", end='\r')
 
-        print(f"Roll: {roll:7.2f} | Pitch: {pitch:7.2f} | Pitch Hızı: {pitch_rate:7.2f} dps", end='\r')
-        time.sleep(0.1)
+# Sabit 10 Hz: hedef zamanlar işin süresinden bağımsız (loop_scheduler)
+dongu = loop_scheduler.FixedRateLoop(adim, rate=10)
+
+try:
+    dongu.run()
 
 except KeyboardInterrupt:
     print("\n\nProgram kullanıcı tarafından başarıyla sonlandırıldı.")
+    loop_scheduler.print_report(dongu.report())
     print("="*40)
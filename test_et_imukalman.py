@@ -1,7 +1,9 @@
+import calibration_store
 import json
-import time
+import loop_scheduler
 import os
 import imu_kalman # Kalman filtreli IMU kodunuzu import ediyoruz
+import imu_settings
 
 print("="*40)
 print("      CANLI KALMAN FİLTRELİ IMU TESTİ")
@@ -18,7 +20,18 @@ try:
     # Kalibrasyon ayarlarını yükle
     # ImuDevice nesnesi üzerinden read_json metodunu çağırıyoruz
     ayarlar = imu.read_json(config_file) 
-    imu.load_offsets(ayarlar)
+    # Örnekleme hızı, DLPF ve ölçüm aralıkları setup.json'dan (yoksa varsayılanlar)
+    imu.configure(imu_settings.from_setup(ayarlar))
+    # Önce bu sensöre ve sıcaklığa ait kayıt aranır; yoksa setup.json'daki ofsetler kullanılır
+    kayit = imu.load_calibration(calibration_store.CalibrationStore())
+    if kayit is not None:
+        print(f"-> Başarılı: Kalibrasyon geçmişinden {kayit.entry['TEMPERATURE']:.1f} °C kaydı yüklendi.")
+    elif ayarlar.get('HARDWARE_OFFSETS', False):
+        # Ofsetler sensörün trim registerlarına yazılır, okumalarda yazılımda çıkarılmaz
+        imu.load_hardware_offsets(ayarlar)
+        print("-> Başarılı: Ofsetler sensörün donanım registerlarına yazıldı ve doğrulandı.")
+    else:
+        imu.load_offsets(ayarlar)
     print(f"-> Başarılı: '{config_file}' kalibrasyon dosyası yüklendi.")
 
 except FileNotFoundError:
@@ -34,22 +47,26 @@ print("-" * 40)
 print("Canlı Kalman Filtreli veriler okunuyor... (Durdurmak için Ctrl+C)")
 print("-" * 40)
 
-try:
-    while True:
-        # Sensörden veri oku, filtrele ve açıları güncelle
-        imu.compute_angles()
+def adim():
+    # Sensörden veri oku, filtrele ve açıları güncelle
+    imu.compute_angles()
+
+    # Filtrelenmiş verilere eriş
+    filtered_roll = imu.roll
+    filtered_pitch = imu.pitch
 
-        # Filtrelenmiş verilere eriş
-        filtered_roll = imu.roll
-        filtered_pitch = imu.pitch
+    # Canlı veriyi aynı satırda güncelleyerek yazdır
+    print(f"Filtrelenmiş Roll: {filtered_roll:7.2f} derece   |   Filtrelenmiş Pitch: {filtered_pitch:7.2f} derece", end='\r', flush=True)
 
-        # Canlı veriyi aynı satırda güncelleyerek yazdır
-        print(f"Filtrelenmiş Roll: {filtered_roll:7.2f} derece   |   Filtrelenmiş Pitch: {filtered_pitch:7.2f} derece", end='\r', flush=True)
-        
-        # Daha hızlı ve gerçek zamanlı bir gözlem için örnekleme hızı (100 Hz)
-        time.sleep(0.01) 
+# Sensörün örnekleme hızında: hedef zamanlar işin süresinden bağımsız (loop_scheduler)
+dongu = loop_scheduler.FixedRateLoop(adim, rate=imu.config.sample_rate)
+
+try:
+    dongu.run()
 
 except KeyboardInterrupt:
     print("\n\nProgram kullanıcı tarafından başarıyla sonlandırıldı.")
+    loop_scheduler.print_report(dongu.report())
+    print(f"Geçersiz örnek: {imu.invalid_samples}   I2C: {imu.i2c.stats.as_dict()}")
 except Exception as e:
     print(f"\nBeklenmeyen bir hata oluştu: {e}")
@@ -2,7 +2,7 @@
 # Görevi: imu_and_calibration.py modülünü kullanarak sensörden veri okumak.
 
 import json
-import time
+import loop_scheduler
 # --- DEĞİŞİKLİK: Artık yeni dosya adımızı import ediyoruz ---
 import imu_and_calibration
 
@@ -43,17 +43,21 @@ except KeyError as e:
 print("-" * 40)
 print("Kalibre edilmiş veriler okunuyor... (Durdurmak için Ctrl+C)")
 
-try:
-    while True:
-        sensor.read_acceleration_data()
-        sensor.read_gyroscope_data()
-        sensor.compute_angles()
+def adim():
+    sensor.read_sensor_data()
+    sensor.compute_angles()
+
+    roll = sensor.get_roll()
+    pitch = sensor.get_pitch()
 
-        roll = sensor.get_roll()
-        pitch = sensor.get_pitch()
+    print(f"Roll Açısı: {roll:7.2f} derece   |   Pitch Açısı: {pitch:7.2f} derece", end='\r')
 
-        print(f"Roll Açısı: {roll:7.2f} derece   |   Pitch Açısı: {pitch:7.2f} derece", end='\r')
-        time.sleep(0.1)
+# Sabit 10 Hz: hedef zamanlar işin süresinden bağımsız (loop_scheduler)
+dongu = loop_scheduler.FixedRateLoop(adim, rate=10)
+
+try:
+    dongu.run()
 
 except KeyboardInterrupt:
     print("\n\nProgram kullanıcı tarafından başarıyla sonlandırıldı.")
+    loop_scheduler.print_report(dongu.report())